@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+import conversions
+import indexes
+import instrumentation
+import schema
+import timeseries
+
+# Compute paths of the Streamlit tools, kept free of any UI code so the
+# results can be cached between reruns and reused by other scripts.
+# The input frames may be shared cached objects and are never modified.
+# The derive and groupby stages are timed through instrumentation.
+
+DEFAULT_SUBJECTS = ['Math', 'Science', 'English']
+PASS_MARK = 40
+
+def student_results(df, subjects=None, thresholds=None, weights=None):
+    """Calculate totals, percentages, pass/fail and ranks for student marks
+
+    subjects defaults to Math, Science and English. thresholds and weights
+    map a subject to its pass mark (default 40) and its weight in the
+    percentage (default 1). Marks are out of 100 per subject.
+    """
+    with instrumentation.record('student', 'derive', rows_in=len(df)) as entry:
+        result = _score_students(df, list(subjects or DEFAULT_SUBJECTS), thresholds or {}, weights or {})
+        entry['rows_out'] = result['total']
+    return result
+
+def _score_students(df, subjects, thresholds, weights):
+    # One (students x subjects) array, everything below is whole-array math
+    marks = df[subjects].to_numpy(dtype=float)
+    pass_marks = np.array([thresholds.get(s, PASS_MARK) for s in subjects], dtype=float)
+    subject_weights = np.array([weights.get(s, 1) for s in subjects], dtype=float)
+
+    total = np.nansum(marks, axis=1)
+    percentage = np.nansum(marks * subject_weights, axis=1) / subject_weights.sum()
+
+    # Pass needs the pass mark in every subject, a missing mark fails
+    passed = (marks >= pass_marks).all(axis=1)
+
+    # Dense rank: position of each percentage among the distinct percentages
+    _, inverse = np.unique(-percentage, return_inverse=True)
+    rank = inverse.reshape(-1) + 1
+
+    df = df.assign(
+        Total=total,
+        Percentage=percentage,
+        Result=np.where(passed, "Pass", "Fail"),
+        Rank=rank,
+    )
+
+    # Sort by rank
+    df_sorted = df.iloc[np.argsort(-percentage, kind='stable')]
+
+    return {
+        'table': df_sorted,
+        'subjects': subjects,
+        'total': len(df),
+        'passed': int(passed.sum()),
+        'failed': int(len(df) - passed.sum()),
+        'average': percentage.mean(),
+    }
+
+def aggregate_by(df, key, columns):
+    """Sum, count, mean, min and max of columns per key from one grouping
+
+    The groups are factorized once and every statistic reuses them, the
+    mean is derived from sum and count. Columns are named like
+    'Revenue_sum', the key is the index.
+    """
+    grouped = df.groupby(key, sort=False)[columns]
+    metrics = grouped.agg(['sum', 'count', 'min', 'max'])
+    for col in columns:
+        metrics[(col, 'mean')] = metrics[(col, 'sum')] / metrics[(col, 'count')]
+    metrics = metrics[[(col, stat) for col in columns for stat in ('sum', 'count', 'mean', 'min', 'max')]]
+    metrics.columns = [f"{col}_{stat}" for col, stat in metrics.columns]
+    return metrics
+
+class RunningAggregates:
+    """aggregate_by metrics kept up to date by merging in only new rows
+
+    update() aggregates the delta and merges it into the stored metrics, so
+    its cost depends on the delta and the number of keys, not the history.
+    """
+
+    def __init__(self, key, columns):
+        self.key = key
+        self.columns = columns
+        self.metrics = None
+
+    def update(self, delta):
+        partial = aggregate_by(delta, self.key, self.columns)
+        if self.metrics is None:
+            self.metrics = partial
+            return self.metrics
+
+        old, new = self.metrics.align(partial, join='outer')
+        merged = {}
+        for col in self.columns:
+            total = old[f"{col}_sum"].add(new[f"{col}_sum"], fill_value=0)
+            count = old[f"{col}_count"].add(new[f"{col}_count"], fill_value=0).astype('int64')
+            if pd.api.types.is_integer_dtype(partial[f"{col}_sum"]) and pd.api.types.is_integer_dtype(self.metrics[f"{col}_sum"]):
+                total = total.astype('int64')
+            merged[f"{col}_sum"] = total
+            merged[f"{col}_count"] = count
+            merged[f"{col}_mean"] = total / count
+            merged[f"{col}_min"] = np.fmin(old[f"{col}_min"], new[f"{col}_min"])
+            merged[f"{col}_max"] = np.fmax(old[f"{col}_max"], new[f"{col}_max"])
+        self.metrics = pd.DataFrame(merged)
+        self.metrics.index.name = self.key
+        return self.metrics
+
+def top_n(metrics, value, n=None, stat='sum'):
+    """Return the n keys with the largest value_stat, largest first
+
+    Uses partial selection (nlargest) instead of sorting every key.
+    n=None returns all keys in order.
+    """
+    column = metrics[f"{value}_{stat}"]
+    ranked = column.nlargest(n) if n is not None else column.sort_values(ascending=False)
+    return ranked.rename(value).reset_index()
+
+class SalesAggregates:
+    """Running sales totals and per-day/per-item metrics, updated with new rows only"""
+
+    def __init__(self):
+        self.daily = RunningAggregates('Date', ['Quantity', 'Revenue'])
+        self.items = RunningAggregates('Item', ['Quantity', 'Revenue'])
+        self.total_revenue = 0
+        self.total_quantity = 0
+        self.price_sum = 0.0
+        self.price_count = 0
+
+    def update(self, delta):
+        """Merge new sales rows in, return them with their Revenue column"""
+        # Calculate revenue
+        with instrumentation.record('sales', 'derive', rows_in=len(delta)) as entry:
+            # Widened so downcast columns cannot overflow
+            delta = delta.assign(Revenue=schema.widen(delta['Quantity']) * schema.widen(delta['Price']))
+            entry['rows_out'] = len(delta)
+
+        # All per-key metrics, one grouping per key
+        with instrumentation.record('sales', 'groupby', rows_in=len(delta)) as entry:
+            daily_metrics = self.daily.update(delta)
+            item_metrics = self.items.update(delta)
+            entry['rows_out'] = len(daily_metrics) + len(item_metrics)
+
+        self.total_revenue += delta['Revenue'].sum()
+        self.total_quantity += delta['Quantity'].sum()
+        self.price_sum += delta['Price'].sum()
+        self.price_count += int(delta['Price'].count())
+        return delta
+
+    def summary(self):
+        return {
+            'total_revenue': self.total_revenue,
+            'total_quantity': self.total_quantity,
+            'avg_price': self.price_sum / self.price_count if self.price_count else np.nan,
+            'daily_metrics': self.daily.metrics,
+            'item_metrics': self.items.metrics,
+        }
+
+def sales_summary(df):
+    """Calculate revenue, totals and per-day/per-item metrics for sales data"""
+    aggregates = SalesAggregates()
+    df = aggregates.update(df)
+    return {'data': df, **aggregates.summary()}
+
+def clean_weather(df, fill='mean', by=None):
+    """Fill missing weather values and calculate weather statistics
+
+    fill='interpolate' fills temperature and humidity gaps by time-weighted
+    interpolation (per by group, e.g. station), gaps it cannot reach fall
+    back to the mean and median.
+    """
+    with instrumentation.record('weather', 'derive', rows_in=len(df)) as entry:
+        result = _clean_weather(df, fill, by)
+        entry['rows_out'] = len(result['cleaned'])
+    return result
+
+def _clean_weather(df, fill='mean', by=None):
+    missing_data = df.isnull().sum()
+
+    # Clean the data
+    df_cleaned = df.copy()
+    if fill == 'interpolate' and 'Date' in df_cleaned.columns:
+        columns = [col for col in ('Temperature', 'Humidity') if col in df_cleaned.columns]
+        df_cleaned = timeseries.interpolate(df_cleaned, columns, 'Date', by)
+
+    # Handle missing values
+    if 'Temperature' in df_cleaned.columns:
+        df_cleaned['Temperature'] = df_cleaned['Temperature'].fillna(df_cleaned['Temperature'].mean())
+    if 'Humidity' in df_cleaned.columns:
+        df_cleaned['Humidity'] = df_cleaned['Humidity'].fillna(df_cleaned['Humidity'].median())
+    if 'Rainfall' in df_cleaned.columns:
+        df_cleaned['Rainfall'] = df_cleaned['Rainfall'].fillna(0)
+
+    # Convert date column
+    if 'Date' in df_cleaned.columns:
+        df_cleaned['Date'] = conversions.to_datetime(df_cleaned['Date'], errors='coerce')
+
+    stats = {}
+    if 'Temperature' in df_cleaned.columns:
+        stats['max_temp'] = df_cleaned['Temperature'].max()
+        stats['min_temp'] = df_cleaned['Temperature'].min()
+        stats['avg_temp'] = df_cleaned['Temperature'].mean()
+    if 'Rainfall' in df_cleaned.columns:
+        stats['total_rainfall'] = df_cleaned['Rainfall'].sum()
+        stats['avg_rainfall'] = df_cleaned['Rainfall'].mean()
+    if 'Humidity' in df_cleaned.columns:
+        stats['avg_humidity'] = df_cleaned['Humidity'].mean()
+
+    return {
+        'missing': missing_data,
+        'cleaned': df_cleaned,
+        'stats': stats,
+    }
+
+def expense_summary(df):
+    """Calculate totals, category, recent and monthly summaries for expenses"""
+    with instrumentation.record('expense', 'derive', rows_in=len(df)) as entry:
+        df = df.copy()
+
+        # Convert date column
+        df['Date'] = conversions.to_datetime(df['Date'])
+        df['Month'] = df['Date'].dt.to_period('M').astype(str)
+        entry['rows_out'] = len(df)
+
+    with instrumentation.record('expense', 'groupby', rows_in=len(df)) as entry:
+        # Category-wise expenses
+        category_expenses = df.groupby('Category')['Amount'].sum().reset_index()
+        category_expenses = category_expenses.sort_values('Amount', ascending=False)
+
+        # Ten most recent rows by partial selection, not a full sort
+        recent_expenses = df.iloc[indexes.top_n_positions(df['Date'], 10)]
+
+        # Monthly trend
+        monthly_expenses = df.groupby('Month')['Amount'].sum().reset_index()
+        entry['rows_out'] = len(category_expenses) + len(monthly_expenses)
+
+    return {
+        'data': df,
+        'total_expenses': df['Amount'].sum(),
+        'expense_count': len(df),
+        'avg_expense': df['Amount'].mean(),
+        'category_expenses': category_expenses,
+        'recent_expenses': recent_expenses,
+        'monthly_expenses': monthly_expenses,
+    }
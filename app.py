@@ -1,7 +1,23 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import copy
+import hashlib
+import io
+import uuid
 from datetime import datetime
 
+import analysis
+import expense_store
+import exports
+import indexes
+import ingest
+import instrumentation
+import jobs
+import result_cache
+import schema
+import timeseries
+
 # Page configuration
 st.set_page_config(
     page_title="Data Toolkit", 
@@ -34,24 +50,385 @@ st.sidebar.markdown("2. Upload your CSV file")
 st.sidebar.markdown("3. View results and download")
 
 # Helper function to display dataframe with formatting
-def display_dataframe(df, title="Data"):
+def display_dataframe(df, title="Data", key=None, columns=None):
     st.subheader(f"📋 {title}")
-    st.dataframe(df, use_container_width=True)
-
-# Helper function to create download button
-def download_button(df, filename, label="📥 Download Results"):
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label=label,
-        data=csv,
-        file_name=filename,
-        mime='text/csv'
-    )
+    paged_dataframe(df, key or title, columns)
+
+# =============== PAGED TABLES ===============
+# Large frames are never sent to the browser as a whole: sorting and
+# filtering run on the server and only the visible page is serialized
+PAGED_MIN_ROWS = 1000
+PAGE_SIZES = [25, 50, 100, 500]
+
+def table_indexes(df, key):
+    """Sort permutations and search indexes for one displayed frame, kept per session"""
+    tables = st.session_state.setdefault('table_indexes', {})
+    entry = tables.get(key)
+    if entry is None or entry['frame'] is not df:
+        entry = {'frame': df, 'sort_index': indexes.SortIndex(), 'search_indexes': {}}
+        tables[key] = entry
+    return entry
+
+def paged_dataframe(df, key, columns=None):
+    """Show one page of df with server-side sort and filter
+
+    Frames up to PAGED_MIN_ROWS rows are shown whole. columns limits the
+    displayed columns without copying df, so the cached indexes stay valid.
+    """
+    columns = list(columns or df.columns)
+    if len(df) <= PAGED_MIN_ROWS:
+        st.dataframe(df[columns], width='stretch')
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        filter_col = st.selectbox("Filter column", ["(none)", *columns], key=f"{key}_filter_col")
+    with col2:
+        query = st.text_input("Contains", key=f"{key}_query", disabled=filter_col == "(none)")
+    with col3:
+        sort_col = st.selectbox("Sort by", ["(none)", *columns], key=f"{key}_sort_col")
+    with col4:
+        order = st.radio("Order", ["Ascending", "Descending"], key=f"{key}_order", horizontal=True)
+    
+    cached = table_indexes(df, key)
+    positions = None
+    if filter_col != "(none)" and query:
+        if filter_col not in cached['search_indexes']:
+            cached['search_indexes'][filter_col] = indexes.TrigramIndex(df[filter_col])
+        positions = cached['search_indexes'][filter_col].search(query)
+    if sort_col != "(none)":
+        permutation = cached['sort_index'].permutation(df[sort_col], order == "Ascending")
+        if positions is not None:
+            selected = np.zeros(len(df), dtype=bool)
+            selected[positions] = True
+            permutation = permutation[selected[permutation]]
+        positions = permutation
+    total = len(df) if positions is None else len(positions)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, -(-total // page_size))
+    with col2:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    
+    start = (min(page, pages) - 1) * page_size
+    end = min(start + page_size, total)
+    rows = np.arange(start, end) if positions is None else positions[start:end]
+    st.dataframe(df.iloc[rows][columns], width='stretch')
+    
+    caption = f"Rows {start + 1 if total else 0:,}-{end:,} of {total:,}"
+    if total != len(df):
+        caption += f" (filtered from {len(df):,})"
+    st.caption(caption)
+
+# Helper function to create download button. Nothing is serialized until
+# the button is clicked, df may also be a callable returning the frame
+def download_button(df, filename, label="📥 Download Results", tool_name='app'):
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox(
+            "Format", exports.available_formats(), key=f"{filename}_format", label_visibility="collapsed"
+        )
+    cache = get_export_cache()
+    # The export runs on a Streamlit worker thread, outside this session's recorder
+    recorder = session_recorder()
+    
+    def export():
+        frame = df() if callable(df) else df
+        with recorder.record(tool_name, 'serialize', rows_in=len(frame)) as entry:
+            key = (exports.frame_digest(frame), fmt)
+            data = cache.get(key)
+            if data is None:
+                data = exports.export_bytes(frame, fmt)
+                cache.put(key, data, len(data))
+            entry['rows_out'] = len(frame)
+        return data
+    
+    with col2:
+        st.download_button(
+            label=label,
+            data=export,
+            file_name=exports.file_name(filename, fmt),
+            mime=exports.FORMATS[fmt]['mime']
+        )
+
+# =============== UPLOAD CACHE ===============
+# Streamlit reruns the whole script on every widget interaction, so parsed
+# uploads and computed results are cached by a hash of the uploaded bytes
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+@st.cache_resource
+def get_upload_cache():
+    return result_cache.UploadCache(CACHE_MAX_BYTES)
+
+@st.cache_resource
+def get_export_cache():
+    """Serialized exports keyed by (content hash, format)"""
+    return result_cache.UploadCache(EXPORT_CACHE_MAX_BYTES)
+
+def upload_digest(uploaded_file):
+    """Hash the uploaded bytes, once per uploaded file
+
+    A list of several files is hashed by the digests of its files.
+    """
+    if isinstance(uploaded_file, list):
+        if len(uploaded_file) == 1:
+            return upload_digest(uploaded_file[0])
+        joined = "".join(upload_digest(file) for file in uploaded_file)
+        return hashlib.blake2b(joined.encode('utf-8'), digest_size=16).hexdigest()
+    digests = st.session_state.setdefault('upload_digests', {})
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is not None and file_id in digests:
+        return digests[file_id]
+    digest = hashlib.blake2b(uploaded_file.getvalue(), digest_size=16).hexdigest()
+    if file_id is not None:
+        digests[file_id] = digest
+    return digest
+
+def cached_upload(uploaded_file, tool_name, stage, compute, render_partial=None):
+    """Return compute(job) for an upload, reusing the cached result when possible
+
+    compute runs as a background job (see run_job), None is returned
+    while it is still running.
+    """
+    cache = get_upload_cache()
+    key = (upload_digest(uploaded_file), tool_name, stage)
+    value = cache.get(key)
+    if value is None:
+        value = run_job(tool_name, key, compute, render_partial)
+        if value is not None:
+            cache.put(key, value, result_cache.estimate_size(value))
+    return value
+
+@st.cache_resource
+def get_user_expense_store(user):
+    return expense_store.ExpenseStore(expense_store.user_path(user))
+
+@st.cache_resource
+def get_local_expense_store():
+    return expense_store.ExpenseStore(expense_store.local_path())
+
+def get_expense_store():
+    """Expense store of the logged-in user, or the local one when nobody is logged in"""
+    if st.user.get('is_logged_in'):
+        return get_user_expense_store(st.user.get('email'))
+    return get_local_expense_store()
+
+def compact(df):
+    """df with compact dtypes, attrs['memory_mb'] holds the memory before and after"""
+    before = schema.memory_mb(df)
+    df, _ = schema.optimize(df)
+    df.attrs['memory_mb'] = (before, schema.memory_mb(df))
+    return df
+
+def memory_caption(memory_mb):
+    before, after = memory_mb
+    st.caption(f"💾 {after:.1f} MB in memory ({before:.1f} MB before dtype optimization)")
+
+def parse_job(data, tool_name):
+    """Job parsing CSV bytes chunk by chunk, the first rows are its partial result"""
+    def parse(job):
+        with instrumentation.record(tool_name, 'read') as entry:
+            chunks = []
+            rows = 0
+            for chunk, done in jobs.csv_chunks(data):
+                chunks.append(chunk)
+                rows += len(chunk)
+                job.update(done, f"Parsed {rows:,} rows", partial=chunks[0].head(PREVIEW_ROWS))
+            df = compact(pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(io.BytesIO(data)))
+            entry['rows_out'] = len(df)
+        return df
+    return parse
+
+def parse_many_job(uploaded_files, tool_name, source_column=None):
+    """Job parsing several uploads concurrently into one frame"""
+    sources = [file.getvalue() for file in uploaded_files]
+    names = [file.name for file in uploaded_files]
+    def parse(job):
+        def progress(done, total):
+            job.update(done / total, f"Parsed {done} of {total} files")
+        with instrumentation.record(tool_name, 'read') as entry:
+            df = compact(ingest.read_many(sources, names, source_column=source_column, progress=progress))
+            entry['rows_out'] = len(df)
+        return df
+    return parse
+
+def show_preview(preview):
+    st.dataframe(preview, width='stretch')
+
+def read_upload(uploaded_file, tool_name, source_column=None):
+    """Parse an uploaded CSV file with compact dtypes, cached by content hash
+
+    uploaded_file may be a list of files with the same columns, they are
+    loaded as one dataset, optionally with a source_column naming the
+    file of every row. Parsing runs in the background, None is returned
+    until it is done.
+    """
+    files = uploaded_file if isinstance(uploaded_file, list) else [uploaded_file]
+    if len(files) == 1 and not source_column:
+        data = files[0].getvalue()
+        return cached_upload(files[0], tool_name, 'parsed', parse_job(data, tool_name), show_preview)
+    return cached_upload(files, tool_name, ('parsed', source_column), parse_many_job(files, tool_name, source_column))
+
+def source_column_option(uploaded_files, key):
+    """Checkbox for a source file column when several files are uploaded"""
+    if len(uploaded_files) > 1 and st.checkbox(f"Add a '{ingest.SOURCE_COLUMN}' column with the file of every row", key=key):
+        return ingest.SOURCE_COLUMN
+    return None
+
+def read_appended(uploaded_file, tool_name, source_column=None):
+    """Return (state, data) for an upload that may extend the previous one
+
+    data is the whole file for a new upload, only the appended rows when
+    the upload starts with the previous upload byte for byte, and None
+    when nothing changed. state['appended'] tells the two cases apart,
+    state holds the columns and, for appended rows, everything the tool
+    kept for the previous upload. Once data is processed the tool stores
+    its results in state and passes it to commit_appended.
+    
+    uploaded_file may also be a list of files. Several files, or a
+    source_column, always make a new upload whose data is the list of
+    file contents, state['sources'] holds the file names.
+    """
+    uploads = st.session_state.setdefault('appended_uploads', {})
+    previous = uploads.get(tool_name)
+    files = uploaded_file if isinstance(uploaded_file, list) else [uploaded_file]
+    digest = upload_digest(files)
+    if previous is not None and previous['digest'] == digest and previous['source_column'] == source_column:
+        return previous, None
+    
+    if len(files) > 1 or source_column:
+        columns = ingest.read_header(files[0].getvalue()) + ([source_column] if source_column else [])
+        state = {'digest': digest, 'size': None, 'columns': columns, 'appended': False,
+                 'sources': [file.name for file in files], 'source_column': source_column}
+        return state, [file.getvalue() for file in files]
+    
+    data = files[0].getvalue()
+    size = previous['size'] if previous is not None else None
+    state = {'digest': digest, 'size': len(data), 'source_column': None}
+    if (size is not None and len(data) > size and data[size - 1:size] == b'\n'
+            and hashlib.blake2b(memoryview(data)[:size], digest_size=16).hexdigest() == previous['digest']):
+        state = dict(previous, appended=True, **state)
+        data = data[size:]
+    else:
+        state.update(columns=list(pd.read_csv(io.BytesIO(data), nrows=0).columns), appended=False)
+    return state, data
+
+def appended_chunks(state, data):
+    """(chunk, fraction done) of the data returned by read_appended
+
+    Several files are parsed concurrently and every file is one chunk.
+    """
+    if isinstance(data, list):
+        frames = ingest.read_frames(data, state['sources'], source_column=state['source_column'])
+        return ((frame, done / len(data)) for done, frame in enumerate(frames, 1))
+    if state['appended']:
+        return jobs.csv_chunks(data, header=None, names=state['columns'])
+    return jobs.csv_chunks(data)
+
+def commit_appended(tool_name, state):
+    """Remember the processed upload, later uploads are compared against it"""
+    st.session_state.setdefault('appended_uploads', {})[tool_name] = state
+
+# =============== BACKGROUND JOBS ===============
+# The compute stage of every tool runs on a shared job pool. A job that
+# finishes within INLINE_SECONDS is rendered in the same run, otherwise
+# a fragment polls it, shows its progress and partial result and reruns
+# the page when it is done. Widget changes meanwhile find the running job
+# instead of starting over, a new upload or new settings supersede it.
+INLINE_SECONDS = 0.5
+POLL_SECONDS = 0.5
+PREVIEW_ROWS = 25
+
+@st.cache_resource
+def get_job_pool():
+    return jobs.JobPool()
+
+def job_slot(tool_name):
+    """Every browser session has one job slot per tool, slots used in this run stay active"""
+    slot = (st.session_state.setdefault('session_key', uuid.uuid4().hex), tool_name)
+    st.session_state.setdefault('active_job_slots', set()).add(slot)
+    return slot
+
+def cancel_inactive_jobs():
+    """Cancel the jobs of this session that the finished run did not ask for, e.g. of another tool"""
+    active = st.session_state.pop('active_job_slots', set())
+    get_job_pool().retain(st.session_state.setdefault('session_key', uuid.uuid4().hex), active)
+
+@st.fragment(run_every=POLL_SECONDS)
+def job_progress(job, tool_name, render_partial=None):
+    if job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ {job.message or 'Working...'} ({job.elapsed:.0f}s)")
+    if st.button("⏹️ Cancel", key=f"{tool_name}_cancel"):
+        job.cancel()
+        st.rerun()
+    if render_partial is not None and job.partial is not None:
+        render_partial(job.partial)
+
+def run_job(tool_name, key, compute, render_partial=None):
+    """Result of compute(job) run in the background, None while it is still running
+
+    While the job runs its progress and, through render_partial, its
+    partial result are shown in place of the result.
+    """
+    recorder = session_recorder()
+    def timed(job):
+        with instrumentation.use(recorder), recorder.record(tool_name, 'job'):
+            return compute(job)
+    
+    pool = get_job_pool()
+    slot = job_slot(tool_name)
+    job = pool.submit(slot, key, timed)
+    if job.cancelled:
+        st.warning("⏹️ Cancelled")
+        if st.button("▶️ Restart", key=f"{tool_name}_restart"):
+            pool.submit(slot, key, timed, restart=True)
+            st.rerun()
+        return None
+    with recorder.paused():
+        finished = job.wait(INLINE_SECONDS)
+    if not finished:
+        job_progress(job, tool_name, render_partial)
+        return None
+    if job.error is not None:
+        # The failed job stays current, so reruns report its error instead of computing again
+        raise job.error
+    pool.discard(slot, job)
+    return job.result()
+
+# =============== PERFORMANCE ===============
+def session_recorder():
+    """Stage timings of this browser session"""
+    return st.session_state.setdefault('recorder', instrumentation.Recorder())
+
+def performance_panel():
+    """Sidebar panel with the recorded stage timings and a JSON export"""
+    recorder = session_recorder()
+    with st.sidebar.expander("⏱️ Performance"):
+        timings = recorder.to_frame()
+        if timings.empty:
+            st.write("No stages recorded yet")
+            return
+        st.dataframe(
+            timings[['source', 'operation', 'seconds', 'rows_in', 'rows_out', 'memory_delta_mb']].tail(20),
+            width='stretch'
+        )
+        st.markdown("**Totals per stage**")
+        st.dataframe(recorder.summary(), width='stretch')
+        st.download_button(
+            label="📥 Export JSON",
+            data=recorder.to_json(),
+            file_name="performance.json",
+            mime='application/json'
+        )
 
 # =============== STUDENT MARKS ANALYZER ===============
 def student_marks_analyzer():
     st.title("🏫 Student Marks Analyzer")
-    st.markdown("Upload a CSV file with columns: **Name, Math, Science, English**")
+    st.markdown("Upload a CSV file with columns: **Name** and one column per subject (default: **Math, Science, English**)")
     
     uploaded_file = st.file_uploader(
         "Choose your student marks CSV file",
@@ -61,103 +438,155 @@ def student_marks_analyzer():
     
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            df = read_upload(uploaded_file, 'student')
+            if df is None:
+                return
             
             # Validate required columns
-            required_cols = ['Name', 'Math', 'Science', 'English']
-            if not all(col in df.columns for col in required_cols):
-                st.error(f"❌ Missing required columns! Expected: {required_cols}")
+            if 'Name' not in df.columns:
+                st.error("❌ Missing required columns! Expected: ['Name', <subject columns>]")
                 st.info("Your file columns: " + str(list(df.columns)))
                 return
             
-            # Calculate results
-            df['Total'] = df[['Math', 'Science', 'English']].sum(axis=1)
-            df['Percentage'] = df['Total'] / 3
-            
-            # Determine pass/fail (minimum 40 marks in each subject)
-            df['Result'] = df.apply(lambda row: "Pass" if (
-                row['Math'] >= 40 and 
-                row['Science'] >= 40 and 
-                row['English'] >= 40
-            ) else "Fail", axis=1)
-            
-            # Calculate ranks
-            df['Rank'] = df['Percentage'].rank(ascending=False, method='dense').astype(int)
+            # Scoring settings
+            subject_options = [col for col in df.columns if col != 'Name']
+            default_subjects = [col for col in analysis.DEFAULT_SUBJECTS if col in subject_options]
+            with st.expander("⚙️ Scoring Settings"):
+                subjects = st.multiselect("Subjects", subject_options, default=default_subjects)
+                thresholds = {}
+                weights = {}
+                for subject in subjects:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        thresholds[subject] = st.number_input(
+                            f"{subject} pass mark", min_value=0.0, value=float(analysis.PASS_MARK), step=1.0
+                        )
+                    with col2:
+                        weights[subject] = st.number_input(
+                            f"{subject} weight", min_value=0.0, value=1.0, step=0.5
+                        )
+            
+            if not subjects:
+                st.error("❌ Select at least one subject column")
+                return
+            if sum(weights.values()) == 0:
+                st.error("❌ At least one subject needs a weight above zero")
+                return
             
-            # Sort by rank
-            df_sorted = df.sort_values('Percentage', ascending=False)
+            # Calculate results
+            settings = (tuple(subjects), tuple(thresholds.items()), tuple(weights.items()))
+            results = cached_upload(
+                uploaded_file, 'student', ('results', settings),
+                lambda job: analysis.student_results(df, subjects, thresholds, weights)
+            )
+            if results is None:
+                return
+            df_sorted = results['table']
             
             # Display results
             display_dataframe(
-                df_sorted[['Rank', 'Name', 'Math', 'Science', 'English', 'Total', 'Percentage', 'Result']],
-                "Student Results with Rankings"
+                df_sorted, "Student Results with Rankings", key="student_results",
+                columns=['Rank', 'Name', *subjects, 'Total', 'Percentage', 'Result']
             )
             
             # Statistics
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("👥 Total Students", len(df))
+                st.metric("👥 Total Students", results['total'])
             with col2:
-                st.metric("✅ Passed", len(df[df['Result'] == 'Pass']))
+                st.metric("✅ Passed", results['passed'])
             with col3:
-                st.metric("❌ Failed", len(df[df['Result'] == 'Fail']))
+                st.metric("❌ Failed", results['failed'])
             with col4:
-                st.metric("📊 Average %", f"{df['Percentage'].mean():.1f}")
+                st.metric("📊 Average %", f"{results['average']:.1f}")
+            memory_caption(df.attrs['memory_mb'])
             
             # Top performer
             top_student = df_sorted.iloc[0]
             st.success(f"🏆 Top Performer: **{top_student['Name']}** with {top_student['Percentage']:.1f}%")
             
-            download_button(df_sorted, "student_results.csv")
+            download_button(df_sorted, "student_results.csv", tool_name='student')
             
         except Exception as e:
             st.error(f"❌ Error processing file: {e}")
 
 # =============== SALES DATA SUMMARIZER ===============
+def sales_job(state, data):
+    """Job merging uploaded rows chunk by chunk into the sales aggregates
+
+    The aggregates of a previous upload are copied, so a cancelled job
+    leaves them untouched. The summary so far is the partial result.
+    """
+    def compute(job):
+        if state['appended']:
+            aggregates = copy.deepcopy(state['aggregates'])
+            frames = list(state['frames'])
+            memory_mb = state['memory_mb']
+        else:
+            aggregates, frames, memory_mb = analysis.SalesAggregates(), [], (0.0, 0.0)
+        rows = 0
+        for chunk, done in appended_chunks(state, data):
+            chunk = compact(chunk)
+            frames.append(aggregates.update(chunk))
+            memory_mb = tuple(a + b for a, b in zip(memory_mb, chunk.attrs['memory_mb']))
+            rows += len(chunk)
+            job.update(done, f"Summarized {rows:,} rows", partial=aggregates.summary())
+        return dict(state, aggregates=aggregates, frames=frames, memory_mb=memory_mb, added=rows)
+    return compute
+
+def sales_metrics(summary):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("💵 Total Revenue", f"₹{summary['total_revenue']:,.2f}")
+    with col2:
+        st.metric("📦 Items Sold", f"{summary['total_quantity']:,}")
+    with col3:
+        st.metric("💰 Avg Price", f"₹{summary['avg_price']:.2f}")
+
 def sales_data_summarizer():
     st.title("💰 Sales Data Summarizer")
     st.markdown("Upload a CSV file with columns: **Date, Item, Quantity, Price**")
     
-    uploaded_file = st.file_uploader(
-        "Choose your sales CSV file",
+    uploaded_files = st.file_uploader(
+        "Choose your sales CSV files (one or more, e.g. one per day)",
         type=['csv'],
+        accept_multiple_files=True,
         key="sales_file"
     )
     
-    if uploaded_file is not None:
+    if uploaded_files:
         try:
-            df = pd.read_csv(uploaded_file)
+            source_column = source_column_option(uploaded_files, "sales_source")
+            state, data = read_appended(uploaded_files, 'sales', source_column)
             
             # Validate required columns
             required_cols = ['Date', 'Item', 'Quantity', 'Price']
-            if not all(col in df.columns for col in required_cols):
+            if not all(col in state['columns'] for col in required_cols):
                 st.error(f"❌ Missing required columns! Expected: {required_cols}")
-                st.info("Your file columns: " + str(list(df.columns)))
+                st.info("Your file columns: " + str(state['columns']))
                 return
             
-            # Calculate revenue
-            df['Revenue'] = df['Quantity'] * df['Price']
-            
-            # Summary metrics
-            total_revenue = df['Revenue'].sum()
-            total_quantity = df['Quantity'].sum()
-            avg_price = df['Price'].mean()
+            # Calculate revenue and summaries chunk by chunk, rows appended
+            # to the previous upload are merged into the running aggregates
+            if data is not None:
+                state = run_job('sales', state['digest'], sales_job(state, data), render_partial=sales_metrics)
+                if state is None:
+                    return
+                commit_appended('sales', state)
+                if state['appended']:
+                    st.info(f"➕ Added {state['added']} appended rows")
+            summary = state['aggregates'].summary()
             
             # Display metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("💵 Total Revenue", f"₹{total_revenue:,.2f}")
-            with col2:
-                st.metric("📦 Items Sold", f"{total_quantity:,}")
-            with col3:
-                st.metric("💰 Avg Price", f"₹{avg_price:.2f}")
+            sales_metrics(summary)
+            memory_caption(state['memory_mb'])
             
             # Analysis
             st.subheader("📈 Sales Analysis")
+            n_top = st.slider("Rows to show in rankings", min_value=1, max_value=100, value=10)
             
             # Daily sales
-            daily_sales = df.groupby('Date')['Revenue'].sum().reset_index()
-            daily_sales = daily_sales.sort_values('Revenue', ascending=False)
+            daily_sales = analysis.top_n(summary['daily_metrics'], 'Revenue', n_top)
             
             col1, col2 = st.columns(2)
             
@@ -166,86 +595,147 @@ def sales_data_summarizer():
                 st.dataframe(daily_sales, use_container_width=True)
             
             # Top items by quantity
-            top_items_qty = df.groupby('Item')['Quantity'].sum().reset_index()
-            top_items_qty = top_items_qty.sort_values('Quantity', ascending=False)
+            top_items_qty = analysis.top_n(summary['item_metrics'], 'Quantity', n_top)
             
             with col2:
                 st.markdown("**🏆 Best Selling Items (Quantity)**")
                 st.dataframe(top_items_qty, use_container_width=True)
             
             # Top revenue items
-            top_revenue = df.groupby('Item')['Revenue'].sum().reset_index()
-            top_revenue = top_revenue.sort_values('Revenue', ascending=False)
+            top_revenue = analysis.top_n(summary['item_metrics'], 'Revenue', n_top)
             
             st.markdown("**💰 Top Revenue Items**")
             st.dataframe(top_revenue, use_container_width=True)
             
+            with st.expander("📋 All Item Metrics"):
+                paged_dataframe(summary['item_metrics'], "sales_item_metrics")
+            
             # Best performing item
             best_item = top_revenue.iloc[0]['Item']
             best_revenue = top_revenue.iloc[0]['Revenue']
             st.success(f"🌟 Top Revenue Item: **{best_item}** (₹{best_revenue:,.2f})")
             
-            download_button(df, "sales_analysis.csv")
+            download_button(
+                lambda: pd.concat(state['frames'], ignore_index=True), "sales_analysis.csv", tool_name='sales'
+            )
             
         except Exception as e:
             st.error(f"❌ Error processing file: {e}")
 
 # =============== WEATHER DATA CLEANER ===============
+def rolling_job(df, windows, by):
+    """Job computing rolling windows chunk by chunk"""
+    def compute(job):
+        def progress(done, total):
+            job.update(done / total, f"Rolled {done:,} of {total:,} readings")
+        with instrumentation.record('weather', 'derive', rows_in=len(df)) as entry:
+            result = timeseries.rolling(df, windows, by=by, progress=progress)
+            entry['rows_out'] = len(result)
+        return result
+    return compute
+
+def resample_job(df, freq, by):
+    def compute(job):
+        with instrumentation.record('weather', 'groupby', rows_in=len(df)) as entry:
+            result = timeseries.resample(df, freq, by=by)
+            entry['rows_out'] = len(result)
+        return result
+    return compute
+
+def weather_time_series(uploaded_files, df_cleaned, source_column, fill):
+    """Per-period statistics and rolling windows of the cleaned readings"""
+    st.subheader("📅 Time Series")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        period = st.selectbox("Statistics per", list(timeseries.FREQUENCIES), key="weather_period")
+    with col2:
+        rain_days = st.number_input("Rainfall window (days)", min_value=1, value=7, key="weather_rain_days")
+    with col3:
+        temp_hours = st.number_input("Temperature window (hours)", min_value=1, value=24, key="weather_temp_hours")
+    
+    # Cached per cleaning, so changing a window does not resample again
+    resampled = cached_upload(
+        uploaded_files, 'weather', ('resampled', source_column, fill, period),
+        resample_job(df_cleaned, timeseries.FREQUENCIES[period], source_column)
+    )
+    if resampled is None:
+        return
+    st.markdown(f"**📊 Statistics per {period.lower()}**")
+    paged_dataframe(resampled, "weather_resampled")
+    download_button(resampled, "weather_resampled.csv", tool_name='weather')
+    
+    windows = timeseries.weather_windows(df_cleaned.columns, int(rain_days), int(temp_hours))
+    if not windows:
+        return
+    rolled = cached_upload(
+        uploaded_files, 'weather', ('rolling', source_column, fill, tuple(windows)),
+        rolling_job(df_cleaned, windows, source_column)
+    )
+    if rolled is None:
+        return
+    st.markdown("**🔁 Rolling Windows**")
+    paged_dataframe(rolled, "weather_rolling")
+
 def weather_data_cleaner():
     st.title("🌦️ Weather Data Cleaner")
     st.markdown("Upload a CSV file with columns: **Date, Temperature, Humidity, Rainfall**")
     
-    uploaded_file = st.file_uploader(
-        "Choose your weather CSV file",
+    uploaded_files = st.file_uploader(
+        "Choose your weather CSV files (one or more, e.g. one per station)",
         type=['csv'],
+        accept_multiple_files=True,
         key="weather_file"
     )
     
-    if uploaded_file is not None:
+    if uploaded_files:
         try:
-            df = pd.read_csv(uploaded_file)
+            source_column = source_column_option(uploaded_files, "weather_source")
+            df = read_upload(uploaded_files, 'weather', source_column)
+            if df is None:
+                return
             
             st.subheader("📊 Raw Data")
-            st.dataframe(df, use_container_width=True)
+            memory_caption(df.attrs['memory_mb'])
+            paged_dataframe(df, "weather_raw")
+            
+            # Clean the data, per station when the files are told apart
+            fill_choice = st.radio(
+                "Fill temperature and humidity gaps with", ["Mean / median", "Time interpolation"],
+                horizontal=True, key="weather_fill"
+            )
+            fill = 'interpolate' if fill_choice == "Time interpolation" else 'mean'
+            cleaned = cached_upload(
+                uploaded_files, 'weather', ('cleaned', source_column, fill),
+                lambda job: analysis.clean_weather(df, fill, by=source_column)
+            )
+            if cleaned is None:
+                return
+            df_cleaned = cleaned['cleaned']
+            stats = cleaned['stats']
             
             # Show missing data info
-            missing_data = df.isnull().sum()
+            missing_data = cleaned['missing']
             if missing_data.sum() > 0:
                 st.warning(f"⚠️ Found {missing_data.sum()} missing values")
                 st.write("Missing values per column:", missing_data[missing_data > 0])
             
-            # Clean the data
-            df_cleaned = df.copy()
-            
-            # Handle missing values
-            if 'Temperature' in df_cleaned.columns:
-                df_cleaned['Temperature'].fillna(df_cleaned['Temperature'].mean(), inplace=True)
-            if 'Humidity' in df_cleaned.columns:
-                df_cleaned['Humidity'].fillna(df_cleaned['Humidity'].median(), inplace=True)
-            if 'Rainfall' in df_cleaned.columns:
-                df_cleaned['Rainfall'].fillna(0, inplace=True)
-            
-            # Convert date column
-            if 'Date' in df_cleaned.columns:
-                df_cleaned['Date'] = pd.to_datetime(df_cleaned['Date'], errors='coerce')
-            
             st.subheader("🧹 Cleaned Data")
-            st.dataframe(df_cleaned, use_container_width=True)
+            paged_dataframe(df_cleaned, "weather_cleaned")
             
             # Weather statistics
             if 'Temperature' in df_cleaned.columns:
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    max_temp = df_cleaned['Temperature'].max()
+                    max_temp = stats['max_temp']
                     st.metric("🔥 Max Temperature", f"{max_temp:.1f}°C")
                 
                 with col2:
-                    min_temp = df_cleaned['Temperature'].min()
+                    min_temp = stats['min_temp']
                     st.metric("❄️ Min Temperature", f"{min_temp:.1f}°C")
                 
                 with col3:
-                    avg_temp = df_cleaned['Temperature'].mean()
+                    avg_temp = stats['avg_temp']
                     st.metric("🌡️ Average Temperature", f"{avg_temp:.1f}°C")
             
             # Rainfall statistics
@@ -253,48 +743,84 @@ def weather_data_cleaner():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    total_rainfall = df_cleaned['Rainfall'].sum()
+                    total_rainfall = stats['total_rainfall']
                     st.metric("🌧️ Total Rainfall", f"{total_rainfall:.1f} mm")
                 
                 with col2:
-                    avg_rainfall = df_cleaned['Rainfall'].mean()
+                    avg_rainfall = stats['avg_rainfall']
                     st.metric("☔ Average Rainfall", f"{avg_rainfall:.1f} mm")
             
             # Humidity statistics
             if 'Humidity' in df_cleaned.columns:
-                avg_humidity = df_cleaned['Humidity'].mean()
+                avg_humidity = stats['avg_humidity']
                 st.metric("💧 Average Humidity", f"{avg_humidity:.1f}%")
             
-            download_button(df_cleaned, "weather_cleaned.csv")
+            download_button(df_cleaned, "weather_cleaned.csv", tool_name='weather')
+            
+            if 'Date' in df_cleaned.columns:
+                weather_time_series(uploaded_files, df_cleaned, source_column, fill)
             
         except Exception as e:
             st.error(f"❌ Error processing file: {e}")
 
 # =============== EXPENSE TRACKER ===============
+def expense_job(store, state, data):
+    """Job importing uploaded rows chunk by chunk, the rows imported so far are the partial result
+
+    The store counts the chunks imported per upload digest, so restarting
+    a cancelled import skips the chunks already stored.
+    """
+    def compute(job):
+        rows = skipped = 0
+        for i, (chunk, done) in enumerate(appended_chunks(state, data)):
+            with instrumentation.record('expense', 'derive', rows_in=len(chunk)) as entry:
+                entry['rows_out'], chunk_skipped = store.import_frame(chunk, state['digest'], part=i)
+            rows += entry['rows_out']
+            skipped += chunk_skipped
+            job.update(done, f"Imported {rows:,} expenses", partial=rows)
+        return dict(state, added=rows, skipped=skipped)
+    return compute
+
 def expense_tracker():
     st.title("🧾 Simple Expense Tracker")
-    st.markdown("Upload a CSV file with columns: **Date, Category, Amount, Note** (or start with empty file)")
+    if st.user.get('is_logged_in'):
+        st.markdown("Expenses are saved for your account. Upload a CSV file with columns: **Date, Category, Amount, Note** to import it (optional)")
+    else:
+        st.markdown("Expenses are saved on this computer. Upload a CSV file with columns: **Date, Category, Amount, Note** to import it (optional)")
+    
+    store = get_expense_store()
     
     uploaded_file = st.file_uploader(
         "Choose your expense CSV file (optional)",
         type=['csv'],
-        key="expense_file"
+        # A new key empties the uploader after the expenses were cleared
+        key=f"expense_file_{st.session_state.get('expense_clears', 0)}"
     )
     
-    # Initialize or load data
+    # Import the upload into the store in the background, once per file
+    # content. When the file extends the previous upload only the appended
+    # rows are imported. The rest of the page stays usable meanwhile
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            state, data = read_appended(uploaded_file, 'expense')
             # Validate columns
-            if not all(col in df.columns for col in ['Date', 'Category', 'Amount']):
+            if not all(col in state['columns'] for col in expense_store.REQUIRED_COLUMNS):
                 st.error("❌ CSV should have columns: Date, Category, Amount, Note")
                 return
+            if data is not None:
+                state = run_job(
+                    'expense', state['digest'], expense_job(store, state, data),
+                    render_partial=lambda rows: st.caption(f"{rows:,} expenses imported so far")
+                )
+                if state is not None:
+                    commit_appended('expense', state)
+                    if state['added']:
+                        st.success(f"✅ Imported {state['added']} expenses from {uploaded_file.name}")
+                    if state.get('skipped'):
+                        st.warning(f"⚠️ Skipped {state['skipped']} rows with a missing or invalid Date, Category or Amount")
         except Exception as e:
             st.error(f"❌ Error reading file: {e}")
             return
-    else:
-        # Create empty dataframe
-        df = pd.DataFrame(columns=['Date', 'Category', 'Amount', 'Note'])
     
     st.subheader("➕ Add New Expense")
     
@@ -316,26 +842,22 @@ def expense_tracker():
         submitted = st.form_submit_button("Add Expense")
         
         if submitted and amount > 0:
-            new_expense = pd.DataFrame({
-                'Date': [date],
-                'Category': [category],
-                'Amount': [amount],
-                'Note': [note]
-            })
-            df = pd.concat([df, new_expense], ignore_index=True)
+            store.add(date, category, amount, note)
             st.success("✅ Expense added successfully!")
     
     # Display expenses if any
-    if not df.empty:
+    if store.count() > 0:
         st.subheader("📊 Expense Summary")
         
-        # Convert date column
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Summaries come from indexed queries on the store
+        with instrumentation.record('expense', 'groupby') as entry:
+            summary = store.summary()
+            entry['rows_in'] = summary['expense_count']
         
         # Summary metrics
-        total_expenses = df['Amount'].sum()
-        expense_count = len(df)
-        avg_expense = df['Amount'].mean()
+        total_expenses = summary['total_expenses']
+        expense_count = summary['expense_count']
+        avg_expense = summary['avg_expense']
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -346,8 +868,7 @@ def expense_tracker():
             st.metric("📊 Average Expense", f"₹{avg_expense:.2f}")
         
         # Category-wise expenses
-        category_expenses = df.groupby('Category')['Amount'].sum().reset_index()
-        category_expenses = category_expenses.sort_values('Amount', ascending=False)
+        category_expenses = summary['category_expenses']
         
         col1, col2 = st.columns(2)
         
@@ -357,29 +878,55 @@ def expense_tracker():
         
         with col2:
             st.markdown("**📅 Recent Expenses**")
-            recent_expenses = df.sort_values('Date', ascending=False).head(10)
+            recent_expenses = summary['recent_expenses']
             st.dataframe(recent_expenses[['Date', 'Category', 'Amount', 'Note']], width='stretch')
         
         # Monthly trend
-        df['Month'] = df['Date'].dt.to_period('M').astype(str)
-        monthly_expenses = df.groupby('Month')['Amount'].sum().reset_index()
+        monthly_expenses = summary['monthly_expenses']
         
         st.markdown("**📊 Monthly Spending Trend**")
         st.dataframe(monthly_expenses, width='stretch')
         
-        download_button(df, "expenses.csv", "💾 Download Expense Data")
+        download_button(store.frame, "expenses.csv", "💾 Download Expense Data", tool_name='expense')
+        
+        if not st.session_state.get('expense_confirm_clear'):
+            if st.button("🗑️ Clear All Expenses"):
+                st.session_state['expense_confirm_clear'] = True
+                st.rerun()
+        else:
+            st.warning(f"Delete all {expense_count} expenses? This cannot be undone.")
+            col1, col2 = st.columns(2)
+            if col1.button("🗑️ Yes, delete them", key="expense_clear_yes"):
+                store.clear()
+                # Let the same file be uploaded and imported again
+                st.session_state.get('appended_uploads', {}).pop('expense', None)
+                st.session_state['expense_clears'] = st.session_state.get('expense_clears', 0) + 1
+                st.session_state['expense_confirm_clear'] = False
+                st.rerun()
+            if col2.button("Cancel", key="expense_clear_cancel"):
+                st.session_state['expense_confirm_clear'] = False
+                st.rerun()
 
 # =============== MAIN APP ===============
 def main():
-    # Main content based on selected tool
+    # Main content based on selected tool, the render stage leaves out the
+    # read and compute stages recorded within it and waiting for jobs
     if tool == "🏫 Student Marks Analyzer":
-        student_marks_analyzer()
+        with instrumentation.record('student', 'render', exclusive=True):
+            student_marks_analyzer()
     elif tool == "💰 Sales Data Summarizer":
-        sales_data_summarizer()
+        with instrumentation.record('sales', 'render', exclusive=True):
+            sales_data_summarizer()
     elif tool == "🌦️ Weather Data Cleaner":
-        weather_data_cleaner()
+        with instrumentation.record('weather', 'render', exclusive=True):
+            weather_data_cleaner()
     elif tool == "🧾 Expense Tracker":
-        expense_tracker()
+        with instrumentation.record('expense', 'render', exclusive=True):
+            expense_tracker()
+    
+    cancel_inactive_jobs()
+    performance_panel()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with instrumentation.use(session_recorder()):
+        main()
\ No newline at end of file
@@ -0,0 +1,160 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import main_console_tool
+import parallel
+
+# Non-interactive cleaning of many CSV files with one JSON recipe, see README.
+
+TYPE_CHOICES = {'int': '1', 'float': '2', 'str': '3', 'datetime': '4'}
+
+def recipe_to_plan(recipe):
+    """Translate recipe steps into console plan operations, raising ValueError on bad steps"""
+    if not isinstance(recipe, dict) or not isinstance(recipe.get('steps', []), list):
+        raise ValueError('a recipe is a JSON object with a list of steps, e.g. {"steps": [...]}')
+    plan = []
+    for i, step in enumerate(recipe.get('steps', []), 1):
+        if not isinstance(step, dict):
+            raise ValueError(f"step {i}: expected an object with an op, got {step!r}")
+        op = step.get('op')
+        if op == 'drop_missing':
+            plan.append(("dropna", None))
+        elif op == 'fill_missing':
+            method = step.get('method', 'mean')
+            if method in ('mean', 'median'):
+                plan.append(("fill_stat", method))
+            elif method == 'value' and 'value' in step:
+                plan.append(("fillna", step['value']))
+            else:
+                raise ValueError(f"step {i}: fill_missing needs method mean, median or value (with a value)")
+        elif op == 'remove_duplicates':
+            plan.append(("dedup", None))
+        elif op == 'change_type':
+            if step.get('type') not in TYPE_CHOICES or 'column' not in step:
+                raise ValueError(f"step {i}: change_type needs a column and a type out of {list(TYPE_CHOICES)}")
+            plan.append(("cast", (step['column'], TYPE_CHOICES[step['type']])))
+        elif op == 'sort':
+            if 'column' not in step:
+                raise ValueError(f"step {i}: sort needs a column")
+            plan.append(("sort", (step['column'], step.get('ascending', True))))
+        else:
+            raise ValueError(f"step {i}: unknown op {op!r}")
+    return plan
+
+def output_paths(files, output_dir):
+    """Output path per input file, mirroring the directories below their common directory
+
+    Raises ValueError when two inputs would be written to the same path.
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+    paths = {}
+    written = {}
+    for path in files:
+        relative = os.path.relpath(os.path.dirname(os.path.abspath(path)), root)
+        base_name = os.path.splitext(os.path.basename(path))[0]
+        out_path = os.path.normpath(os.path.join(output_dir, relative, f"{base_name}_cleaned.csv"))
+        key = os.path.normcase(os.path.abspath(out_path))
+        if key in written:
+            raise ValueError(f"{written[key]} and {path} would both be written to {out_path}")
+        written[key] = path
+        paths[path] = out_path
+    return paths
+
+def clean_file(file_path, plan, out_path):
+    """Load, clean and save one file to out_path, return its timings"""
+    timings = {'file': file_path}
+
+    start = time.perf_counter()
+    df = pd.read_csv(file_path)
+    timings['load'] = time.perf_counter() - start
+    timings['rows_in'] = len(df)
+
+    # Files already run concurrently, so the plan itself runs serially
+    start = time.perf_counter()
+    df = main_console_tool.execute_plan(df, main_console_tool.optimize_plan(plan), workers=1)
+    timings['clean'] = time.perf_counter() - start
+    timings['rows_out'] = len(df)
+
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    start = time.perf_counter()
+    df.to_csv(out_path, index=False)
+    timings['save'] = time.perf_counter() - start
+    timings['output'] = out_path
+    timings['bytes'] = os.path.getsize(file_path)
+    return timings
+
+def run_batch(recipe, patterns, output_dir, workers=parallel.DEFAULT_WORKERS):
+    """Run a recipe over every file matching the glob patterns, return (results, failures)
+
+    Raises ValueError for an invalid recipe or when two inputs would
+    overwrite each other's output.
+    """
+    plan = recipe_to_plan(recipe)
+    files = sorted({os.path.normpath(path) for pattern in patterns for path in glob.glob(pattern, recursive=True)})
+    if not files:
+        print("⚠️  No files matched")
+        return [], []
+    out_paths = output_paths(files, output_dir)
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"🚀 Cleaning {len(files)} files with {workers} workers")
+
+    results = []
+    failures = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(clean_file, path, plan, out_paths[path]): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                timing = future.result()
+            except Exception as e:
+                failures.append((path, str(e)))
+                print(f"❌ {path}: {e}")
+                continue
+            results.append(timing)
+            total = timing['load'] + timing['clean'] + timing['save']
+            print(f"✅ {path}: {timing['rows_in']} → {timing['rows_out']} rows | "
+                  f"load {timing['load']:.2f}s, clean {timing['clean']:.2f}s, save {timing['save']:.2f}s | "
+                  f"{timing['rows_in'] / max(total, 1e-9):,.0f} rows/s")
+    elapsed = time.perf_counter() - start
+
+    rows = sum(timing['rows_in'] for timing in results)
+    megabytes = sum(timing['bytes'] for timing in results) / 1024 / 1024
+    print(f"\n📊 {len(results)} files cleaned, {len(failures)} failed in {elapsed:.2f}s")
+    print(f"📈 Throughput: {rows / max(elapsed, 1e-9):,.0f} rows/s, {megabytes / max(elapsed, 1e-9):.1f} MB/s")
+    return results, failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean many CSV files with one recipe, without prompts.")
+    parser.add_argument('recipe', help="JSON recipe file")
+    parser.add_argument('files', nargs='+', help="input files or glob patterns, e.g. 'exports/*.csv'")
+    parser.add_argument('-o', '--output-dir', default='cleaned', help="where cleaned files are written (default: cleaned)")
+    parser.add_argument('-w', '--workers', type=int, default=parallel.DEFAULT_WORKERS,
+                        help="files processed at the same time (default: CPU cores)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.recipe) as f:
+            recipe = json.load(f)
+        recipe_to_plan(recipe)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid recipe: {e}")
+        return 2
+
+    try:
+        _, failures = run_batch(recipe, args.files, args.output_dir, max(1, args.workers))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Synthetic datasets with the same schemas as the files in data/, at any
+# size. Names, items, prices and categories are taken from the samples so
+# cardinalities stay realistic; missing values and duplicate rows are
+# injected at controllable rates.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_DIR, 'data')
+
+SCHEMAS = ['student', 'sales', 'weather', 'expense']
+SAMPLE_FILES = {
+    'student': 'student_marks_sample.csv',
+    'sales': 'sales_data_sample.csv',
+    'weather': 'weather_data_sample.csv',
+    'expense': 'expense_data_sample.csv',
+}
+
+def parse_size(text):
+    """Parse sizes like 10k, 1m or 10000 into a row count"""
+    text = str(text).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+def load_sample(schema):
+    return pd.read_csv(os.path.join(DATA_DIR, SAMPLE_FILES[schema]))
+
+def random_dates(rng, rows, start='2024-01-01', days=730):
+    offsets = rng.integers(0, days, rows)
+    return (pd.Timestamp(start) + pd.to_timedelta(offsets, unit='D')).strftime('%Y-%m-%d')
+
+def generate_student(rng, rows):
+    sample = load_sample('student')
+    # Sample names plus a number, so names stay mostly unique at any size
+    names = rng.choice(sample['Name'].to_numpy(), rows) + ' ' + np.arange(rows).astype(str)
+    return pd.DataFrame({
+        'Name': names,
+        'Math': rng.integers(20, 101, rows),
+        'Science': rng.integers(20, 101, rows),
+        'English': rng.integers(20, 101, rows),
+    })
+
+def generate_sales(rng, rows):
+    sample = load_sample('sales')
+    prices = sample.groupby('Item')['Price'].first()
+    items = rng.choice(prices.index.to_numpy(), rows)
+    return pd.DataFrame({
+        'Date': random_dates(rng, rows),
+        'Item': items,
+        'Quantity': rng.integers(1, 11, rows),
+        'Price': prices.reindex(items).to_numpy(),
+    })
+
+def generate_weather(rng, rows):
+    sample = load_sample('weather')
+    # One reading per minute, like station data
+    dates = pd.date_range('2020-01-01', periods=rows, freq='min').strftime('%Y-%m-%d %H:%M')
+    return pd.DataFrame({
+        'Date': dates,
+        'Temperature': rng.normal(sample['Temperature'].mean(), sample['Temperature'].std(), rows).round(1),
+        'Humidity': rng.normal(sample['Humidity'].mean(), sample['Humidity'].std(), rows).round(0),
+        'Rainfall': (rng.exponential(sample['Rainfall'].mean(), rows) * (rng.random(rows) < 0.4)).round(1),
+    })
+
+def generate_expense(rng, rows):
+    sample = load_sample('expense')
+    picks = rng.integers(0, len(sample), rows)
+    return pd.DataFrame({
+        'Date': random_dates(rng, rows),
+        'Category': sample['Category'].to_numpy()[picks],
+        'Amount': rng.integers(20, 5000, rows),
+        'Note': sample['Note'].to_numpy()[picks],
+    })
+
+GENERATORS = {
+    'student': generate_student,
+    'sales': generate_sales,
+    'weather': generate_weather,
+    'expense': generate_expense,
+}
+
+def generate(schema, rows, missing_rate=0.02, duplicate_rate=0.01, seed=0):
+    """Generate a frame for schema with the given missing-value and duplicate rates"""
+    rng = np.random.default_rng(seed)
+    df = GENERATORS[schema](rng, rows)
+
+    # Missing values in every column except the first (the key column)
+    for col in df.columns[1:]:
+        mask = rng.random(rows) < missing_rate
+        if mask.any():
+            df[col] = df[col].astype('float64' if pd.api.types.is_numeric_dtype(df[col]) else object)
+            df.loc[mask, col] = np.nan
+
+    # Duplicates: overwrite some rows with copies of earlier rows
+    n_duplicates = int(rows * duplicate_rate)
+    if n_duplicates:
+        targets = rng.choice(np.arange(1, rows), n_duplicates, replace=False)
+        sources = (rng.random(n_duplicates) * targets).astype(int)
+        for col in df.columns:
+            values = df[col].to_numpy(copy=True)
+            values[targets] = values[sources]
+            df[col] = values
+    return df
+
+def write_dataset(schema, rows, out_dir, missing_rate=0.02, duplicate_rate=0.01, seed=0):
+    """Generate a dataset and write it as CSV, return the file path"""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{schema}_{rows}_m{missing_rate}_d{duplicate_rate}_s{seed}.csv")
+    if not os.path.exists(path):
+        generate(schema, rows, missing_rate, duplicate_rate, seed).to_csv(path, index=False)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets shaped like the data/ samples.")
+    parser.add_argument('--schemas', nargs='+', default=SCHEMAS, choices=SCHEMAS)
+    parser.add_argument('--sizes', nargs='+', default=['10k'], help="row counts, e.g. 10k 1m 10m")
+    parser.add_argument('--missing-rate', type=float, default=0.02)
+    parser.add_argument('--duplicate-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out-dir', default=os.path.join(REPO_DIR, 'benchmarks', 'generated'))
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        for schema in args.schemas:
+            path = write_dataset(schema, parse_size(size), args.out_dir, args.missing_rate, args.duplicate_rate, args.seed)
+            print(f"✅ {path}")
+
+if __name__ == "__main__":
+    main()
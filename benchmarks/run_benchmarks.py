@@ -0,0 +1,276 @@
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import pandas as pd
+
+import analysis
+import columnar_cache
+import main_console_tool as console
+import generate_data
+
+# Times every console operation and every app.py compute path on synthetic
+# data, records peak memory and compares against a stored baseline.
+#
+#   python benchmarks/run_benchmarks.py --sizes 10k 1m --save-baseline
+#   python benchmarks/run_benchmarks.py --sizes 10k 1m
+#
+# Console operations are driven through the real menu functions with
+# scripted answers and their output discarded.
+
+BASELINE_PATH = os.path.join(REPO_DIR, 'benchmarks', 'baseline.json')
+
+# Columns and queries used by the console operations, per schema
+CONSOLE_SETUP = {
+    'student': {'search': ('Name', 'Sharma 4242'), 'filter': 'Math >= 90 and Science < 40 and Name contains sharma', 'sort': 'Math', 'pivot': ('English', 'Math'),
+                'int': 'Math', 'float': 'Science', 'str': 'English', 'datetime': None},
+    'sales': {'search': ('Date', '2024-03-15'), 'filter': 'Price > 2000 and Item in (Monitor, Webcam) and Date >= 2025-01', 'sort': 'Price', 'pivot': ('Item', 'Quantity'),
+              'int': 'Quantity', 'float': 'Price', 'str': 'Item', 'datetime': 'Date'},
+    'weather': {'search': ('Date', '2020-01-02 12:3'), 'filter': 'Temperature > 30 and Rainfall > 0 and Date = 2020-01-02', 'sort': 'Temperature', 'pivot': ('Humidity', 'Rainfall'),
+                'int': 'Humidity', 'float': 'Rainfall', 'str': 'Temperature', 'datetime': 'Date'},
+    'expense': {'search': ('Date', '2024-03-15'), 'filter': 'Amount > 500 and Category in (Food, Bills) and Date >= 2024-01', 'sort': 'Amount', 'pivot': ('Category', 'Amount'),
+                'int': 'Amount', 'float': 'Amount', 'str': 'Category', 'datetime': 'Date'},
+}
+
+APP_COMPUTE = {
+    'student': analysis.student_results,
+    'sales': analysis.sales_summary,
+    'weather': analysis.clean_weather,
+    'expense': analysis.expense_summary,
+}
+
+def column_number(df, column):
+    return str(list(df.columns).index(column) + 1)
+
+def console_operations(schema, df, path):
+    """(name, answers, function, setup) for every console operation"""
+    setup = CONSOLE_SETUP[schema]
+    search_col, query = setup['search']
+    index_col, value_col = setup['pivot']
+    sidecar = columnar_cache.sidecar_path(path)
+
+    def remove_sidecar():
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+
+    def write_sidecar():
+        if not os.path.exists(sidecar):
+            columnar_cache.save_cached(path, df)
+
+    def build_search_index():
+        console.get_search_index(search_col)
+
+    ops = [
+        ('load (csv)', [path, '1'], console.load_csv, remove_sidecar),
+        ('load (cached)', [path, '1'], console.load_csv, write_sidecar),
+        ('missing: drop', ['1'], console.handle_missing, None),
+        ('missing: mean', ['2'], console.handle_missing, None),
+        ('missing: median', ['3'], console.handle_missing, None),
+        ('missing: custom', ['4', '0'], console.handle_missing, None),
+        ('remove duplicates', [], console.remove_duplicates, None),
+        ('search (first)', [column_number(df, search_col), query], console.search_data, None),
+        ('search (indexed)', [column_number(df, search_col), query], console.search_data, build_search_index),
+        ('filter', [setup['filter']], console.search_data, None),
+        ('sort', [column_number(df, setup['sort']), 'y', ''], console.sort_data, None),
+        ('top 10', [column_number(df, setup['sort']), 'n', '10'], console.sort_data, None),
+        ('pivot', [column_number(df, index_col), column_number(df, value_col), '2', 'n'], console.create_pivot, None),
+        ('pivot (cube)', [column_number(df, index_col), column_number(df, value_col), '2', 'y'], console.create_pivot, None),
+        ('summary', [], console.view_summary, None),
+        ('save', [], console.save_data, None),
+    ]
+    for type_name, type_choice in (('int', '1'), ('float', '2'), ('str', '3'), ('datetime', '4')):
+        if setup[type_name]:
+            ops.append((f'cast: {type_name}', [column_number(df, setup[type_name]), type_choice],
+                        console.change_data_type, None))
+    return ops
+
+def reset_console(path, df):
+    """Put the console tool into a freshly loaded, in-memory state"""
+    console.df = df.copy()
+    console.filename = path
+    console.streaming = False
+    console.lazy = False
+    console.chunk_ops = []
+    console.plan.clear()
+    console.use_cube = None
+    console.saved_exports.clear()
+    console.data_changed()
+
+@contextlib.contextmanager
+def scripted_input(answers):
+    """Answer input() prompts from a list and discard all output"""
+    answers = iter(answers)
+    original = builtins.input
+    builtins.input = lambda prompt="": next(answers, "")
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        builtins.input = original
+
+def measure(func, prepare, repeat, track_memory):
+    """Best wall time of func over repeat runs, and peak traced memory in MB"""
+    best = float('inf')
+    for _ in range(repeat):
+        prepare()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if track_memory:
+        # Tracing slows allocations down, so memory gets its own run
+        prepare()
+        tracemalloc.start()
+        func()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return best, peak_mb
+
+def run_schema(schema, rows, args, data_dir):
+    """Benchmark every console operation and the app compute path for one dataset"""
+    path = generate_data.write_dataset(schema, rows, data_dir, args.missing_rate, args.duplicate_rate, args.seed)
+    df = pd.read_csv(path)
+    results = {}
+
+    for name, answers, func, setup in console_operations(schema, df, path):
+        def prepare():
+            reset_console(path, df)
+            if setup:
+                with scripted_input([]):
+                    setup()
+
+        def run():
+            with scripted_input(answers):
+                func()
+
+        results[f"console/{name}"] = measure(run, prepare, args.repeat, not args.no_memory)
+
+    compute = APP_COMPUTE[schema]
+    results["app/read"] = measure(lambda: pd.read_csv(path), lambda: None, args.repeat, not args.no_memory)
+    results["app/compute"] = measure(lambda: compute(df), lambda: None, args.repeat, not args.no_memory)
+    return results
+
+# Peaks below this many MB are too noisy to compare
+MIN_COMPARED_PEAK_MB = 1.0
+
+def change(value, base, tolerance):
+    """Relative change of value against base formatted with a marker, and whether it regressed"""
+    ratio = value / max(base, 1e-9)
+    marker = ""
+    if ratio > 1 + tolerance:
+        marker = " ⚠️"
+    elif ratio < 1 - tolerance:
+        marker = " 🚀"
+    return f"{(ratio - 1) * 100:>+8.0f}%{marker:<3}", ratio > 1 + tolerance
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Print results next to the baseline, return the (key, metric) pairs that regressed
+
+    Seconds and peak memory are both compared, peaks are only compared
+    when both runs traced memory and one of them reached MIN_COMPARED_PEAK_MB.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<45} {'seconds':>10} {'baseline':>10} {'change':>12} "
+          f"{'peak MB':>10} {'baseline':>10} {'change':>12}")
+    print("-" * 115)
+    for key, entry in results.items():
+        base = baseline.get(key) or {}
+        line = f"{key:<45} {entry['seconds']:>10.4f}"
+        if base.get('seconds') is not None:
+            text, regressed = change(entry['seconds'], base['seconds'], tolerance)
+            line += f" {base['seconds']:>10.4f} {text}"
+            if regressed:
+                regressions.append((key, 'seconds'))
+        else:
+            line += f" {'-':>10} {'-':>12}"
+
+        peak, base_peak = entry['peak_mb'], base.get('peak_mb')
+        line += f" {peak:>10.1f}" if peak is not None else f" {'-':>10}"
+        if peak is not None and base_peak is not None and max(peak, base_peak) >= MIN_COMPARED_PEAK_MB:
+            text, regressed = change(peak, base_peak, memory_tolerance)
+            line += f" {base_peak:>10.1f} {text}"
+            if regressed:
+                regressions.append((key, 'peak_mb'))
+        print(line)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the console operations and app compute paths.")
+    parser.add_argument('--schemas', nargs='+', default=generate_data.SCHEMAS, choices=generate_data.SCHEMAS)
+    parser.add_argument('--sizes', nargs='+', default=['10k'], help="row counts, e.g. 10k 1m 10m")
+    parser.add_argument('--missing-rate', type=float, default=0.02)
+    parser.add_argument('--duplicate-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark, the best time is kept")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory run")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="relative slowdown reported as regression")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25,
+                        help="relative growth of peak memory reported as regression")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    parser.add_argument('--data-dir', default=os.path.join(REPO_DIR, 'benchmarks', 'generated'))
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="data_toolkit_bench_")
+    original_cache_dir = columnar_cache.CACHE_DIR
+    original_cwd = os.getcwd()
+    results = {}
+    try:
+        # Keep sidecars and saved files out of the user's directories
+        columnar_cache.CACHE_DIR = os.path.join(work_dir, 'cache')
+        data_dir = os.path.abspath(args.data_dir)
+        os.chdir(work_dir)
+
+        for size in args.sizes:
+            rows = generate_data.parse_size(size)
+            for schema in args.schemas:
+                print(f"⏱️  {schema} ({rows:,} rows)")
+                for key, (seconds, peak_mb) in run_schema(schema, rows, args, data_dir).items():
+                    results[f"{schema}/{rows}/{key}"] = {'seconds': seconds, 'peak_mb': peak_mb}
+    finally:
+        os.chdir(original_cwd)
+        columnar_cache.CACHE_DIR = original_cache_dir
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        for key, entry in results.items():
+            # A run without --no-memory keeps the stored peak
+            stored = baseline.get(key, {})
+            baseline[key] = {'seconds': entry['seconds'],
+                             'peak_mb': entry['peak_mb'] if entry['peak_mb'] is not None else stored.get('peak_mb')}
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"\n💡 No baseline at {args.baseline}, run with --save-baseline to store one")
+    elif regressions:
+        slower = sum(1 for _, metric in regressions if metric == 'seconds')
+        bigger = len(regressions) - slower
+        print(f"\n⚠️  {slower} benchmarks slower than the baseline by more than {args.tolerance:.0%}, "
+              f"{bigger} using more peak memory by more than {args.memory_tolerance:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
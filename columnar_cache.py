@@ -0,0 +1,75 @@
+import os
+import hashlib
+
+# On-disk columnar cache for CSV files that are loaded repeatedly.
+# The first load writes an uncompressed Feather sidecar, later loads
+# memory-map it instead of parsing the CSV again. pyarrow is optional:
+# without it the cache is simply skipped.
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "data_toolkit")
+
+def sidecar_path(csv_path):
+    """Return the sidecar file used to cache csv_path"""
+    key = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:16]
+    base_name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(CACHE_DIR, f"{base_name}_{key}.feather")
+
+def source_signature(csv_path):
+    """Size and modification time used to validate a sidecar"""
+    stat = os.stat(csv_path)
+    return {b'source_size': str(stat.st_size).encode(), b'source_mtime_ns': str(stat.st_mtime_ns).encode()}
+
+def load_cached(csv_path, variant='raw'):
+    """Return the cached frame for csv_path, or None if there is no valid sidecar
+
+    variant names how the frame was prepared after parsing (e.g. the dtype
+    optimization), a sidecar written for another variant is a miss.
+    """
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+
+    path = sidecar_path(csv_path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        table = feather.read_table(path, memory_map=True)
+        metadata = table.schema.metadata or {}
+        signature = source_signature(csv_path)
+        signature[b'variant'] = variant.encode()
+        if any(metadata.get(k) != v for k, v in signature.items()):
+            return None
+        return table.to_pandas()
+    except Exception:
+        # A corrupt or unreadable sidecar is treated as a cache miss
+        return None
+
+def save_cached(csv_path, df, variant='raw'):
+    """Write a sidecar for csv_path, return True if it was written, df.attrs are kept"""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        return False
+
+    path = sidecar_path(csv_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata.update(source_signature(csv_path))
+        metadata[b'variant'] = variant.encode()
+        table = table.replace_schema_metadata(metadata)
+
+        # Uncompressed so later loads can memory-map the columns,
+        # written to a temporary file first so readers never see half a file
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
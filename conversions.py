@@ -0,0 +1,65 @@
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Type conversions that parse every distinct value once. Date and number
+# columns usually repeat a few thousand values over millions of rows, so
+# the values are factorized (or the codes of a categorical are used), the
+# uniques are converted and the result is mapped back through the codes.
+# Date formats are detected once from a sample of the uniques instead of
+# being inferred per value. Columns that are mostly unique, judged from a
+# random sample, are converted directly since factorizing would not save
+# any parsing.
+
+FORMAT_SAMPLE_SIZE = 1000
+CARDINALITY_SAMPLE_SIZE = 10000
+MAX_UNIQUE_RATIO = 0.5
+
+def mostly_unique(series):
+    """Whether a random sample of series has more than MAX_UNIQUE_RATIO distinct values"""
+    if len(series) <= CARDINALITY_SAMPLE_SIZE:
+        return False
+    sample = series.sample(CARDINALITY_SAMPLE_SIZE, random_state=0)
+    return sample.nunique() > MAX_UNIQUE_RATIO * CARDINALITY_SAMPLE_SIZE
+
+def map_unique(series, convert):
+    """Apply convert to the distinct values of series only, missing values stay missing
+
+    convert receives the uniques as a Series and returns a Series of the
+    same length, mostly unique columns are passed to it whole.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    elif mostly_unique(series):
+        return convert(series)
+    else:
+        codes, uniques = pd.factorize(series)
+    converted = convert(pd.Series(uniques))
+    values = pd.api.extensions.take(converted.array, codes, allow_fill=True)
+    return pd.Series(values, index=series.index, name=series.name)
+
+def detect_datetime_format(values):
+    """strftime format that parses every sampled value, or None to let pandas infer"""
+    sample = values.dropna()[:FORMAT_SAMPLE_SIZE]
+    if len(sample) == 0 or not all(isinstance(value, str) for value in sample):
+        return None
+    # 01/02/2024 reads month first, a later 26/01/2024 needs day first
+    for dayfirst in (False, True):
+        fmt = guess_datetime_format(sample.iloc[0], dayfirst=dayfirst)
+        if fmt is not None and pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+            return fmt
+    return None
+
+def to_datetime(series, errors='raise'):
+    """pd.to_datetime parsing each distinct value once with a detected format"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return map_unique(series, lambda uniques: pd.to_datetime(
+        uniques, format=detect_datetime_format(uniques), errors=errors
+    ))
+
+def to_numeric(series, errors='raise'):
+    """pd.to_numeric converting each distinct value once"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series
+    return map_unique(series, lambda uniques: pd.to_numeric(uniques, errors=errors))
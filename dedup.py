@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Streaming duplicate removal. Rows are reduced to 128-bit digests, so
+# memory grows with 16 bytes per unique row instead of with the full
+# width of every row. Two independently keyed 64-bit hashes make an
+# accidental collision practically impossible.
+
+# Each half of a digest has its own seed, and text its own SipHash key
+SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F)
+HASH_KEYS = ('data-toolkit-hi0', 'data-toolkit-lo1')
+FLOAT_TAG = 0x2545F4914F6CDD1D
+MISSING_TAG = 0x5BD1E9955BD1E995
+
+def _mix(x):
+    """splitmix64 finalizer, a bijection on uint64 arrays"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def column_hash(series, seed, hash_key):
+    """uint64 hash of every value of series
+
+    Integers are hashed exactly as int64. Chunks of the same file can
+    infer int for one chunk and float for another, so floats holding an
+    integer hash like that integer; other floats hash their bits.
+    """
+    seed = np.uint64(seed)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = column_hash(pd.Series(series.cat.categories), seed, hash_key)
+        hashed = np.append(categories, np.uint64(0))[series.cat.codes.to_numpy()]
+    elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        bits = series.to_numpy(dtype='int64', na_value=0).view('uint64')
+        hashed = _mix(bits ^ seed)
+    elif pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        integral = np.isfinite(values) & (np.floor(values) == values) & (np.abs(values) < 2.0 ** 63)
+        as_int = np.where(integral, values, 0).astype('int64').view('uint64')
+        hashed = np.where(integral, _mix(as_int ^ seed), _mix(values.view('uint64') ^ (seed ^ np.uint64(FLOAT_TAG))))
+    elif pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+        bits = np.asarray(series.dt.as_unit('ns').array.asi8).view('uint64')
+        hashed = _mix(bits ^ seed)
+    else:
+        hashed = pd.util.hash_array(series.to_numpy(dtype=object), hash_key=hash_key, categorize=True)
+    missing = series.isna().to_numpy()
+    if missing.any():
+        hashed = np.where(missing, _mix(np.array([seed ^ np.uint64(MISSING_TAG)]))[0], hashed)
+    return hashed
+
+def row_digests(chunk):
+    """Return (hi, lo) uint64 arrays with a 128-bit digest per row
+
+    The halves hash every column with a different seed and are combined
+    column by column through a bijective mix, so they are independent.
+    """
+    digests = []
+    for seed, hash_key in zip(SEEDS, HASH_KEYS):
+        digest = np.full(len(chunk), seed, dtype=np.uint64)
+        for position in range(chunk.shape[1]):
+            digest = _mix(digest ^ column_hash(chunk.iloc[:, position], seed, hash_key))
+        digests.append(digest)
+    return tuple(digests)
+
+def first_occurrences(hi, lo):
+    """Mask of rows whose digest did not occur earlier in the same batch"""
+    order = np.lexsort((lo, hi))
+    same = (hi[order][1:] == hi[order][:-1]) & (lo[order][1:] == lo[order][:-1])
+    keep = np.ones(len(hi), dtype=bool)
+    keep[order[1:][same]] = False
+    return keep
+
+class DigestSet:
+    """Compact set of 128-bit row digests
+
+    Digests are kept in a few sorted uint64 blocks (two arrays per block,
+    sorted by the high word). Small blocks are merged into bigger ones as
+    they fill up, so lookups stay logarithmic and adding n digests costs
+    O(n log n) overall.
+    """
+
+    def __init__(self):
+        self.blocks = []
+
+    def __len__(self):
+        return sum(len(hi) for hi, _ in self.blocks)
+
+    @property
+    def memory_bytes(self):
+        return sum(hi.nbytes + lo.nbytes for hi, lo in self.blocks)
+
+    def contains(self, hi, lo):
+        """Mask of digests that are already in the set"""
+        found = np.zeros(len(hi), dtype=bool)
+        for block_hi, block_lo in self.blocks:
+            left = np.searchsorted(block_hi, hi, side='left')
+            right = np.searchsorted(block_hi, hi, side='right')
+            single = (right - left) == 1
+            found[single] |= block_lo[left[single]] == lo[single]
+            # Equal high words with different low words are very rare
+            for i in np.flatnonzero((right - left) > 1):
+                found[i] |= bool((block_lo[left[i]:right[i]] == lo[i]).any())
+        return found
+
+    def add(self, hi, lo):
+        """Add digests that are known to be new"""
+        if len(hi) == 0:
+            return
+        order = np.argsort(hi)
+        self.blocks.append((hi[order], lo[order]))
+
+        # Merge while the newest block is at least half the size of the one before it
+        while len(self.blocks) > 1 and len(self.blocks[-1][0]) * 2 >= len(self.blocks[-2][0]):
+            (hi_a, lo_a), (hi_b, lo_b) = self.blocks.pop(), self.blocks.pop()
+            merged_hi = np.concatenate((hi_b, hi_a))
+            merged_lo = np.concatenate((lo_b, lo_a))
+            order = np.argsort(merged_hi, kind='stable')
+            self.blocks.append((merged_hi[order], merged_lo[order]))
+
+    def add_rows(self, chunk):
+        """Return a mask of rows not seen before and remember them"""
+        hi, lo = row_digests(chunk)
+        keep = first_occurrences(hi, lo)
+        keep[keep] = ~self.contains(hi[keep], lo[keep])
+        self.add(hi[keep], lo[keep])
+        return keep
+
+def dedup_to_disk(chunks, out_path, buckets=16):
+    """Deduplicate a stream of chunks through disk buckets and write a CSV
+
+    Rows are first spread over bucket files by digest, so duplicates
+    always land in the same bucket; each bucket is then deduplicated on
+    its own. Memory is bounded by the largest bucket, but rows come out
+    grouped by bucket instead of in their original order.
+    Returns (rows read, rows written).
+    """
+    spill_dir = tempfile.mkdtemp(prefix="data_toolkit_dedup_")
+    bucket_paths = [os.path.join(spill_dir, f"bucket_{i}.csv") for i in range(buckets)]
+    rows_in = 0
+    rows_out = 0
+    columns = None
+    try:
+        # Pass 1: spread rows over the buckets, keeping their digests
+        for chunk in chunks:
+            rows_in += len(chunk)
+            columns = list(chunk.columns)
+            hi, lo = row_digests(chunk)
+            keep = first_occurrences(hi, lo)
+            spilled = chunk.assign(_digest_hi=hi, _digest_lo=lo)[keep]
+            bucket_ids = (hi[keep] % buckets).astype(int)
+            for bucket, part in spilled.groupby(bucket_ids):
+                path = bucket_paths[bucket]
+                part.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+        # Pass 2: each bucket fits in memory and is deduplicated by digest
+        first = True
+        for path in bucket_paths:
+            if not os.path.exists(path):
+                continue
+            # Read back as text so values are written out exactly as spilled
+            part = pd.read_csv(path, dtype=str, keep_default_na=False)
+            part = part.drop_duplicates(subset=['_digest_hi', '_digest_lo'])
+            part = part.drop(columns=['_digest_hi', '_digest_lo'])
+            part.to_csv(out_path, mode='w' if first else 'a', header=first, index=False)
+            rows_out += len(part)
+            first = False
+
+        if first and columns is not None:
+            pd.DataFrame(columns=columns).to_csv(out_path, index=False)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    return rows_in, rows_out
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+import conversions
+
+# Persistent, append-only store for the Expense Tracker. Expenses live in
+# a local SQLite database in WAL mode, so adding one is a single insert
+# and readers never block the writer. Totals per category and per month
+# are kept in their own tables and updated with every insert, so the
+# summaries read one row per group instead of re-reading the history.
+# The recent expenses come from the index on the date.
+
+STORE_DIR = os.path.join(os.path.expanduser("~"), ".data_toolkit", "expenses")
+
+# Columns an imported row cannot do without
+REQUIRED_COLUMNS = ('Date', 'Category', 'Amount')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    note TEXT
+);
+CREATE INDEX IF NOT EXISTS expenses_date ON expenses (date, amount);
+CREATE INDEX IF NOT EXISTS expenses_category ON expenses (category, amount);
+CREATE TABLE IF NOT EXISTS category_totals (
+    category TEXT PRIMARY KEY,
+    amount REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS monthly_totals (
+    month TEXT PRIMARY KEY,
+    amount REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    digest TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    parts INTEGER NOT NULL
+);
+"""
+
+class ExpenseStore:
+    """Expenses in a SQLite database, safe to share between threads"""
+
+    def __init__(self, path=":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if self.count() and not self.conn.execute("SELECT 1 FROM category_totals").fetchone():
+            self.rebuild_totals()
+
+    def _add_totals(self, table, key, totals):
+        """Add (group, amount, count) rows to a totals table"""
+        self.conn.executemany(
+            f"INSERT INTO {table} ({key}, amount, count) VALUES (?, ?, ?) "
+            f"ON CONFLICT ({key}) DO UPDATE SET amount = amount + excluded.amount, count = count + excluded.count",
+            totals
+        )
+
+    def add(self, date, category, amount, note=""):
+        """Append one expense, date is anything pd.Timestamp understands"""
+        date = pd.Timestamp(date).strftime('%Y-%m-%d')
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO expenses (date, category, amount, note) VALUES (?, ?, ?, ?)",
+                (date, category, float(amount), note or None)
+            )
+            self._add_totals('category_totals', 'category', [(category, float(amount), 1)])
+            self._add_totals('monthly_totals', 'month', [(date[:7], float(amount), 1)])
+
+    def import_frame(self, df, digest, part=0):
+        """Append part number part of an upload once, return (rows added, rows skipped)
+
+        The parts of an upload are imported in order and counted under the
+        upload digest, parts already imported are not added again. Rows
+        with a missing or invalid Date, Category or Amount are skipped.
+        """
+        dates = conversions.map_unique(
+            df['Date'], lambda uniques: conversions.to_datetime(uniques, errors='coerce').dt.strftime('%Y-%m-%d')
+        )
+        categories = df['Category'].astype(object).where(df['Category'].notna(), None)
+        notes = df['Note'] if 'Note' in df.columns else pd.Series(None, index=df.index)
+        delta = pd.DataFrame({
+            'date': dates.astype(object).where(dates.notna(), None),
+            'category': categories.map(lambda category: None if category is None else str(category).strip() or None),
+            'amount': conversions.to_numeric(df['Amount'], errors='coerce').astype(float),
+            'note': notes.astype(object).where(notes.notna(), None),
+        })
+        delta = delta.dropna(subset=['date', 'category', 'amount'])
+        skipped = len(df) - len(delta)
+        # Only the new rows are aggregated, then merged into the stored totals
+        by_category = delta.groupby('category')['amount'].agg(['sum', 'count'])
+        by_month = delta.groupby(delta['date'].str[:7])['amount'].agg(['sum', 'count'])
+
+        with self.lock, self.conn:
+            imported = self.conn.execute("SELECT parts FROM imports WHERE digest = ?", (digest,)).fetchone()
+            if imported is not None and part < imported[0]:
+                return 0, 0
+            self.conn.executemany(
+                "INSERT INTO expenses (date, category, amount, note) VALUES (?, ?, ?, ?)",
+                delta.itertuples(index=False, name=None)
+            )
+            self._add_totals('category_totals', 'category', by_category.itertuples(name=None))
+            self._add_totals('monthly_totals', 'month', by_month.itertuples(name=None))
+            self.conn.execute(
+                "INSERT INTO imports (digest, rows, parts) VALUES (?, ?, ?) "
+                "ON CONFLICT (digest) DO UPDATE SET rows = rows + excluded.rows, parts = excluded.parts",
+                (digest, len(delta), part + 1)
+            )
+        return len(delta), skipped
+
+    def rebuild_totals(self):
+        """Recompute the category and monthly totals from all expenses"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM category_totals")
+            self.conn.execute("DELETE FROM monthly_totals")
+            self.conn.execute(
+                "INSERT INTO category_totals SELECT category, SUM(amount), COUNT(*) FROM expenses GROUP BY category"
+            )
+            self.conn.execute(
+                "INSERT INTO monthly_totals SELECT substr(date, 1, 7), SUM(amount), COUNT(*) FROM expenses "
+                "GROUP BY substr(date, 1, 7)"
+            )
+
+    def clear(self):
+        """Delete all expenses and forget the imported uploads"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM expenses")
+            self.conn.execute("DELETE FROM category_totals")
+            self.conn.execute("DELETE FROM monthly_totals")
+            self.conn.execute("DELETE FROM imports")
+
+    def query(self, sql, params=(), columns=None):
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            rows = cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns or [d[0] for d in cursor.description])
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+
+    def summary(self, recent=10):
+        """Totals, category, recent and monthly summaries, keyed like analysis.expense_summary"""
+        with self.lock:
+            count, total = self.conn.execute(
+                "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(amount), 0) FROM category_totals"
+            ).fetchone()
+
+        category_expenses = self.query(
+            "SELECT category, amount FROM category_totals ORDER BY amount DESC",
+            columns=['Category', 'Amount']
+        )
+        recent_expenses = self.query(
+            "SELECT date, category, amount, note FROM expenses ORDER BY date DESC LIMIT ?", (recent,),
+            columns=['Date', 'Category', 'Amount', 'Note']
+        )
+        recent_expenses['Date'] = pd.to_datetime(recent_expenses['Date'])
+        monthly_expenses = self.query(
+            "SELECT month, amount FROM monthly_totals ORDER BY month",
+            columns=['Month', 'Amount']
+        )
+        return {
+            'total_expenses': total,
+            'expense_count': count,
+            'avg_expense': total / count if count else 0.0,
+            'category_expenses': category_expenses,
+            'recent_expenses': recent_expenses,
+            'monthly_expenses': monthly_expenses,
+        }
+
+    def frame(self):
+        """The whole history as a frame, in insertion order"""
+        df = self.query(
+            "SELECT date, category, amount, note FROM expenses ORDER BY id",
+            columns=['Date', 'Category', 'Amount', 'Note']
+        )
+        df['Date'] = conversions.to_datetime(df['Date'])
+        return df
+
+def user_path(user):
+    """Database file of one user in STORE_DIR"""
+    name = hashlib.sha256(str(user).encode()).hexdigest()[:32]
+    return os.path.join(STORE_DIR, f"{name}.db")
+
+def local_path():
+    """Database file in STORE_DIR used when nobody is logged in"""
+    return os.path.join(STORE_DIR, "local.db")
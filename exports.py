@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import io
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+import parallel
+
+# Export formats shared by the console tool and the Streamlit app. CSV is
+# encoded in row chunks and, for the compressed formats, every chunk is
+# compressed on its own: concatenated gzip members and zstd frames are
+# valid files, so large frames are encoded and compressed in parallel.
+# zstd needs the zstandard package and Parquet needs pyarrow, formats
+# whose package is missing are not offered.
+
+CHUNK_ROWS = 200000
+
+FORMATS = {
+    'csv': {'extension': '.csv', 'mime': 'text/csv'},
+    'csv.gz': {'extension': '.csv.gz', 'mime': 'application/gzip'},
+    'csv.zst': {'extension': '.csv.zst', 'mime': 'application/zstd'},
+    'parquet': {'extension': '.parquet', 'mime': 'application/vnd.apache.parquet'},
+}
+
+def available_formats():
+    """Formats whose optional packages are installed"""
+    formats = ['csv', 'csv.gz']
+    try:
+        import zstandard  # noqa: F401
+        formats.append('csv.zst')
+    except ImportError:
+        pass
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append('parquet')
+    except ImportError:
+        pass
+    return formats
+
+def file_name(base_name, fmt):
+    """base_name with the extension of fmt, e.g. sales.csv -> sales.csv.gz"""
+    for spec in FORMATS.values():
+        if base_name.endswith(spec['extension']):
+            base_name = base_name[:-len(spec['extension'])]
+            break
+    return base_name + FORMATS[fmt]['extension']
+
+def frame_digest(df):
+    """Hash of the contents of df, used as export cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def encode_csv(chunk, fmt, header):
+    """CSV bytes of one chunk, compressed for csv.gz and csv.zst"""
+    data = chunk.to_csv(index=False, header=header).encode('utf-8')
+    if fmt == 'csv.gz':
+        return gzip.compress(data, compresslevel=6)
+    if fmt == 'csv.zst':
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+class ExportWriter:
+    """Write a frame chunk by chunk to a path or binary file in one format
+
+    Parquet is staged in a temporary file and copied to the target on
+    close. When a chunk needs wider column types than the chunks before
+    it (integers that turn float, columns that were all missing), the
+    staged row groups are rewritten with the promoted schema.
+    """
+
+    def __init__(self, target, fmt):
+        if fmt not in available_formats():
+            raise ValueError(f"format {fmt} is not available, install its optional package")
+        self.fmt = fmt
+        self.owns_file = isinstance(target, str)
+        self.file = open(target, 'wb') if self.owns_file else target
+        self.header = True
+        self.parquet = None
+        self.staged = None
+        self.rows = 0
+
+    def write(self, chunk):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.parquet is None:
+                self.staged = tempfile.TemporaryFile()
+                self.parquet = pq.ParquetWriter(self.staged, table.schema)
+            elif not table.schema.equals(self.parquet.schema):
+                try:
+                    schema = pa.unify_schemas([self.parquet.schema, table.schema], promote_options='permissive')
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    raise ValueError(f"chunks have incompatible column types: {e}") from None
+                if not schema.equals(self.parquet.schema):
+                    self.promote(schema)
+                table = table.cast(schema)
+            self.parquet.write_table(table)
+        else:
+            self.write_encoded(encode_csv(chunk, self.fmt, self.header))
+        self.rows += len(chunk)
+
+    def promote(self, schema):
+        """Rewrite the staged row groups with schema and keep writing with it"""
+        import pyarrow.parquet as pq
+        self.parquet.close()
+        self.staged.seek(0)
+        previous = self.staged
+        self.staged = tempfile.TemporaryFile()
+        self.parquet = pq.ParquetWriter(self.staged, schema)
+        for batch in pq.ParquetFile(previous).iter_batches():
+            self.parquet.write_batch(batch.cast(schema))
+        previous.close()
+
+    def write_encoded(self, data):
+        """Append CSV bytes already produced by encode_csv"""
+        self.file.write(data)
+        self.header = False
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+            self.staged.seek(0)
+            shutil.copyfileobj(self.staged, self.file)
+            self.staged.close()
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_frame(df, target, fmt, workers=parallel.DEFAULT_WORKERS, min_rows=parallel.MIN_PARALLEL_ROWS,
+                threads=False):
+    """Write df to a path or binary file, encoding CSV chunks in parallel for large frames
+
+    The chunks are encoded in worker processes, or in threads with
+    threads=True for callers that must not start processes (the app).
+    """
+    with ExportWriter(target, fmt) as writer:
+        if fmt == 'parquet':
+            # pyarrow already encodes columns on several threads
+            writer.write(df)
+            return writer.rows
+
+        parts = parallel.split_frame(df, max(1, -(-len(df) // CHUNK_ROWS)))
+        if not parts:
+            writer.write(df)
+        elif parallel.use_parallel(df, workers, min_rows):
+            writer.write_encoded(encode_csv(df.head(0), fmt, True))
+            executor = ThreadPoolExecutor if threads else ProcessPoolExecutor
+            with executor(max_workers=workers) as pool:
+                # map() hands the chunks back in order as they finish
+                for data in pool.map(encode_csv, parts, repeat(fmt), repeat(False)):
+                    writer.write_encoded(data)
+            writer.rows = len(df)
+        else:
+            for part in parts:
+                writer.write(part)
+        return writer.rows
+
+def export_bytes(df, fmt, workers=parallel.DEFAULT_WORKERS, min_rows=parallel.MIN_PARALLEL_ROWS):
+    """df serialized in fmt as bytes, encoded on threads so it is safe in the Streamlit server"""
+    buffer = io.BytesIO()
+    write_frame(df, buffer, fmt, workers, min_rows, threads=True)
+    return buffer.getvalue()
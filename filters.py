@@ -0,0 +1,337 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+import conversions
+import schema
+
+# Filter expressions for Search Data, e.g.
+#   Amount > 500 and Category in (Food, Bills) and Date >= 2024-01
+# An expression is parsed once into conditions joined by 'and'. Every
+# condition compares a column with typed values: numbers for numeric
+# columns, dates for date columns (a partial date such as 2024 or 2024-01
+# stands for the whole year or month), text otherwise. Text columns
+# holding numbers or dates are compared as such, parsing each distinct
+# value once, and the conditions of categorical columns are evaluated on
+# the categories only. Before filtering, the conditions are ordered by
+# how many rows of a sample they keep, most selective first, and each
+# condition only looks at the rows the previous ones kept. Missing values
+# never match.
+
+SAMPLE_ROWS = 1000
+
+COMPARISONS = ('=', '!=', '<', '<=', '>', '>=')
+KEYWORDS = ('and', 'not', 'in', 'contains')
+
+TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>'[^']*'|"[^"]*")
+      | `(?P<name>[^`]+)`
+      | (?P<op><=|>=|!=|==|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s,()<>=!'"`]+)
+    )""", re.VERBOSE)
+
+DATE_LITERAL = re.compile(r'^\d{4}[-/]\d{1,2}([-/]\d{1,2})?([ T][\d:.]+)?$')
+# A bare year is a date for columns holding dates, a number otherwise
+YEAR_LITERAL = re.compile(r'^\d{4}$')
+
+def tokenize(text):
+    """(kind, text) tokens of a filter expression"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"unexpected '{text[position:].strip()}'")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = value[1:-1]
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+def _number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def _date_range(value):
+    """(first, last) timestamp covered by a possibly partial date, e.g. a whole month for 2024-01"""
+    try:
+        period = pd.Period(value)
+        return period.start_time, period.end_time
+    except (ValueError, TypeError):
+        pass
+    try:
+        timestamp = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"'{value}' is not a date") from None
+    if pd.isna(timestamp):
+        raise ValueError(f"'{value}' is not a date")
+    return timestamp, timestamp
+
+def _mask(result):
+    """Boolean numpy mask, missing results are False"""
+    if isinstance(result, np.ndarray) and result.dtype == bool:
+        return result
+    return pd.array(result, dtype='boolean').to_numpy(dtype=bool, na_value=False)
+
+class Condition:
+    """column op values, e.g. ('Amount', '>', ['500']) or ('Category', 'in', ['Food', 'Bills'])
+
+    op is one of COMPARISONS, 'in' or 'contains', negate turns 'in' and
+    'contains' into 'not in' and 'not contains'.
+    """
+
+    def __init__(self, column, op, values, negate=False):
+        self.column = column
+        self.op = op
+        self.values = values
+        self.negate = negate
+        # Literals converted once per kind ('number', 'date', ...)
+        self.literals = {}
+
+    def __str__(self):
+        op = f"not {self.op}" if self.negate else self.op
+        if self.op == 'in':
+            return f"{self.column} {op} ({', '.join(self.values)})"
+        return f"{self.column} {op} {self.values[0]}"
+
+    def literal(self, kind):
+        if kind not in self.literals:
+            if kind == 'number':
+                numbers = [_number(value) for value in self.values]
+                bad = [value for value, number in zip(self.values, numbers) if number is None]
+                if bad:
+                    raise ValueError(f"'{bad[0]}' is not a number, '{self.column}' is numeric")
+                self.literals[kind] = numbers
+            elif kind == 'date':
+                self.literals[kind] = [_date_range(value) for value in self.values]
+            elif kind == 'bool':
+                truth = {'true': True, 'yes': True, '1': True, 'false': False, 'no': False, '0': False}
+                if any(value.lower() not in truth for value in self.values):
+                    raise ValueError(f"'{self.column}' is true/false")
+                self.literals[kind] = [truth[value.lower()] for value in self.values]
+        return self.literals[kind]
+
+    def text_kind(self, series):
+        """How the values of the text column series are compared: 'number', 'date' or 'text'"""
+        if self.op == 'contains':
+            return 'text'
+        if all(DATE_LITERAL.match(value) for value in self.values):
+            return 'date'
+        if all(YEAR_LITERAL.match(value) for value in self.values) and schema.looks_like_dates(series):
+            return 'date'
+        if self.op not in ('=', '!=', 'in') and all(_number(value) is not None for value in self.values):
+            return 'number'
+        return 'text'
+
+    def evaluate(self, series):
+        """Boolean numpy mask of the rows of series that match"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Decide once per category, then look the rows up by their codes
+            matches = self.evaluate(pd.Series(series.cat.categories))
+            codes = series.cat.codes.to_numpy()
+            return np.append(matches, False)[codes]
+        if self.op == 'contains':
+            if not (pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series)):
+                raise ValueError(f"contains needs a text column, '{self.column}' is {series.dtype}")
+            found = series.str.contains(self.values[0], case=False, regex=False, na=False)
+            return ~_mask(found) & series.notna().to_numpy() if self.negate else _mask(found)
+
+        if pd.api.types.is_bool_dtype(series):
+            return self._compare(series, self.literal('bool'))
+        if pd.api.types.is_numeric_dtype(series):
+            return self._compare(series, self.literal('number'))
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return self._compare_dates(series, self.literal('date'))
+
+        kind = self.text_kind(series)
+        if kind == 'number':
+            return self._compare(self._coerced(series, conversions.to_numeric, kind), self.literal('number'))
+        if kind == 'date':
+            return self._compare_dates(self._coerced(series, conversions.to_datetime, kind), self.literal('date'))
+        return self._compare(series, self.values)
+
+    def _coerced(self, series, convert, kind):
+        """convert(series) with unparseable values missing, ValueError when none of them parses"""
+        converted = convert(series, errors='coerce')
+        if converted.isna().all() and series.notna().any():
+            raise ValueError(f"'{self.column}' has no {kind} values to compare with {self.values[0]}")
+        return converted
+
+    def _compare(self, series, values):
+        valid = series.notna().to_numpy()
+        if self.op == 'in':
+            found = series.isin(values).to_numpy()
+            return valid & ~found if self.negate else found & valid
+        value = values[0]
+        if self.op == '=':
+            return _mask(series == value)
+        if self.op == '!=':
+            return valid & _mask(series != value)
+        if self.op == '<':
+            return _mask(series < value)
+        if self.op == '<=':
+            return _mask(series <= value)
+        if self.op == '>':
+            return _mask(series > value)
+        return _mask(series >= value)
+
+    def _compare_dates(self, series, ranges):
+        def within(first, last):
+            return _mask((series >= first) & (series <= last))
+
+        valid = series.notna().to_numpy()
+        if self.op in ('=', '!=', 'in'):
+            found = np.zeros(len(series), dtype=bool)
+            for first, last in ranges:
+                found |= within(first, last)
+            return valid & ~found if self.negate or self.op == '!=' else found
+        first, last = ranges[0]
+        if self.op == '<':
+            return _mask(series < first)
+        if self.op == '<=':
+            return _mask(series <= last)
+        if self.op == '>':
+            return _mask(series > last)
+        return _mask(series >= first)
+
+class Parser:
+    """Recursive descent over the tokens of one expression"""
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("unexpected end of the filter")
+        self.position += 1
+        return token
+
+    def keyword(self, *words):
+        """Consume and return the next token if it is one of words"""
+        kind, value = self.peek()
+        if kind == 'word' and value.lower() in words:
+            self.position += 1
+            return value.lower()
+        return None
+
+    def words(self, stop):
+        """Consecutive words joined by spaces, up to a keyword in stop"""
+        words = []
+        while self.peek()[0] == 'word' and self.peek()[1].lower() not in stop:
+            words.append(self.next()[1])
+        return ' '.join(words)
+
+    def value(self, stop=('and', 'or')):
+        if self.peek()[0] == 'string':
+            return self.next()[1]
+        value = self.words(stop)
+        if not value:
+            raise ValueError(f"expected a value, got '{self.peek()[1] or 'end of the filter'}'")
+        return value
+
+    def condition(self):
+        if self.peek()[0] in ('name', 'string'):
+            column = self.next()[1]
+        else:
+            column = self.words(KEYWORDS)
+        if not column:
+            raise ValueError(f"expected a column name, got '{self.peek()[1] or 'end of the filter'}'")
+
+        kind, value = self.peek()
+        if kind == 'op':
+            self.position += 1
+            return Condition(column, '=' if value == '==' else value, [self.value()])
+        negate = self.keyword('not') is not None
+        op = self.keyword('in', 'contains')
+        if op is None:
+            raise ValueError(f"expected a comparison, 'in' or 'contains' after '{column}'")
+        if op == 'contains':
+            return Condition(column, op, [self.value()], negate)
+
+        if self.next() != ('punct', '('):
+            raise ValueError(f"expected '(' after '{column} in'")
+        values = [self.value(stop=())]
+        while self.peek() == ('punct', ','):
+            self.position += 1
+            values.append(self.value(stop=()))
+        if self.next() != ('punct', ')'):
+            raise ValueError(f"expected ')' to close the list of '{column} in'")
+        return Condition(column, op, values, negate)
+
+    def parse(self):
+        conditions = [self.condition()]
+        while self.peek()[0] is not None:
+            if self.keyword('and') is None:
+                kind, value = self.peek()
+                if kind == 'word' and value.lower() == 'or':
+                    raise ValueError("only 'and' is supported between conditions")
+                raise ValueError(f"expected 'and' after '{conditions[-1]}', got '{value}'")
+            conditions.append(self.condition())
+        return conditions
+
+class Filter:
+    """A parsed filter expression, see parse()"""
+
+    def __init__(self, text, conditions):
+        self.text = text
+        self.conditions = conditions
+
+    def __str__(self):
+        return ' and '.join(str(condition) for condition in self.conditions)
+
+    def plan(self, frame):
+        """[(condition, estimated fraction of rows kept)] ordered most selective first"""
+        if len(self.conditions) == 1 or len(frame) <= 2 * SAMPLE_ROWS:
+            return [(condition, None) for condition in self.conditions]
+        rng = np.random.default_rng(0)
+        sample = frame.iloc[np.sort(rng.choice(len(frame), SAMPLE_ROWS, replace=False))]
+        estimates = [(condition, condition.evaluate(sample[condition.column]).mean())
+                     for condition in self.conditions]
+        return sorted(estimates, key=lambda estimate: estimate[1])
+
+    def positions(self, frame, plan=None):
+        """Row positions of frame matching every condition"""
+        positions = None
+        for condition, _ in plan or self.plan(frame):
+            column = frame[condition.column]
+            if positions is None:
+                positions = np.flatnonzero(condition.evaluate(column))
+            else:
+                positions = positions[condition.evaluate(column.iloc[positions])]
+            if len(positions) == 0:
+                break
+        return positions
+
+    def apply(self, frame):
+        return frame.iloc[self.positions(frame)]
+
+def resolve(column, columns):
+    """column as named in columns, matched case-insensitively when there is no exact match"""
+    if column in columns:
+        return column
+    matches = [name for name in columns if str(name).lower() == column.lower()]
+    if len(matches) == 1:
+        return matches[0]
+    raise ValueError(f"unknown column '{column}'")
+
+def parse(text, columns=None):
+    """Filter for an expression, column names are checked against columns when given"""
+    conditions = Parser(text).parse()
+    if columns is not None:
+        columns = list(columns)
+        for condition in conditions:
+            condition.column = resolve(condition.column, columns)
+    return Filter(text, conditions)
@@ -0,0 +1,232 @@
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Derived structures that speed up repeated queries on the loaded data.
+# They are built lazily and the console tool drops them when the data
+# they were built from changes.
+
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+
+class TrigramIndex:
+    """Inverted index from lower-cased character trigrams to rows of one column
+
+    Only the distinct values of the column are stringified and indexed,
+    rows are then found through the value codes, so a query touches only
+    the rows whose value actually matches.
+    """
+
+    def __init__(self, series):
+        start = time.perf_counter()
+
+        # Missing values get code -1 and never match, like na=False
+        codes, uniques = pd.factorize(series)
+        self.values = [str(value).lower() for value in uniques]
+
+        # Rows grouped by value code: rows of value u are
+        # row_order[offsets[u]:offsets[u + 1]]
+        valid = codes >= 0
+        self.row_order = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(codes[valid], minlength=len(uniques)))))
+
+        postings = {}
+        for value_id, text in enumerate(self.values):
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                postings.setdefault(trigram, []).append(value_id)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+        self.build_seconds = time.perf_counter() - start
+
+    @property
+    def memory_bytes(self):
+        """Approximate memory used by the index"""
+        size = self.row_order.nbytes + self.offsets.nbytes
+        size += sum(ids.nbytes for ids in self.postings.values())
+        size += sys.getsizeof(self.postings) + sum(sys.getsizeof(gram) for gram in self.postings)
+        size += sum(sys.getsizeof(text) for text in self.values)
+        return size
+
+    def candidates(self, query):
+        """Value ids that contain every trigram of a literal query"""
+        trigrams = {query[i:i + 3] for i in range(len(query) - 2)}
+        if not trigrams:
+            return range(len(self.values))
+
+        # Intersect the shortest posting lists first
+        lists = sorted((self.postings.get(gram) for gram in trigrams), key=lambda ids: -1 if ids is None else len(ids))
+        if lists[0] is None:
+            return []
+        result = lists[0]
+        for ids in lists[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    def search(self, query):
+        """Row positions whose value contains query, case-insensitive
+
+        The query is a regular expression like in str.contains; plain
+        text queries use the trigrams, patterns are checked against the
+        distinct values only.
+        """
+        lowered = query.lower()
+        if not REGEX_CHARS.intersection(query):
+            matched = [i for i in self.candidates(lowered) if lowered in self.values[i]]
+        else:
+            pattern = re.compile(query, re.IGNORECASE)
+            matched = [i for i, text in enumerate(self.values) if pattern.search(text)]
+
+        if not matched:
+            return np.array([], dtype=np.intp)
+        rows = np.concatenate([self.row_order[self.offsets[i]:self.offsets[i + 1]] for i in matched])
+        return np.sort(rows)
+
+    def reorder(self, inverse):
+        """Follow the rows after the frame was reordered (see SortIndex.reorder)"""
+        self.row_order = inverse[self.row_order]
+
+def top_n_positions(series, n, largest=True):
+    """Row positions of the n largest (or smallest) values, best first
+
+    Uses partial selection (nlargest/nsmallest), types that do not
+    support it such as strings fall back to a full sort. Missing values
+    are left out.
+    """
+    values = series.reset_index(drop=True).dropna()
+    try:
+        picked = values.nlargest(n) if largest else values.nsmallest(n)
+    except TypeError:
+        picked = values.sort_values(ascending=not largest, kind='stable').head(n)
+    return picked.index.to_numpy()
+
+class SortIndex:
+    """Cached sort permutations per (column, direction)
+
+    A permutation holds the row positions in sorted order. After the frame
+    itself is reordered the cached permutations are remapped instead of
+    being sorted again.
+    """
+
+    def __init__(self):
+        self.permutations = {}
+
+    def permutation(self, series, ascending=True):
+        """Row positions that sort the column, missing values last"""
+        key = (series.name, ascending)
+        if key not in self.permutations:
+            values = series.reset_index(drop=True)
+            self.permutations[key] = values.sort_values(ascending=ascending, kind='stable').index.to_numpy()
+        return self.permutations[key]
+
+    def top_n(self, series, n, largest=True):
+        """Row positions of the n largest (or smallest) values, best first, without missing values"""
+        key = (series.name, not largest)
+        if key in self.permutations:
+            # Missing values sort last, so only the tail of the prefix can be missing
+            positions = self.permutations[key][:n]
+            return positions[series.iloc[positions].notna().to_numpy()]
+        return top_n_positions(series, n, largest)
+
+    def invalidate(self, column=None):
+        """Drop the permutations of one column, or all of them"""
+        if column is None:
+            self.permutations.clear()
+        else:
+            for key in [key for key in self.permutations if key[0] == column]:
+                del self.permutations[key]
+
+    def reorder(self, positions):
+        """Remap every permutation after the frame was reordered by positions
+
+        Returns the inverse permutation so other indexes can be remapped too.
+        """
+        inverse = np.empty_like(positions)
+        inverse[positions] = np.arange(len(positions))
+        for key, permutation in self.permutations.items():
+            self.permutations[key] = inverse[permutation]
+        return inverse
+
+CUBE_MAX_GROUPS = 1000
+CUBE_STATS = ['sum', 'count', 'min', 'max', 'sum_sq']
+
+class PivotCube:
+    """Pre-aggregated partials per low-cardinality column for instant pivots
+
+    For every dimension (a column with at most CUBE_MAX_GROUPS distinct
+    values) it keeps sum, count, min, max and sum of squares of every
+    numeric column per group. These partials are mergeable, so cubes built
+    on separate parts of the data can be combined with merge().
+    """
+
+    def __init__(self, df=None, dimensions=None):
+        self.parts = {}
+        self.build_seconds = 0.0
+        if df is not None:
+            self.build(df, dimensions)
+
+    def build(self, df, dimensions=None):
+        start = time.perf_counter()
+        measures = list(df.select_dtypes(include=['number']).columns)
+        if dimensions is None:
+            dimensions = [col for col in df.columns if df[col].nunique() <= CUBE_MAX_GROUPS]
+
+        if measures:
+            squares = df[measures].astype(float) ** 2
+            for dim in dimensions:
+                grouped = df.groupby(dim, observed=True)[measures]
+                parts = grouped.agg(['sum', 'count', 'min', 'max'])
+                sum_sq = squares.groupby(df[dim], observed=True).sum()
+                for col in measures:
+                    parts[(col, 'sum_sq')] = sum_sq[col]
+                self.parts[dim] = parts
+        self.build_seconds = time.perf_counter() - start
+
+    def merge(self, other):
+        """Combine with a cube built on other rows of the same data"""
+        for dim, parts in other.parts.items():
+            if dim not in self.parts:
+                self.parts[dim] = parts
+                continue
+            mine = self.parts[dim]
+            merged = mine.add(parts, fill_value=0)
+            for stat, combine in (('min', np.fmin), ('max', np.fmax)):
+                columns = [col for col in mine.columns if col[1] == stat]
+                left = mine[columns].reindex(merged.index)
+                right = parts[columns].reindex(merged.index)
+                merged[columns] = combine(left.to_numpy(dtype=float), right.to_numpy(dtype=float))
+            self.parts[dim] = merged
+        self.build_seconds += other.build_seconds
+        return self
+
+    def can_answer(self, index_col, value_col, aggfunc):
+        parts = self.parts.get(index_col)
+        return (parts is not None and (value_col, 'sum') in parts.columns
+                and aggfunc in ('sum', 'mean', 'count', 'min', 'max', 'std', 'var'))
+
+    def pivot(self, index_col, value_col, aggfunc):
+        """Answer pd.pivot_table(index=index_col, values=value_col, aggfunc=aggfunc) from the partials"""
+        parts = self.parts[index_col]
+        count = parts[(value_col, 'count')]
+        total = parts[(value_col, 'sum')]
+        if aggfunc == 'mean':
+            result = total / count
+        elif aggfunc in ('std', 'var'):
+            result = (parts[(value_col, 'sum_sq')] - total ** 2 / count) / (count - 1)
+            result = result.clip(lower=0).where(count > 1)
+            if aggfunc == 'std':
+                result = np.sqrt(result)
+        else:
+            result = parts[(value_col, aggfunc)]
+
+        # Like pivot_table, groups without any value sum and count to 0,
+        # other aggregations leave out the groups they have no result for
+        if aggfunc not in ('sum', 'count'):
+            result = result.dropna()
+        result = result.sort_index()
+        if aggfunc == 'count':
+            result = result.astype('int64')
+        return result.rename(value_col).to_frame()
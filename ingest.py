@@ -0,0 +1,114 @@
+import glob
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import columnar_cache
+
+# Loading many CSV files (one per day, one per station, ...) as a single
+# dataset. A path may name a file, a directory of CSV files or a glob.
+# The headers of all files are checked against each other once, before
+# anything is parsed, then the files are parsed on a thread pool (the
+# CSV parser releases the GIL while tokenizing) and concatenated in one
+# step. An optional categorical column records the file of every row.
+# Sources are paths or, for uploads, the file contents as bytes.
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+SOURCE_COLUMN = 'source_file'
+
+def expand(path):
+    """Sorted CSV files named by a file path, a directory or a glob pattern
+
+    An existing file is never read as a pattern, e.g. sales[2024].csv.
+    """
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(glob.escape(path), '*.csv')))
+    elif os.path.isfile(path):
+        return [path]
+    elif glob.has_magic(path):
+        files = sorted(name for name in glob.glob(path) if os.path.isfile(name))
+    else:
+        return [path]
+    if not files:
+        raise FileNotFoundError(f"no CSV files match {path}")
+    return files
+
+def _open(source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def read_header(source):
+    return list(pd.read_csv(_open(source), nrows=0).columns)
+
+def check_headers(sources, names):
+    """Columns shared by all sources, ValueError naming the first source that differs"""
+    columns = read_header(sources[0])
+    for source, name in zip(sources[1:], names[1:]):
+        header = read_header(source)
+        if header != columns:
+            raise ValueError(f"{name} has columns {header}, expected {columns} like {names[0]}")
+    return columns
+
+def read_source(source):
+    """Parse one source, files reuse their columnar cache"""
+    if isinstance(source, bytes):
+        return pd.read_csv(io.BytesIO(source))
+    df = columnar_cache.load_cached(source)
+    if df is None:
+        df = pd.read_csv(source)
+        columnar_cache.save_cached(source, df)
+    return df
+
+def unique_names(names):
+    """names with repeats numbered, e.g. two uploads called day.csv"""
+    seen = {}
+    unique = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        unique.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return unique
+
+def tag_source(frame, position, names, column):
+    """Add a categorical column with names[position] to every row, the categories are all names"""
+    codes = np.full(len(frame), position, dtype=np.int32)
+    frame[column] = pd.Categorical.from_codes(codes, categories=names)
+    return frame
+
+def read_frames(sources, names=None, workers=DEFAULT_WORKERS, source_column=None):
+    """Yield the frame of every source in order, all sources are parsed concurrently
+
+    names label the sources (default: the paths). With source_column
+    every frame gets a categorical column with the name of its source,
+    the categories are all names so the frames concatenate without
+    converting the column.
+    """
+    names = unique_names(names or [str(source) for source in sources])
+    check_headers(sources, names)
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(sources)))
+    try:
+        futures = [pool.submit(read_source, source) for source in sources]
+        for i, future in enumerate(futures):
+            frame = future.result()
+            if source_column:
+                frame = tag_source(frame, i, names, source_column)
+            yield frame
+    finally:
+        # A failed source or a consumer that stops early cancels the rest
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def read_many(sources, names=None, workers=DEFAULT_WORKERS, source_column=None, progress=None):
+    """All sources as one frame, concatenated once
+
+    progress, when given, is called with (sources parsed, total) after
+    every source.
+    """
+    frames = []
+    for frame in read_frames(sources, names, workers, source_column):
+        frames.append(frame)
+        if progress is not None:
+            progress(len(frames), len(sources))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
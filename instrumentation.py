@@ -0,0 +1,146 @@
+import builtins
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# Per-operation timing and memory records for the console tool and the
+# Streamlit app. Each record holds the wall time, rows in/out and the
+# change in resident memory of one operation or compute stage.
+
+MAX_RECORDS = 1000
+
+def current_memory_bytes():
+    """Resident memory of this process in bytes, or None if unknown"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class Recorder:
+    """Thread-safe, size-bounded list of operation records"""
+
+    def __init__(self, max_records=MAX_RECORDS):
+        self.records = deque(maxlen=max_records)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def record(self, source, operation, rows_in=None, exclusive=False):
+        """Time the enclosed block; set entry['rows_out'] inside it
+
+        An exclusive record leaves out the time of the records nested in it
+        on the same thread, e.g. rendering around read and compute stages.
+        """
+        entry = {
+            'source': source,
+            'operation': operation,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'seconds': None,
+            'rows_in': rows_in,
+            'rows_out': None,
+            'memory_delta_mb': None,
+            'status': 'ok',
+            'paused': 0.0,
+            'exclusive': exclusive,
+        }
+        active = self.local.__dict__.setdefault('active', [])
+        active.append(entry)
+        memory_before = current_memory_bytes()
+        start = time.perf_counter()
+        try:
+            yield entry
+        except BaseException:
+            entry['status'] = 'error'
+            raise
+        finally:
+            entry['seconds'] = time.perf_counter() - start - entry.pop('paused')
+            memory_after = current_memory_bytes()
+            if memory_before is not None and memory_after is not None:
+                entry['memory_delta_mb'] = (memory_after - memory_before) / 1024 / 1024
+            active.remove(entry)
+            for outer in active:
+                if outer['exclusive']:
+                    outer['paused'] += entry['seconds']
+            del entry['exclusive']
+            with self.lock:
+                self.records.append(entry)
+
+    @contextmanager
+    def paused(self):
+        """Leave the time of the enclosed block out of the running records of this thread"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            waited = time.perf_counter() - start
+            for entry in getattr(self.local, 'active', []):
+                entry['paused'] += waited
+
+    def prompt(self, text=""):
+        """input() whose waiting time is not counted in the running operations"""
+        with self.paused():
+            return builtins.input(text)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+    def to_frame(self):
+        return pd.DataFrame(self.snapshot(), columns=[
+            'source', 'operation', 'started_at', 'seconds', 'rows_in', 'rows_out', 'memory_delta_mb', 'status'
+        ])
+
+    def summary(self):
+        """Count, total, mean and max seconds per (source, operation)"""
+        frame = self.to_frame()
+        if frame.empty:
+            return frame
+        return frame.groupby(['source', 'operation'])['seconds'].agg(['count', 'sum', 'mean', 'max'])
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+# The console records into the module recorder, every app session
+# into its own one, see use()
+recorder = Recorder()
+_current = threading.local()
+
+def current():
+    """Recorder of this thread"""
+    return getattr(_current, 'recorder', None) or recorder
+
+@contextmanager
+def use(target):
+    """Send the records made on this thread inside the block to target"""
+    previous = getattr(_current, 'recorder', None)
+    _current.recorder = target
+    try:
+        yield target
+    finally:
+        _current.recorder = previous
+
+def record(source, operation, rows_in=None, exclusive=False):
+    return current().record(source, operation, rows_in, exclusive)
+
+def prompt(text=""):
+    return current().prompt(text)
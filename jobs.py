@@ -0,0 +1,132 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+# Background jobs for the Streamlit app. The compute stage of a tool runs
+# on a shared thread pool instead of inside the script run, so the page
+# keeps responding while a large upload is parsed and aggregated. A job
+# reports its progress and an optional partial result, which the page
+# polls and renders. Every slot (one per session and tool) has at most
+# one current job: submitting another key cancels the superseded one,
+# which stops at its next progress update.
+
+DEFAULT_WORKERS = 4
+CHUNK_ROWS = 100000
+
+class JobCancelled(Exception):
+    """Raised inside a job once it was cancelled"""
+
+class Job:
+    """One background computation with progress, partial result and cancellation
+
+    func receives the job and calls update() between steps, its return
+    value is the result of the job.
+    """
+
+    def __init__(self, key, func):
+        self.key = key
+        self.func = func
+        self.progress = 0.0
+        self.message = ""
+        self.partial = None
+        self.started_at = time.perf_counter()
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def run(self):
+        return self.func(self)
+
+    def update(self, progress, message=None, partial=None):
+        """Report progress between 0 and 1, raises JobCancelled once the job was cancelled"""
+        if self.cancelled:
+            raise JobCancelled()
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def wait(self, timeout=None):
+        """Wait up to timeout seconds, return whether the job is done"""
+        wait([self.future], timeout)
+        return self.done
+
+    @property
+    def error(self):
+        """Exception the finished job raised, None while it runs or when it succeeded"""
+        if not self.done or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    def result(self):
+        return self.future.result()
+
+class JobPool:
+    """Thread pool running one current job per slot
+
+    Slots are (owner, name) tuples, e.g. one per browser session and tool.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def submit(self, slot, key, func, restart=False):
+        """The job of slot for key, started unless it is already the current job
+
+        A current job for another key is cancelled, restart starts key again
+        even when it is current, e.g. after it was cancelled.
+        """
+        with self.lock:
+            job = self.jobs.get(slot)
+            if job is not None and job.key == key and not restart:
+                return job
+            if job is not None:
+                job.cancel()
+            job = Job(key, func)
+            job.future = self.executor.submit(job.run)
+            self.jobs[slot] = job
+            return job
+
+    def get(self, slot):
+        with self.lock:
+            return self.jobs.get(slot)
+
+    def discard(self, slot, job):
+        """Forget job once its result was taken, unless it was superseded already"""
+        with self.lock:
+            if self.jobs.get(slot) is job:
+                del self.jobs[slot]
+
+    def retain(self, owner, slots):
+        """Cancel and forget the jobs of owner whose slot is not in slots"""
+        with self.lock:
+            for slot in [slot for slot in self.jobs if slot[0] == owner and slot not in slots]:
+                self.jobs.pop(slot).cancel()
+
+def csv_chunks(data, chunk_rows=CHUNK_ROWS, **kwargs):
+    """Yield (chunk, fraction of the bytes parsed so far) for CSV bytes"""
+    buffer = io.BytesIO(data)
+    with pd.read_csv(buffer, chunksize=chunk_rows, **kwargs) as reader:
+        for chunk in reader:
+            yield chunk, buffer.tell() / max(len(data), 1)
@@ -1,11 +1,77 @@
 import pandas as pd
+import numpy as np
+import atexit
 import os
+import shutil
+import tempfile
 from datetime import datetime
 
+import columnar_cache
+import conversions
+import dedup
+import exports
+import filters
+import indexes
+import ingest
+import instrumentation
+import parallel
+import schema
+import sketches
+
 # Global variables
 df = None
 filename = ""
 
+# Files the data was loaded from (several for a directory or glob), with
+# source_column naming the column that records the file of every row
+source_files = []
+source_column = None
+
+# Streaming mode: df only holds a preview chunk, the recorded
+# operations are replayed chunk by chunk over the file
+DEFAULT_CHUNK_SIZE = 100000
+streaming = False
+chunk_size = DEFAULT_CHUNK_SIZE
+chunk_ops = []
+
+# Temporary directory holding the deduplicated copy written by
+# remove_duplicates, deleted on the next load and at exit
+spill_dir = None
+
+# Lazy mode: operations are recorded in a plan which is optimized
+# and executed in one pass when the data is viewed or saved
+lazy = False
+plan = []
+
+# Search indexes and sort permutations built on demand per column,
+# dropped when the data changes
+search_indexes = {}
+sort_index = indexes.SortIndex()
+
+# Optional pivot cube, use_cube is None until the user was asked
+pivot_cube = None
+use_cube = None
+
+# From this many rows view_summary offers the approximate one-pass summary
+APPROX_SUMMARY_ROWS = 1000000
+
+# Files written by save_data per (content hash, format), an unchanged
+# frame is copied from its last export instead of being serialized again
+saved_exports = {}
+
+# Loaded frames get compact dtypes (categoricals, downcast integers),
+# load_memory holds the memory in MB before and after, see Settings
+compact_dtypes = True
+arrow_strings = False
+load_memory = None
+
+# Process pool used for large frames, see Settings
+workers = parallel.DEFAULT_WORKERS
+parallel_min_rows = parallel.MIN_PARALLEL_ROWS
+
+# Every menu operation is timed, see Performance. Operations ask through
+# instrumentation.prompt so time spent waiting for an answer is not counted.
+
 def display_menu():
     """Display the main menu"""
     print("\n" + "="*50)
@@ -20,26 +86,400 @@ def display_menu():
     print("7. 📊 Create Pivot Table")
     print("8. 📋 View Data Summary")
     print("9. 💾 Save Cleaned Data")
+    print("10. ⚙️  Settings")
+    print("11. ⏱️  Performance")
     print("0. 🚪 Exit")
     print("="*50)
 
+def data_changed(column=None):
+    """Drop cached indexes after df was modified (one column or everything)"""
+    global pivot_cube
+    pivot_cube = None
+    if column is None:
+        search_indexes.clear()
+    else:
+        search_indexes.pop(column, None)
+    sort_index.invalidate(column)
+
+def rows_reordered(positions):
+    """Keep cached indexes valid after df was reordered by row positions"""
+    inverse = sort_index.reorder(positions)
+    for index in search_indexes.values():
+        index.reorder(inverse)
+
+def get_search_index(column):
+    """Return the trigram index for a column, building it on first use"""
+    if column not in search_indexes:
+        search_indexes[column] = indexes.TrigramIndex(df[column])
+        index = search_indexes[column]
+        print(f"🗂️  Built search index for '{column}' in {index.build_seconds:.2f}s")
+    return search_indexes[column]
+
+def convert_column(series, type_choice):
+    """Convert a column to the chosen data type"""
+    if type_choice == "1":
+        return conversions.to_numeric(series, errors='coerce').astype('Int64')
+    elif type_choice == "2":
+        return conversions.to_numeric(series, errors='coerce')
+    elif type_choice == "3":
+        return series.astype(str)
+    elif type_choice == "4":
+        return conversions.to_datetime(series, errors='coerce')
+    return series
+
+def apply_ops(chunk, ops, seen):
+    """Apply recorded operations to one chunk
+
+    seen holds one digest set per dedup operation so duplicates are
+    detected across chunks, not just inside a single chunk.
+    """
+    for i, (op, arg) in enumerate(ops):
+        if op == "dropna":
+            chunk = chunk.dropna()
+        elif op == "fillna":
+            chunk = schema.fillna(chunk, arg)
+        elif op == "dedup":
+            digests = seen.setdefault(i, dedup.DigestSet())
+            chunk = chunk[digests.add_rows(chunk)]
+        elif op == "cast":
+            column, type_choice = arg
+            chunk = chunk.copy()
+            chunk[column] = convert_column(chunk[column], type_choice)
+    return chunk
+
+def stream_chunks():
+    """Yield chunks of the loaded files with all recorded operations applied"""
+    seen = {}
+    for position, path in enumerate(source_files):
+        with pd.read_csv(path, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                if source_column:
+                    chunk = ingest.tag_source(chunk, position, source_files, source_column)
+                yield apply_ops(chunk, chunk_ops, seen)
+
+def reset_stream(file_path, ops=()):
+    """Stream from file_path with only ops recorded, filename (used to name saves) is kept"""
+    global df, chunk_ops, source_files, source_column
+    with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+        df = apply_ops(reader.get_chunk(), ops, {})
+    source_files = [file_path]
+    source_column = None
+    chunk_ops = list(ops)
+    data_changed()
+
+def remove_spill():
+    """Delete the deduplicated copy written by remove_duplicates, if any"""
+    global spill_dir
+    if spill_dir is not None:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        spill_dir = None
+
+atexit.register(remove_spill)
+
+def record_op(op, arg=None):
+    """Record an operation for streaming or lazy mode"""
+    global df
+    if lazy:
+        plan.append((op, arg))
+        print(f"📝 Added to plan ({len(plan)} pending operations)")
+        return
+    # Apply to the preview first so a failing operation is not recorded
+    df = apply_ops(df, [(op, arg)], {})
+    chunk_ops.append((op, arg))
+
+def optimize_plan(ops):
+    """Rewrite a lazy plan into fewer, cheaper steps
+
+    - only the last sort is kept, earlier sorts are overwritten by it
+    - row filters (dropna, dedup) are pushed before the sort so fewer
+      rows are sorted, consecutive filters are fused into one mask
+    - consecutive type casts are fused into a single step
+    """
+    last_sort = max((i for i, (op, _) in enumerate(ops) if op == "sort"), default=None)
+    ops = [(op, arg) for i, (op, arg) in enumerate(ops) if op != "sort" or i == last_sort]
+    
+    # Filters commute with sorting, so move them in front of it
+    if last_sort is not None:
+        sort_pos = next(i for i, (op, _) in enumerate(ops) if op == "sort")
+        i = sort_pos + 1
+        while i < len(ops) and ops[i][0] in ("dropna", "dedup"):
+            ops[i - 1], ops[i] = ops[i], ops[i - 1]
+            i += 1
+    
+    optimized = []
+    for op, arg in ops:
+        previous = optimized[-1][0] if optimized else None
+        if op in ("dropna", "dedup"):
+            if previous == "filter":
+                if op not in optimized[-1][1]:
+                    optimized[-1][1].append(op)
+            else:
+                optimized.append(("filter", [op]))
+        elif op == "cast":
+            if previous == "casts":
+                if optimized[-1][1][-1:] != [arg]:
+                    optimized[-1][1].append(arg)
+            else:
+                optimized.append(("casts", [arg]))
+        else:
+            optimized.append((op, arg))
+    return optimized
+
+TYPE_NAMES = {"1": "integer", "2": "float", "3": "string", "4": "datetime"}
+
+def describe_op(op, arg):
+    """Short description of a recorded operation, e.g. cast 'Date' to datetime"""
+    if op == "cast":
+        return f"cast '{arg[0]}' to {TYPE_NAMES.get(arg[1], arg[1])}"
+    if op == "sort":
+        return f"sort by '{arg[0]}'"
+    if op in ("fillna", "fill_stat"):
+        return f"fill missing values with {arg}"
+    if op == "dropna":
+        return "drop rows with missing values"
+    if op == "dedup":
+        return "remove duplicates"
+    return op
+
+class PlanError(Exception):
+    """A step of a lazy plan failed, ops are the recorded operations of that step"""
+
+    def __init__(self, ops, error):
+        super().__init__(f"{', '.join(describe_op(op, arg) for op, arg in ops)} failed: {error}")
+        self.ops = ops
+        self.error = error
+
+    def __reduce__(self):
+        # Rebuilt from both arguments, e.g. when raised in a batch worker process
+        return type(self), (self.ops, self.error)
+
+def recorded_ops(op, arg):
+    """The recorded operations an optimized step was made of"""
+    if op == "filter":
+        return [(name, None) for name in arg]
+    if op == "casts":
+        return [("cast", cast) for cast in arg]
+    return [(op, arg)]
+
+def execute_plan(frame, ops, workers=1, min_rows=parallel.MIN_PARALLEL_ROWS):
+    """Execute an optimized plan, taking rows from the frame only once per filter/sort
+
+    workers and min_rows are passed to the parallel module for fills.
+    """
+    out = frame
+    i = 0
+    while i < len(ops):
+        op, arg = ops[i]
+        try:
+            if op == "filter":
+                # dropna and dedup fuse exactly: a duplicate of a complete
+                # row is itself complete, so both masks use the same rows
+                mask = np.ones(len(out), dtype=bool)
+                if "dropna" in arg:
+                    mask &= out.notna().all(axis=1).to_numpy()
+                if "dedup" in arg:
+                    mask &= ~out.duplicated().to_numpy()
+                positions = np.flatnonzero(mask)
+            
+                # A following sort reuses the same take
+                if i + 1 < len(ops) and ops[i + 1][0] == "sort":
+                    column, ascending = ops[i + 1][1]
+                    key = out[column].iloc[positions].reset_index(drop=True)
+                    positions = positions[key.sort_values(ascending=ascending).index.to_numpy()]
+                    i += 1
+                out = out.iloc[positions]
+            elif op == "sort":
+                column, ascending = arg
+                out = out.sort_values(by=column, ascending=ascending)
+            elif op == "fillna":
+                out = schema.fillna(out, arg)
+            elif op == "fill_stat":
+                numeric_cols = out.select_dtypes(include=['number']).columns
+                stats = parallel.column_stats(out[numeric_cols], arg, workers, min_rows)
+                out = out.fillna(stats.to_dict())
+            elif op == "casts":
+                # Each column is converted in a chain but assigned once
+                columns = {}
+                for column, type_choice in arg:
+                    try:
+                        columns[column] = convert_column(columns.get(column, out[column]), type_choice)
+                    except Exception as e:
+                        raise PlanError([("cast", (column, type_choice))], e) from e
+                out = out.assign(**columns)
+        except PlanError:
+            raise
+        except Exception as e:
+            raise PlanError(recorded_ops(op, arg), e) from e
+        i += 1
+    return out
+
+def materialize():
+    """Run the pending lazy plan so df reflects every recorded operation
+
+    Returns False when a planned operation fails: df is left unchanged and
+    the failing operation is dropped from the plan.
+    """
+    global df
+    if not lazy or not plan:
+        return True
+    optimized = optimize_plan(plan)
+    try:
+        df = execute_plan(df, optimized, workers, parallel_min_rows)
+    except PlanError as e:
+        print(f"❌ Planned operation {e}")
+        plan[:] = [entry for entry in plan if entry not in e.ops]
+        print(f"📝 Removed it from the plan, the data is unchanged ({len(plan)} operations still pending)")
+        return False
+    data_changed()
+    print(f"⚙️  Executed {len(plan)} planned operations in {len(optimized)} steps")
+    plan.clear()
+    return True
+
+def count_missing():
+    """Count missing values per column"""
+    if not streaming:
+        return df.isnull().sum()
+    missing = None
+    for chunk in stream_chunks():
+        counts = chunk.isnull().sum()
+        missing = counts if missing is None else missing.add(counts, fill_value=0)
+    return missing.astype(int) if missing is not None else df.isnull().sum()
+
+def streaming_stats(stat):
+    """Compute mean or median of numeric columns in one pass over the chunks"""
+    numeric_cols = df.select_dtypes(include=['number']).columns
+    sums = pd.Series(0.0, index=numeric_cols)
+    counts = pd.Series(0, index=numeric_cols)
+    value_counts = {col: pd.Series(dtype=float) for col in numeric_cols}
+    
+    for chunk in stream_chunks():
+        values = chunk[numeric_cols].apply(conversions.to_numeric, errors='coerce')
+        if stat == "mean":
+            sums += values.sum()
+            counts += values.count()
+        else:
+            # Merge value counts so the median stays exact while memory
+            # only grows with the number of distinct values
+            for col in numeric_cols:
+                value_counts[col] = value_counts[col].add(values[col].value_counts(), fill_value=0)
+    
+    if stat == "mean":
+        return sums / counts.replace(0, float('nan'))
+    
+    medians = {col: parallel.median_from_counts(col_counts) for col, col_counts in value_counts.items()}
+    return pd.Series(medians, dtype=float).dropna()
+
+def compact_loaded(frame):
+    """frame with compact dtypes when enabled, attrs hold the memory before/after and the dtype changes"""
+    if not compact_dtypes:
+        return frame
+    before = schema.memory_mb(frame)
+    frame, changes = schema.optimize(frame, arrow_strings)
+    frame.attrs.update(memory_mb=(before, schema.memory_mb(frame)), dtype_changes=changes)
+    return frame
+
+def cache_variant():
+    """Columnar cache variant of the current load settings"""
+    if not compact_dtypes:
+        return 'raw'
+    return 'compact+arrow' if arrow_strings else 'compact'
+
 def load_csv():
     """Load CSV file"""
-    global df, filename
+    global df, filename, streaming, chunk_size, chunk_ops, lazy, use_cube, load_memory
+    global source_files, source_column
     
     print("\n--- Load CSV File ---")
-    file_path = input("Enter CSV file path: ").strip()
+    file_path = instrumentation.prompt("Enter CSV file path, directory or glob (e.g. data/*.csv): ").strip()
     
     # Remove quotes if present
     if file_path.startswith('"') and file_path.endswith('"'):
         file_path = file_path[1:-1]
     
+    # A directory or glob loads all its files as one dataset
+    try:
+        files = ingest.expand(file_path)
+    except FileNotFoundError as e:
+        print(f"\n❌ {e}")
+        return False
+    new_source_column = None
+    if len(files) > 1:
+        print(f"\n📁 {len(files)} files: {', '.join(os.path.basename(f) for f in files[:5])}"
+              f"{', ...' if len(files) > 5 else ''}")
+        answer = instrumentation.prompt(f"Add a '{ingest.SOURCE_COLUMN}' column with the file of every row? (y/n): ")
+        if answer.strip().lower() == 'y':
+            new_source_column = ingest.SOURCE_COLUMN
+        # Saved files are named after the common directory
+        file_path = os.path.commonpath([os.path.abspath(f) for f in files])
+    
+    print("\nLoad mode:")
+    print("1. Normal (load whole file into memory)")
+    print("2. Streaming (process file in chunks, for files larger than RAM)")
+    print("3. Lazy (record operations, run them in one optimized pass on view/save)")
+    mode = instrumentation.prompt("Choose mode (1-3, default 1): ").strip()
+    
     try:
-        df = pd.read_csv(file_path)
+        if mode == "2":
+            size = instrumentation.prompt(f"Rows per chunk (default {DEFAULT_CHUNK_SIZE}): ").strip()
+            new_chunk_size = int(size) if size else DEFAULT_CHUNK_SIZE
+            
+            # Only the first chunk is kept in memory as a preview
+            ingest.check_headers(files, files)
+            with pd.read_csv(files[0], chunksize=new_chunk_size) as reader:
+                df = reader.get_chunk()
+            if new_source_column:
+                df = ingest.tag_source(df, 0, files, new_source_column)
+            data_changed()
+            
+            filename = file_path
+            source_files = files
+            source_column = new_source_column
+            streaming = True
+            lazy = False
+            chunk_size = new_chunk_size
+            chunk_ops = []
+            load_memory = None
+            remove_spill()
+            print(f"\n✅ File opened in streaming mode ({chunk_size} rows per chunk)!")
+            print(f"📊 Preview chunk: {df.shape[0]} rows, {df.shape[1]} columns")
+            print(f"📋 Columns: {list(df.columns)}")
+            return True
+        
+        if len(files) > 1:
+            # Parsed on a thread pool, each file reuses its columnar sidecar
+            df = compact_loaded(ingest.read_many(files, source_column=new_source_column))
+            print(f"\n📚 Loaded {len(files)} files as one dataset")
+        else:
+            # Reuse the columnar sidecar when the CSV has not changed, it
+            # holds the frame with its load-time dtypes already applied
+            cached = columnar_cache.load_cached(file_path, cache_variant())
+            if cached is not None:
+                df = cached
+                print("\n⚡ Loaded from columnar cache")
+            else:
+                df = compact_loaded(pd.read_csv(file_path))
+                if columnar_cache.save_cached(file_path, df, cache_variant()):
+                    print("\n💾 Columnar cache written for faster reloads")
+        load_memory = df.attrs.pop('memory_mb', None)
+        for column, (old, new) in df.attrs.pop('dtype_changes', {}).items():
+            print(f"🗜️  {column}: {old} -> {new}")
         filename = file_path
+        source_files = files
+        source_column = new_source_column
+        data_changed()
+        use_cube = None
+        streaming = False
+        lazy = mode == "3"
+        chunk_ops = []
+        plan.clear()
+        remove_spill()
         print(f"\n✅ File loaded successfully!")
         print(f"📊 Data shape: {df.shape[0]} rows, {df.shape[1]} columns")
         print(f"📋 Columns: {list(df.columns)}")
+        if load_memory is not None:
+            print(f"💾 Memory: {load_memory[1]:.1f} MB ({load_memory[0]:.1f} MB before dtype optimization)")
+        if lazy:
+            print("📝 Lazy mode: operations run when you view or save the data")
         return True
     except FileNotFoundError:
         print("\n❌ File not found! Please check the file path.")
@@ -54,10 +494,13 @@ def handle_missing():
     
     print("\n--- Handle Missing Values ---")
     print(f"Missing values per column:")
-    missing_data = df.isnull().sum()
+    missing_data = count_missing()
     print(missing_data[missing_data > 0])
+    if lazy and plan:
+        print(f"(counted before {len(plan)} pending operations)")
     
-    if missing_data.sum() == 0:
+    # Pending casts may still introduce missing values
+    if missing_data.sum() == 0 and not (lazy and plan):
         print("✅ No missing values found!")
         return
     
@@ -67,31 +510,89 @@ def handle_missing():
     print("3. Fill with median (numeric columns)")
     print("4. Fill with custom value")
     
-    choice = input("Choose option (1-4): ").strip()
+    choice = instrumentation.prompt("Choose option (1-4): ").strip()
     
     if choice == "1":
-        df = df.dropna()
+        if streaming or lazy:
+            record_op("dropna")
+        else:
+            df = df.dropna()
+            data_changed()
         print("✅ Rows with missing values removed!")
     elif choice == "2":
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
+        if streaming:
+            record_op("fillna", streaming_stats("mean").to_dict())
+        elif lazy:
+            record_op("fill_stat", "mean")
+        else:
+            numeric_cols = df.select_dtypes(include=['number']).columns
+            means = parallel.column_stats(df[numeric_cols], "mean", workers, parallel_min_rows)
+            df[numeric_cols] = df[numeric_cols].fillna(means)
+            data_changed()
         print("✅ Missing values filled with mean!")
     elif choice == "3":
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+        if streaming:
+            record_op("fillna", streaming_stats("median").to_dict())
+        elif lazy:
+            record_op("fill_stat", "median")
+        else:
+            numeric_cols = df.select_dtypes(include=['number']).columns
+            medians = parallel.column_stats(df[numeric_cols], "median", workers, parallel_min_rows)
+            df[numeric_cols] = df[numeric_cols].fillna(medians)
+            data_changed()
         print("✅ Missing values filled with median!")
     elif choice == "4":
-        value = input("Enter value to fill missing data: ")
-        df = df.fillna(value)
+        value = instrumentation.prompt("Enter value to fill missing data: ")
+        if streaming or lazy:
+            record_op("fillna", value)
+        else:
+            df = schema.fillna(df, value)
+            data_changed()
         print("✅ Missing values filled with custom value!")
 
 def remove_duplicates():
     """Remove duplicate rows"""
-    global df
+    global df, spill_dir
     
     print("\n--- Remove Duplicates ---")
+    if streaming:
+        print("Options:")
+        print("1. Keep row digests in memory (16 bytes per unique row)")
+        print("2. Spill to disk buckets (for very many unique rows, row order is not kept)")
+        choice = instrumentation.prompt("Choose option (1-2, default 1): ").strip()
+        
+        if choice != "2":
+            record_op("dedup")
+            print("✅ Duplicate rows will be removed chunk by chunk!")
+            print("💡 Rows are deduplicated across the whole file when saving")
+            return
+        
+        # Write the deduplicated rows to a new file and stream from there
+        new_spill_dir = tempfile.mkdtemp(prefix="data_toolkit_")
+        base_name = os.path.splitext(os.path.basename(filename))[0]
+        dedup_path = os.path.join(new_spill_dir, f"{base_name}_dedup.csv")
+        try:
+            rows_in, rows_out = dedup.dedup_to_disk(stream_chunks(), dedup_path)
+            # The other operations are in the copy already, but types do
+            # not survive the CSV round trip, so casts are recorded again
+            casts = [(op, arg) for op, arg in chunk_ops if op == "cast"]
+            reset_stream(dedup_path, casts)
+        except Exception as e:
+            shutil.rmtree(new_spill_dir, ignore_errors=True)
+            print(f"❌ Error: {e}")
+            return
+        remove_spill()
+        spill_dir = new_spill_dir
+        print(f"✅ Removed {rows_in - rows_out} duplicate rows!")
+        print(f"📊 Remaining rows: {rows_out} (streaming from {dedup_path})")
+        return
+    if lazy:
+        record_op("dedup")
+        return
+    
     initial_rows = len(df)
-    df = df.drop_duplicates()
+    df = parallel.drop_duplicates(df, workers, parallel_min_rows)
+    data_changed()
     final_rows = len(df)
     removed = initial_rows - final_rows
     
@@ -108,7 +609,7 @@ def change_data_type():
         print(f"{i}. {col} ({df[col].dtype})")
     
     try:
-        col_choice = int(input("\nEnter column number: ")) - 1
+        col_choice = int(instrumentation.prompt("\nEnter column number: ")) - 1
         column = df.columns[col_choice]
         
         print("\nData type options:")
@@ -117,16 +618,13 @@ def change_data_type():
         print("3. String (str)")
         print("4. DateTime")
         
-        type_choice = input("Choose data type (1-4): ").strip()
+        type_choice = instrumentation.prompt("Choose data type (1-4): ").strip()
         
-        if type_choice == "1":
-            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
-        elif type_choice == "2":
-            df[column] = pd.to_numeric(df[column], errors='coerce')
-        elif type_choice == "3":
-            df[column] = df[column].astype(str)
-        elif type_choice == "4":
-            df[column] = pd.to_datetime(df[column], errors='coerce')
+        if streaming or lazy:
+            record_op("cast", (column, type_choice))
+        else:
+            df[column] = convert_column(df[column], type_choice)
+            data_changed(column)
         
         print(f"✅ Column '{column}' converted successfully!")
         
@@ -138,17 +636,41 @@ def search_data():
     global df
     
     print("\n--- Search Data ---")
+    if not materialize():
+        return
     print("Available columns:")
     for i, col in enumerate(df.columns, 1):
         print(f"{i}. {col}")
     
     try:
-        col_choice = int(input("\nEnter column number to search: ")) - 1
-        column = df.columns[col_choice]
-        search_value = input(f"Enter value to search in '{column}': ")
+        print("\nFilter with conditions joined by 'and', e.g. Amount > 500 and Category in (Food, Bills) and Date >= 2024-01")
+        print("(operators: = != < <= > >= in, not in, contains, not contains; quote values containing 'and' or 'or')")
+        choice = instrumentation.prompt("Enter a filter, or a column number to search it for text: ").strip()
         
-        # Convert column to string for searching
-        results = df[df[column].astype(str).str.contains(search_value, case=False, na=False)]
+        if choice.isdigit():
+            column = df.columns[int(choice) - 1]
+            search_value = instrumentation.prompt(f"Enter value to search in '{column}': ")
+            
+            if streaming:
+                # Convert column to string for searching
+                matches = [chunk[chunk[column].astype(str).str.contains(search_value, case=False, na=False)]
+                           for chunk in stream_chunks()]
+                results = pd.concat(matches) if matches else df.iloc[0:0]
+            else:
+                # The index only looks at rows whose value can match
+                results = df.iloc[get_search_index(column).search(search_value)]
+        else:
+            # Parsed once, then evaluated on the typed columns of every chunk
+            query = filters.parse(choice, df.columns)
+            if streaming:
+                matches = [query.apply(chunk) for chunk in stream_chunks()]
+                results = pd.concat(matches) if matches else df.iloc[0:0]
+            else:
+                query_plan = query.plan(df)
+                if query_plan[0][1] is not None:
+                    order = ", ".join(f"{condition} (~{kept:.0%} of rows)" for condition, kept in query_plan)
+                    print(f"🧮 Evaluating most selective first: {order}")
+                results = df.iloc[query.positions(df, query_plan)]
         
         print(f"\n🔍 Found {len(results)} matching records:")
         if len(results) > 0:
@@ -164,18 +686,39 @@ def sort_data():
     global df
     
     print("\n--- Sort Data ---")
+    if streaming:
+        print("⚠️  Sorting needs the whole file in memory and is not available in streaming mode")
+        return
+    
     print("Available columns:")
     for i, col in enumerate(df.columns, 1):
         print(f"{i}. {col}")
     
     try:
-        col_choice = int(input("\nEnter column number to sort by: ")) - 1
+        col_choice = int(instrumentation.prompt("\nEnter column number to sort by: ")) - 1
         column = df.columns[col_choice]
         
-        order = input("Sort ascending? (y/n): ").strip().lower()
+        order = instrumentation.prompt("Sort ascending? (y/n): ").strip().lower()
         ascending = order == 'y'
         
-        df = df.sort_values(by=column, ascending=ascending)
+        top = instrumentation.prompt("Show only the first N rows without sorting the data? (N or Enter to sort): ").strip()
+        if top:
+            # Pending operations change which rows come first
+            if not materialize():
+                return
+            positions = sort_index.top_n(df[column], int(top), largest=not ascending)
+            print(f"\n📈 {'Bottom' if ascending else 'Top'} {top} rows by '{column}':")
+            print(df.iloc[positions].to_string())
+            return
+        
+        if lazy:
+            record_op("sort", (column, ascending))
+        else:
+            # Sorting again by a cached column reuses its permutation
+            positions = sort_index.permutation(df[column], ascending)
+            if not np.array_equal(positions, np.arange(len(df))):
+                df = df.iloc[positions]
+                rows_reordered(positions)
         print(f"✅ Data sorted by '{column}' ({'ascending' if ascending else 'descending'})")
         
     except Exception as e:
@@ -183,18 +726,24 @@ def sort_data():
 
 def create_pivot():
     """Create pivot table"""
-    global df
+    global df, pivot_cube, use_cube
     
     print("\n--- Create Pivot Table ---")
+    if not materialize():
+        return
+    if streaming:
+        print("⚠️  Pivot tables are not available in streaming mode")
+        return
+    
     print("Available columns:")
     for i, col in enumerate(df.columns, 1):
         print(f"{i}. {col}")
     
     try:
-        index_choice = int(input("\nEnter column number for rows (index): ")) - 1
+        index_choice = int(instrumentation.prompt("\nEnter column number for rows (index): ")) - 1
         index_col = df.columns[index_choice]
         
-        value_choice = int(input("Enter column number for values: ")) - 1
+        value_choice = int(instrumentation.prompt("Enter column number for values: ")) - 1
         value_col = df.columns[value_choice]
         
         print("\nAggregation options:")
@@ -204,11 +753,22 @@ def create_pivot():
         print("4. Max")
         print("5. Min")
         
-        agg_choice = input("Choose aggregation (1-5): ").strip()
+        agg_choice = instrumentation.prompt("Choose aggregation (1-5): ").strip()
         agg_map = {'1': 'sum', '2': 'mean', '3': 'count', '4': 'max', '5': 'min'}
         agg_func = agg_map.get(agg_choice, 'sum')
         
-        pivot = pd.pivot_table(df, index=index_col, values=value_col, aggfunc=agg_func)
+        if use_cube is None:
+            answer = instrumentation.prompt("💡 Precompute a pivot cube so repeated pivots are instant? (y/n): ")
+            use_cube = answer.strip().lower() == 'y'
+        if use_cube and pivot_cube is None:
+            pivot_cube = indexes.PivotCube(df)
+            print(f"🧊 Pivot cube built for {len(pivot_cube.parts)} columns in {pivot_cube.build_seconds:.2f}s")
+        
+        # Answer from the cube's partial aggregates when it covers the request
+        if pivot_cube is not None and pivot_cube.can_answer(index_col, value_col, agg_func):
+            pivot = pivot_cube.pivot(index_col, value_col, agg_func)
+        else:
+            pivot = parallel.pivot(df, index_col, value_col, agg_func, workers, parallel_min_rows)
         
         print(f"\n📊 Pivot Table ({agg_func} of {value_col} by {index_col}):")
         print(pivot.to_string())
@@ -216,12 +776,48 @@ def create_pivot():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def print_approximate_summary(summary):
+    """Print a sketches.StreamingSummary with its error bounds"""
+    print(f"\n📈 Approximate Summary (one pass):")
+    print(summary.report())
+    
+    print(f"\n📏 Error Bounds:")
+    print(f"  distinct: ±{summary.distinct_error:.1%} (HyperLogLog standard error)")
+    for column, error in summary.quantile_errors().items():
+        print(f"  {column} quartiles: rank error at most {error:.2%} of the rows (t-digest)")
+    print("  count, missing, mean, std, min and max are exact")
+    
+    print(f"\n🔍 Missing Values:")
+    missing = summary.missing()
+    print(missing[missing > 0] if missing.sum() > 0 else "No missing values")
+
 def view_summary():
     """Display data summary"""
     global df
     
     print("\n--- Data Summary ---")
+    if not materialize():
+        return
+    if streaming:
+        # One pass over the chunks, memory stays bounded by the sketches
+        summary = sketches.StreamingSummary()
+        for chunk in stream_chunks():
+            summary.update(chunk)
+        print(f"📊 Shape: {summary.rows} rows, {df.shape[1]} columns (streaming, {chunk_size} rows per chunk)")
+        print_approximate_summary(summary)
+        return
+    
+    if len(df) >= APPROX_SUMMARY_ROWS:
+        choice = instrumentation.prompt(f"Approximate one-pass summary of {len(df):,} rows (faster)? (y/n): ").strip().lower()
+        if choice == 'y':
+            print(f"📊 Shape: {df.shape[0]} rows, {df.shape[1]} columns")
+            print_approximate_summary(parallel.summary(df, workers, parallel_min_rows))
+            return
+    
     print(f"📊 Shape: {df.shape[0]} rows, {df.shape[1]} columns")
+    if load_memory is not None:
+        print(f"💾 Memory: {schema.memory_mb(df):.1f} MB now, "
+              f"{load_memory[1]:.1f} MB after loading ({load_memory[0]:.1f} MB before dtype optimization)")
     print(f"\n📋 Column Information:")
     print(df.info())
     
@@ -231,25 +827,122 @@ def view_summary():
     print(f"\n🔍 Missing Values:")
     missing = df.isnull().sum()
     print(missing[missing > 0] if missing.sum() > 0 else "No missing values")
+    
+    if search_indexes:
+        print(f"\n🗂️  Search Indexes:")
+        for column, index in search_indexes.items():
+            print(f"  {column}: {len(index.postings)} trigrams, "
+                  f"{index.memory_bytes / 1024 / 1024:.2f} MB, built in {index.build_seconds:.2f}s")
 
 def save_data():
     """Save cleaned data"""
     global df, filename
     
     print("\n--- Save Cleaned Data ---")
+    if not materialize():
+        return
+    
+    formats = exports.available_formats()
+    for i, fmt in enumerate(formats, 1):
+        print(f"{i}. {fmt}")
+    choice = instrumentation.prompt(f"Choose format (1-{len(formats)}, default 1): ").strip() or "1"
+    if not choice.isdigit() or not 1 <= int(choice) <= len(formats):
+        print("❌ Invalid choice!")
+        return
+    fmt = formats[int(choice) - 1]
     
     # Generate new filename
     base_name = os.path.splitext(os.path.basename(filename))[0]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    new_filename = f"{base_name}_cleaned_{timestamp}.csv"
+    new_filename = f"{base_name}_cleaned_{timestamp}{exports.FORMATS[fmt]['extension']}"
     
     try:
-        df.to_csv(new_filename, index=False)
+        if streaming:
+            # Write chunk by chunk so only one chunk is in memory at a time
+            with exports.ExportWriter(new_filename, fmt) as writer:
+                for chunk in stream_chunks():
+                    writer.write(chunk)
+                if writer.rows == 0:
+                    # Everything was filtered out, still write the columns
+                    writer.write(df.iloc[0:0])
+            print(f"✅ Data saved successfully as: {new_filename}")
+            print(f"📊 Saved {writer.rows} rows and {len(df.columns)} columns")
+            return
+        
+        key = (exports.frame_digest(df), fmt)
+        previous = saved_exports.get(key)
+        if previous and os.path.exists(previous[0]) and os.path.getsize(previous[0]) == previous[1]:
+            shutil.copyfile(previous[0], new_filename)
+            print(f"♻️  Data unchanged since {previous[0]}, copied it")
+        else:
+            exports.write_frame(df, new_filename, fmt, workers, parallel_min_rows)
+        saved_exports[key] = (new_filename, os.path.getsize(new_filename))
         print(f"✅ Data saved successfully as: {new_filename}")
         print(f"📊 Saved {len(df)} rows and {len(df.columns)} columns")
     except Exception as e:
         print(f"❌ Error saving file: {e}")
 
+def settings():
+    """Configure parallel execution and load-time dtypes"""
+    global workers, parallel_min_rows, compact_dtypes, arrow_strings
+    
+    print("\n--- Settings ---")
+    print(f"1. Worker processes: {workers} (CPU cores: {os.cpu_count()})")
+    print(f"2. Minimum rows for parallel execution: {parallel_min_rows}")
+    print(f"3. Compact dtypes on load: {'on' if compact_dtypes else 'off'}")
+    print(f"4. Arrow strings for text columns: {'on' if arrow_strings else 'off'}")
+    
+    choice = input("Choose setting to change (1-4, Enter to go back): ").strip()
+    try:
+        if choice == "1":
+            workers = max(1, int(input("Worker processes (1 = serial): ")))
+            print(f"✅ Using {workers} worker processes")
+        elif choice == "2":
+            parallel_min_rows = max(0, int(input("Minimum rows: ")))
+            print(f"✅ Frames with at least {parallel_min_rows} rows run in parallel")
+        elif choice == "3":
+            compact_dtypes = not compact_dtypes
+            print(f"✅ Compact dtypes {'on' if compact_dtypes else 'off'} for the next load")
+        elif choice == "4":
+            if not arrow_strings and not schema.arrow_strings_available():
+                print("❌ Arrow strings need pyarrow")
+                return
+            arrow_strings = not arrow_strings
+            print(f"✅ Arrow strings {'on' if arrow_strings else 'off'} for the next load")
+    except ValueError:
+        print("❌ Please enter a whole number")
+
+def performance():
+    """Show timings of the operations run so far and export them as JSON"""
+    print("\n--- Performance ---")
+    records = instrumentation.recorder.snapshot()
+    if not records:
+        print("No operations recorded yet")
+        return
+    
+    print(f"{'operation':<20} {'seconds':>10} {'rows in':>12} {'rows out':>12} {'memory':>12}")
+    for entry in records[-20:]:
+        rows_in = "-" if entry['rows_in'] is None else f"{entry['rows_in']:,}"
+        rows_out = "-" if entry['rows_out'] is None else f"{entry['rows_out']:,}"
+        memory = "-" if entry['memory_delta_mb'] is None else f"{entry['memory_delta_mb']:+.1f} MB"
+        status = "" if entry['status'] == 'ok' else " ❌"
+        print(f"{entry['operation']:<20} {entry['seconds']:>10.4f} {rows_in:>12} {rows_out:>12} {memory:>12}{status}")
+    
+    print("\n📊 Totals per operation:")
+    print(instrumentation.recorder.summary())
+    
+    if input("\nExport as JSON? (y/n): ").strip().lower() == 'y':
+        path = f"performance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        instrumentation.recorder.export_json(path)
+        print(f"✅ Timings saved to {path}")
+
+def instrumented(operation, func):
+    """Run a menu operation, recording its time, rows in/out and memory"""
+    rows_in = len(df) if df is not None else None
+    with instrumentation.record('console', operation, rows_in=rows_in) as entry:
+        func()
+        entry['rows_out'] = len(df) if df is not None else None
+
 def main():
     """Main program loop"""
     global df
@@ -258,33 +951,37 @@ def main():
     
     while True:
         display_menu()
-        choice = input("\nEnter your choice (0-9): ").strip()
+        choice = input("\nEnter your choice (0-11): ").strip()
         
         if choice == "0":
             print("\n👋 Thank you for using the Data Cleaning Tool!")
             break
         elif choice == "1":
-            load_csv()
+            instrumented("load", load_csv)
+        elif choice == "10":
+            settings()
+        elif choice == "11":
+            performance()
         elif df is None:
             print("\n⚠️  Please load a CSV file first (option 1)")
         elif choice == "2":
-            handle_missing()
+            instrumented("missing values", handle_missing)
         elif choice == "3":
-            remove_duplicates()
+            instrumented("remove duplicates", remove_duplicates)
         elif choice == "4":
-            change_data_type()
+            instrumented("change type", change_data_type)
         elif choice == "5":
-            search_data()
+            instrumented("search", search_data)
         elif choice == "6":
-            sort_data()
+            instrumented("sort", sort_data)
         elif choice == "7":
-            create_pivot()
+            instrumented("pivot", create_pivot)
         elif choice == "8":
-            view_summary()
+            instrumented("summary", view_summary)
         elif choice == "9":
-            save_data()
+            instrumented("save", save_data)
         else:
-            print("\n❌ Invalid choice! Please enter 0-9.")
+            print("\n❌ Invalid choice! Please enter 0-11.")
         
         input("\nPress Enter to continue...")
 
@@ -0,0 +1,123 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import indexes
+import sketches
+
+# Process-pool backend for the console tool. The frame is split into
+# contiguous partitions, each worker computes a mergeable partial result
+# and the partials are combined in the parent. Small inputs, or a worker
+# count of 1, run serially since starting processes and pickling the
+# partitions would cost more than it saves.
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+MIN_PARALLEL_ROWS = 500000
+
+def use_parallel(df, workers, min_rows):
+    """Whether df is big enough to be worth splitting over workers"""
+    return workers > 1 and len(df) >= min_rows
+
+def split_frame(df, parts):
+    """Split df into up to parts contiguous row ranges"""
+    bounds = np.linspace(0, len(df), parts + 1).astype(int)
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+def map_partitions(func, df, workers, *args):
+    """Run func(partition, *args) on every partition in a process pool"""
+    partitions = split_frame(df, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(func, part, *args) for part in partitions]
+        return [future.result() for future in futures]
+
+def median_from_counts(counts):
+    """Exact median from a Series mapping value -> number of occurrences"""
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    cumulative = counts.sort_index().cumsum()
+    lower = cumulative.index[cumulative.searchsorted((total - 1) // 2, side='right')]
+    upper = cumulative.index[cumulative.searchsorted(total // 2, side='right')]
+    return (lower + upper) / 2
+
+def _partial_sums(part):
+    return part.sum(), part.count()
+
+def _partial_value_counts(part):
+    return {col: part[col].value_counts() for col in part.columns}
+
+def _partial_dedup(part):
+    return part.drop_duplicates()
+
+def _partial_summary(part):
+    summary = sketches.StreamingSummary()
+    summary.update(part)
+    return summary
+
+def _partial_cube(part, index_col):
+    return indexes.PivotCube(part, dimensions=[index_col])
+
+def column_stats(df, stat, workers=DEFAULT_WORKERS, min_rows=MIN_PARALLEL_ROWS):
+    """Mean or median of every (numeric) column of df"""
+    if not use_parallel(df, workers, min_rows):
+        return df.mean() if stat == "mean" else df.median()
+
+    if stat == "mean":
+        partials = map_partitions(_partial_sums, df, workers)
+        sums = sum(part_sums for part_sums, _ in partials)
+        counts = sum(part_counts for _, part_counts in partials)
+        return sums / counts.replace(0, np.nan)
+
+    # Medians are merged from per-partition value counts, which stays exact
+    partials = map_partitions(_partial_value_counts, df, workers)
+    medians = {}
+    for col in df.columns:
+        counts = partials[0][col]
+        for partial in partials[1:]:
+            counts = counts.add(partial[col], fill_value=0)
+        medians[col] = median_from_counts(counts)
+    return pd.Series(medians, dtype=float)
+
+def drop_duplicates(df, workers=DEFAULT_WORKERS, min_rows=MIN_PARALLEL_ROWS):
+    """df.drop_duplicates() with each partition deduplicated in parallel first
+
+    The first occurrence of a row is always the first in its partition, so
+    a final pass over the survivors gives exactly the serial result.
+    """
+    if not use_parallel(df, workers, min_rows):
+        return df.drop_duplicates()
+    partials = map_partitions(_partial_dedup, df, workers)
+    return pd.concat(partials).drop_duplicates()
+
+def pivot(df, index_col, value_col, aggfunc, workers=DEFAULT_WORKERS, min_rows=MIN_PARALLEL_ROWS):
+    """pd.pivot_table for one index and value column, merged from partial pivots"""
+    numeric = pd.api.types.is_numeric_dtype(df[value_col]) and not pd.api.types.is_bool_dtype(df[value_col])
+    if (not use_parallel(df, workers, min_rows) or not numeric or index_col == value_col
+            or aggfunc not in ('sum', 'mean', 'count', 'min', 'max')):
+        return pd.pivot_table(df, index=index_col, values=value_col, aggfunc=aggfunc)
+
+    cubes = map_partitions(_partial_cube, df[[index_col, value_col]], workers, index_col)
+    cube = cubes[0]
+    for other in cubes[1:]:
+        cube.merge(other)
+    result = cube.pivot(index_col, value_col, aggfunc)
+
+    # Merging goes through floats, keep integer results integer like
+    # pivot_table, which sums in int64 whatever the column width
+    if aggfunc == 'sum' and pd.api.types.is_integer_dtype(df[value_col]):
+        result = result.astype('int64')
+    elif aggfunc in ('min', 'max') and pd.api.types.is_integer_dtype(df[value_col]):
+        result = result.astype(df[value_col].dtype)
+    return result
+
+def summary(df, workers=DEFAULT_WORKERS, min_rows=MIN_PARALLEL_ROWS):
+    """sketches.StreamingSummary of df, partitions are sketched in parallel and merged"""
+    if not use_parallel(df, workers, min_rows):
+        return _partial_summary(df)
+    partials = map_partitions(_partial_summary, df, workers)
+    result = partials[0]
+    for other in partials[1:]:
+        result.merge(other)
+    return result
@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Size-bounded LRU cache shared by all sessions of the Streamlit app.
+
+class UploadCache:
+    """Size-bounded LRU cache for parsed frames and computed results, safe to share between threads"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+
+            # Evict least recently used entries, but always keep the newest one
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+def estimate_size(value):
+    """Estimate memory used by a cached value in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum()) if isinstance(size, pd.Series) else int(size)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    return 64
@@ -0,0 +1,81 @@
+import pandas as pd
+
+import conversions
+
+# Load-time dtype optimizer. Low-cardinality text columns become
+# categoricals and integers are downcast to the smallest width that holds
+# their values. Floats stay float64: float32 keeps many values exactly,
+# but sums and means over it lose precision. Text that stays text can
+# optionally be stored as Arrow strings (needs pyarrow). pandas sums
+# integers in int64, but downcast integers overflow in element-wise
+# arithmetic, so code multiplying columns widens them first (see widen).
+
+# Text becomes categorical when its distinct values are at most this
+# share of the rows and at most CATEGORY_MAX_UNIQUES
+CATEGORY_MAX_RATIO = 0.1
+CATEGORY_MAX_UNIQUES = 10000
+
+def arrow_strings_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def looks_like_dates(series):
+    """Whether the text values of series parse as dates with one format"""
+    return conversions.detect_datetime_format(series.dropna()) is not None
+
+def optimize_column(series, arrow_strings=False):
+    """series with the most compact dtype that keeps its values, date-like text stays text"""
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        uniques = series.nunique()
+        if (uniques <= min(CATEGORY_MAX_RATIO * len(series), CATEGORY_MAX_UNIQUES)
+                and not looks_like_dates(series)):
+            return series.astype('category')
+        # Plain object columns and pandas' default str dtype
+        if arrow_strings and series.dtype != 'string[pyarrow]' and arrow_strings_available():
+            if series.dropna().map(type).eq(str).all():
+                return series.astype('string[pyarrow]')
+    return series
+
+def optimize(df, arrow_strings=False):
+    """Return (optimized frame, {column: (old dtype, new dtype)} for changed columns)"""
+    columns = {}
+    changes = {}
+    for col in df.columns:
+        columns[col] = optimize_column(df[col], arrow_strings)
+        if columns[col].dtype != df[col].dtype:
+            changes[col] = (str(df[col].dtype), str(columns[col].dtype))
+    if not changes:
+        return df, changes
+    return pd.DataFrame(columns, index=df.index), changes
+
+def memory_mb(df):
+    """Memory used by df in MB, including the strings it references"""
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+def widen(series):
+    """Integers as int64 and floats as float64, for arithmetic that must not overflow"""
+    nullable = isinstance(series.dtype, pd.api.extensions.ExtensionDtype)
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype('Int64' if nullable else 'int64')
+    if pd.api.types.is_float_dtype(series):
+        return series.astype('Float64' if nullable else 'float64')
+    return series
+
+def fillna(df, value):
+    """df.fillna(value), adding value to the categories of categorical columns first"""
+    columns = {
+        col: df[col].cat.add_categories([value])
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and df[col].isna().any()
+        and value not in df[col].cat.categories
+    }
+    if columns:
+        df = df.assign(**columns)
+    return df.fillna(value)
@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+# Mergeable sketches for summarizing data in one pass over chunks with
+# bounded memory: a t-digest for quantiles, HyperLogLog for distinct
+# counts and running moments for mean and standard deviation. Every
+# sketch can be merged with another of the same kind, so partitions can
+# be summarized independently (see parallel.summary).
+
+DEFAULT_COMPRESSION = 1000
+DEFAULT_PRECISION = 14
+
+# Set bits per byte value
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+class TDigest:
+    """Quantile sketch keeping at most about compression / 2 weighted centroids
+
+    Centroids are small near the tails and large around the median (the
+    k1 scale function), points falling into the same integer k bucket are
+    merged. Min and max are kept exactly.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate((self.means, values)), np.concatenate((self.weights, np.ones(len(values)))))
+
+    def merge(self, other):
+        if other.total == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate((self.means, other.means)), np.concatenate((self.weights, other.weights)))
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means = means[order]
+        weights = weights[order]
+        self.total = weights.sum()
+
+        # k bucket of every point's quantile, neighbours in one bucket merge
+        q = (np.cumsum(weights) - weights / 2) / self.total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.diff(k, prepend=np.nan) != 0)
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _centres(self):
+        return (np.cumsum(self.weights) - self.weights / 2) / self.total
+
+    def quantile(self, q):
+        if self.total == 0:
+            return np.nan
+        # Interpolate between centroid centres, the exact min and max bound the tails
+        xs = np.concatenate(([0.0], self._centres(), [1.0]))
+        ys = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(q, xs, ys))
+
+    def rank_error(self, q):
+        """Bound on the rank error of quantile(q) as a fraction of the count"""
+        if self.total == 0:
+            return np.nan
+        i = np.searchsorted(self._centres(), q)
+        around = self.weights[max(i - 1, 0):i + 1]
+        return float(around.sum() / 2 / self.total)
+
+class HyperLogLog:
+    """Distinct count sketch with 2**precision one-byte registers"""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        """Add 64-bit hashes, e.g. from pd.util.hash_pandas_object"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+
+        # Rank: position of the first set bit in the remaining bits,
+        # the bit length comes from smearing the highest bit downwards
+        bits = hashes & np.uint64((1 << (64 - p)) - 1)
+        for shift in (1, 2, 4, 8, 16, 32):
+            bits |= bits >> np.uint64(shift)
+        bit_length = POPCOUNT[bits.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+        rank = (64 - p + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * np.log(m / zeros)
+        return raw
+
+    @property
+    def relative_error(self):
+        """Standard error of estimate() relative to the true count"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+class Moments:
+    """Count, mean, variance, min and max, merged with Chan's formula"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        mean = values.mean()
+        self._combine(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, count, mean, m2, low, high):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    @property
+    def std(self):
+        """Sample standard deviation, like pandas"""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+class ColumnSketch:
+    """Missing count, distinct count and, for numeric data, moments and quantiles"""
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, precision=DEFAULT_PRECISION):
+        self.count = 0
+        self.missing = 0
+        self.distinct = HyperLogLog(precision)
+        self.moments = Moments()
+        self.digest = TDigest(compression)
+        self.numeric = True
+
+    def update(self, series):
+        valid = series.dropna()
+        self.count += len(valid)
+        self.missing += len(series) - len(valid)
+
+        numeric = pd.api.types.is_numeric_dtype(valid) and not pd.api.types.is_bool_dtype(valid)
+        if numeric:
+            # Hash numbers as float64 so int and float chunks agree
+            values = valid.to_numpy(dtype=float)
+            self.distinct.update_hashes(pd.util.hash_array(values))
+            if self.numeric:
+                self.moments.update(values)
+                self.digest.update(values)
+        else:
+            self.distinct.update_hashes(pd.util.hash_pandas_object(valid, index=False).to_numpy())
+            self.numeric = False
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        self.numeric = self.numeric and other.numeric
+        if self.numeric:
+            self.moments.merge(other.moments)
+            self.digest.merge(other.digest)
+
+class StreamingSummary:
+    """One-pass, mergeable summary of a frame fed chunk by chunk"""
+
+    QUANTILES = {'25%': 0.25, '50%': 0.5, '75%': 0.75}
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, precision=DEFAULT_PRECISION):
+        self.compression = compression
+        self.precision = precision
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            sketch = self.columns.setdefault(col, ColumnSketch(self.compression, self.precision))
+            sketch.update(chunk[col])
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, sketch in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(sketch)
+            else:
+                self.columns[col] = sketch
+
+    def missing(self):
+        return pd.Series({col: sketch.missing for col, sketch in self.columns.items()}, dtype='int64')
+
+    def report(self):
+        """describe()-like frame with distinct and missing counts, one column per data column"""
+        report = {}
+        for col, sketch in self.columns.items():
+            stats = {'count': sketch.count, 'missing': sketch.missing, 'distinct': round(sketch.distinct.estimate())}
+            if sketch.numeric and sketch.count:
+                stats.update(mean=sketch.moments.mean, std=sketch.moments.std, min=sketch.moments.min)
+                stats.update({name: sketch.digest.quantile(q) for name, q in self.QUANTILES.items()})
+                stats['max'] = sketch.moments.max
+            report[col] = stats
+        rows = ['count', 'missing', 'distinct', 'mean', 'std', 'min', *self.QUANTILES, 'max']
+        return pd.DataFrame(report, index=rows)
+
+    def quantile_errors(self):
+        """Largest rank error of the reported quartiles per numeric column"""
+        return pd.Series({
+            col: max(sketch.digest.rank_error(q) for q in self.QUANTILES.values())
+            for col, sketch in self.columns.items() if sketch.numeric and sketch.count
+        }, dtype=float)
+
+    @property
+    def distinct_error(self):
+        return 1.04 / np.sqrt(1 << self.precision)
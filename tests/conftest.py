@@ -0,0 +1,51 @@
+import builtins
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import columnar_cache
+import main_console_tool
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    """Columnar sidecars go to a temporary directory instead of the home directory"""
+    path = tmp_path / "cache"
+    monkeypatch.setattr(columnar_cache, 'CACHE_DIR', str(path))
+    return path
+
+@pytest.fixture
+def console(monkeypatch, tmp_path):
+    """main_console_tool in a freshly started state, saving into tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    defaults = {
+        'df': None,
+        'filename': "",
+        'source_files': [],
+        'source_column': None,
+        'streaming': False,
+        'chunk_size': main_console_tool.DEFAULT_CHUNK_SIZE,
+        'chunk_ops': [],
+        'lazy': False,
+        'plan': [],
+        'use_cube': None,
+        'saved_exports': {},
+        'load_memory': None,
+        'workers': 1,
+        'spill_dir': None,
+    }
+    for name, value in defaults.items():
+        monkeypatch.setattr(main_console_tool, name, value)
+    main_console_tool.data_changed()
+    yield main_console_tool
+    main_console_tool.remove_spill()
+
+@pytest.fixture
+def answers(monkeypatch):
+    """Call with the answers the next prompts should get, in order"""
+    def script(*values):
+        remaining = iter(values)
+        monkeypatch.setattr(builtins, 'input', lambda prompt="": next(remaining))
+    return script
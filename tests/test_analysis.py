@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+
+def marks():
+    return pd.DataFrame({
+        'Name': ['A', 'B', 'C', 'D'],
+        'Math': [90, 35, 70, 70],
+        'Science': [80, 90, 60, 60],
+        'English': [70, 95, np.nan, 50],
+    })
+
+def test_student_results_scores_ranks_and_pass_fail():
+    result = analysis.student_results(marks())
+    table = result['table'].set_index('Name')
+
+    assert table.loc['A', 'Total'] == 240
+    assert table.loc['A', 'Percentage'] == 80
+    # Below the pass mark in one subject, or a missing mark, fails
+    assert list(table['Result']) == ['Pass', 'Fail', 'Pass', 'Fail']
+    assert (result['passed'], result['failed'], result['total']) == (2, 2, 4)
+    # Sorted by percentage, equal percentages share a dense rank
+    assert list(table.index) == ['A', 'B', 'D', 'C']
+    assert list(table['Rank']) == [1, 2, 3, 4]
+
+def test_student_results_with_subjects_thresholds_and_weights():
+    result = analysis.student_results(
+        marks(), subjects=['Math', 'Science'], thresholds={'Math': 30}, weights={'Math': 3}
+    )
+    table = result['table'].set_index('Name')
+
+    assert table.loc['B', 'Result'] == 'Pass'
+    assert table.loc['A', 'Percentage'] == (90 * 3 + 80) / 4
+
+def test_student_results_leaves_the_input_unchanged():
+    df = marks()
+    analysis.student_results(df)
+    pd.testing.assert_frame_equal(df, marks())
+
+def sales():
+    return pd.DataFrame({
+        'Date': ['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-03'],
+        'Item': ['Pen', 'Book', 'Pen', 'Lamp'],
+        'Quantity': [2, 1, 3, 1],
+        'Price': [10, 200, 10, 500],
+    })
+
+def test_aggregate_by_matches_groupby():
+    df = sales()
+    metrics = analysis.aggregate_by(df, 'Item', ['Quantity', 'Price'])
+    expected = df.groupby('Item')['Quantity'].agg(['sum', 'count', 'mean', 'min', 'max'])
+
+    for stat in expected.columns:
+        pd.testing.assert_series_equal(
+            metrics[f'Quantity_{stat}'].sort_index(), expected[stat], check_names=False, check_dtype=False
+        )
+
+def test_top_n_returns_the_largest_keys_first():
+    result = analysis.sales_summary(sales())
+    top = analysis.top_n(result['item_metrics'], 'Revenue', n=2)
+    assert list(top['Item']) == ['Lamp', 'Book']
+    assert list(top['Revenue']) == [500, 200]
+
+    everything = analysis.top_n(result['item_metrics'], 'Quantity')
+    assert everything['Item'].iloc[0] == 'Pen'
+    assert sorted(everything['Item']) == ['Book', 'Lamp', 'Pen']
+
+def test_sales_summary_totals():
+    result = analysis.sales_summary(sales())
+    assert result['total_revenue'] == 20 + 200 + 30 + 500
+    assert result['total_quantity'] == 7
+    assert result['avg_price'] == 180
+    assert result['daily_metrics'].loc['2024-01-01', 'Revenue_sum'] == 220
+
+def test_sales_aggregates_updated_in_parts_match_one_pass():
+    df = pd.concat([sales(), sales().assign(Date='2024-01-04', Price=[10, np.nan, 10, 450])], ignore_index=True)
+    aggregates = analysis.SalesAggregates()
+    for part in (df.iloc[:3], df.iloc[3:5], df.iloc[5:]):
+        aggregates.update(part)
+    incremental = aggregates.summary()
+    full = analysis.sales_summary(df)
+
+    for name in ('total_revenue', 'total_quantity', 'avg_price'):
+        assert incremental[name] == full[name]
+    for name in ('daily_metrics', 'item_metrics'):
+        pd.testing.assert_frame_equal(
+            incremental[name].sort_index(), full[name].sort_index(), check_dtype=False
+        )
+
+def weather():
+    return pd.DataFrame({
+        'Date': ['2024-01-01', '2024-01-02', '2024-01-03'],
+        'Temperature': [20.0, np.nan, 30.0],
+        'Humidity': [50.0, np.nan, 80.0],
+        'Rainfall': [1.0, np.nan, 3.0],
+    })
+
+def test_clean_weather_fills_gaps_and_leaves_the_input_unchanged():
+    df = weather()
+    result = analysis.clean_weather(df)
+    cleaned = result['cleaned']
+
+    assert list(cleaned['Temperature']) == [20.0, 25.0, 30.0]
+    assert list(cleaned['Humidity']) == [50.0, 65.0, 80.0]
+    assert list(cleaned['Rainfall']) == [1.0, 0.0, 3.0]
+    assert result['stats']['total_rainfall'] == 4.0
+    pd.testing.assert_frame_equal(df, weather())
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+def paged_table():
+    import sys
+
+    import numpy as np
+    import pandas as pd
+    import streamlit as st
+
+    sys.path.insert(0, st.session_state['repo'])
+    import app
+
+    df = pd.DataFrame({
+        'Name': [f"item {i}" for i in range(3000)],
+        'Value': np.arange(3000) % 7,
+    })
+    app.paged_dataframe(df, "table")
+
+@pytest.fixture
+def table(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    at = AppTest.from_function(paged_table, default_timeout=60)
+    at.session_state['repo'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    at.run()
+    return at
+
+def shown(at):
+    return at.main.dataframe[-1].value
+
+def test_large_frame_is_shown_one_page_at_a_time(table):
+    assert len(shown(table)) == 25
+    assert table.caption[-1].value == "Rows 1-25 of 3,000"
+
+    table.number_input(key="table_page").set_value(3).run()
+    assert list(shown(table)['Name'][:1]) == ["item 50"]
+
+def test_sort_and_filter_run_on_the_server(table):
+    table.selectbox(key="table_filter_col").set_value("Name").run()
+    table.text_input(key="table_query").set_value("item 29").run()
+    table.selectbox(key="table_sort_col").set_value("Value").run()
+    table.radio(key="table_order").set_value("Descending").run()
+
+    page = shown(table)
+    assert table.caption[-1].value == "Rows 1-25 of 111 (filtered from 3,000)"
+    assert page['Name'].str.contains("item 29").all()
+    assert page['Value'].is_monotonic_decreasing
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import batch_runner
+import main_console_tool
+
+RECIPE = {"steps": [
+    {"op": "fill_missing", "method": "value", "value": 0},
+    {"op": "remove_duplicates"},
+    {"op": "sort", "column": "A"},
+]}
+
+def write_csv(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+@pytest.mark.parametrize('step', [{"op": "explode"}, {"op": "sort"}, {"op": "fill_missing", "method": "value"}])
+def test_unknown_and_incomplete_steps_are_rejected(step):
+    with pytest.raises(ValueError, match="step 1"):
+        batch_runner.recipe_to_plan({"steps": [step]})
+
+@pytest.mark.parametrize('recipe', [[{"op": "remove_duplicates"}], {"steps": {"op": "sort"}}, {"steps": ["sort"]}])
+def test_recipes_that_are_not_objects_with_a_list_of_steps_are_rejected(recipe):
+    with pytest.raises(ValueError):
+        batch_runner.recipe_to_plan(recipe)
+
+def test_invalid_recipe_exits_with_an_error(tmp_path, capsys):
+    recipe = tmp_path / "recipe.json"
+    recipe.write_text(json.dumps([{"op": "remove_duplicates"}]))
+    assert batch_runner.main([str(recipe), str(tmp_path / "*.csv")]) == 2
+    assert "Invalid recipe" in capsys.readouterr().out
+
+def test_every_matching_file_is_cleaned(tmp_path):
+    write_csv(tmp_path / "in" / "a.csv", "A,B\n2,x\n1,\n1,\n")
+    write_csv(tmp_path / "in" / "b.csv", "A,B\n5,y\n")
+    output_dir = tmp_path / "cleaned"
+
+    results, failures = batch_runner.run_batch(RECIPE, [str(tmp_path / "in" / "*.csv")], str(output_dir), workers=1)
+
+    assert failures == [] and len(results) == 2
+    assert pd.read_csv(output_dir / "a_cleaned.csv").values.tolist() == [[1, '0'], [2, 'x']]
+    assert pd.read_csv(output_dir / "b_cleaned.csv").values.tolist() == [[5, 'y']]
+
+def test_outputs_mirror_the_input_directories(tmp_path):
+    first = write_csv(tmp_path / "stations" / "north" / "data.csv", "A,B\n2,x\n1,\n1,\n")
+    second = write_csv(tmp_path / "stations" / "south" / "data.csv", "A,B\n5,y\n")
+    output_dir = tmp_path / "cleaned"
+
+    results, failures = batch_runner.run_batch(
+        RECIPE, [str(tmp_path / "stations" / "**" / "*.csv")], str(output_dir), workers=1
+    )
+
+    assert failures == [] and len(results) == 2
+    north = pd.read_csv(output_dir / "north" / "data_cleaned.csv")
+    south = pd.read_csv(output_dir / "south" / "data_cleaned.csv")
+    assert north.values.tolist() == [[1, '0'], [2, 'x']]
+    assert south.values.tolist() == [[5, 'y']]
+    assert {result['file'] for result in results} == {os.path.normpath(first), os.path.normpath(second)}
+
+def test_inputs_writing_the_same_output_are_refused(tmp_path):
+    write_csv(tmp_path / "data.csv", "A\n1\n")
+    write_csv(tmp_path / "data.txt", "A\n2\n")
+    with pytest.raises(ValueError, match="would both be written"):
+        batch_runner.run_batch(RECIPE, [str(tmp_path / "data.*")], str(tmp_path / "out"), workers=1)
+    assert not (tmp_path / "out").exists()
+
+def test_clean_file_leaves_the_console_settings_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(main_console_tool, 'workers', 4)
+    path = write_csv(tmp_path / "data.csv", "A,B\n2,x\n1,\n")
+    plan = batch_runner.recipe_to_plan({"steps": [{"op": "fill_missing", "method": "mean"}]})
+    timings = batch_runner.clean_file(path, plan, str(tmp_path / "out" / "data_cleaned.csv"))
+
+    assert main_console_tool.workers == 4
+    assert timings['rows_out'] == 2
+
+def test_a_failing_file_does_not_fail_the_others(tmp_path):
+    write_csv(tmp_path / "in" / "a.csv", "A,B\n2,x\n1,\n")
+    write_csv(tmp_path / "in" / "b.csv", "A,B\n5,y\n")
+    write_csv(tmp_path / "in" / "c.csv", "Z,B\n5,z\n")
+    recipe = {"steps": [{"op": "change_type", "column": "A", "type": "int"}]}
+
+    results, failures = batch_runner.run_batch(recipe, [str(tmp_path / "in" / "*.csv")], str(tmp_path / "out"), workers=2)
+
+    assert sorted(os.path.basename(result['file']) for result in results) == ["a.csv", "b.csv"]
+    assert [os.path.basename(path) for path, _ in failures] == ["c.csv"]
+    assert "failed" in failures[0][1] and "terminated abruptly" not in failures[0][1]
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+import columnar_cache
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("A,B\n1,x\n2,y\n")
+    return str(path)
+
+def test_sidecar_round_trip(csv_path):
+    df = pd.read_csv(csv_path)
+    assert columnar_cache.load_cached(csv_path) is None
+    assert columnar_cache.save_cached(csv_path, df)
+    pd.testing.assert_frame_equal(columnar_cache.load_cached(csv_path), df, check_dtype=False)
+
+def test_changed_csv_invalidates_sidecar(csv_path):
+    columnar_cache.save_cached(csv_path, pd.read_csv(csv_path))
+    with open(csv_path, 'a') as f:
+        f.write("3,z\n")
+    assert columnar_cache.load_cached(csv_path) is None
+
+def test_corrupt_sidecar_is_a_cache_miss(csv_path):
+    columnar_cache.save_cached(csv_path, pd.read_csv(csv_path))
+    with open(columnar_cache.sidecar_path(csv_path), 'wb') as f:
+        f.write(b"not feather")
+    assert columnar_cache.load_cached(csv_path) is None
+
+def test_files_with_the_same_name_get_separate_sidecars(tmp_path):
+    first = tmp_path / "a" / "data.csv"
+    second = tmp_path / "b" / "data.csv"
+    assert columnar_cache.sidecar_path(str(first)) != columnar_cache.sidecar_path(str(second))
+    assert os.path.basename(columnar_cache.sidecar_path(str(first))).startswith("data_")
+
+def test_sidecar_of_another_variant_is_a_miss(csv_path):
+    df = pd.read_csv(csv_path).astype({'B': 'category'})
+    df.attrs['memory_mb'] = (2.0, 1.0)
+    columnar_cache.save_cached(csv_path, df, 'compact')
+    assert columnar_cache.load_cached(csv_path) is None
+    cached = columnar_cache.load_cached(csv_path, 'compact')
+    assert isinstance(cached['B'].dtype, pd.CategoricalDtype)
+    assert list(cached.attrs['memory_mb']) == [2.0, 1.0]
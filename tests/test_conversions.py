@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import conversions
+
+def dates(fmt, rows=30000):
+    days = pd.date_range("2024-01-01", periods=50).strftime(fmt)
+    values = pd.Series(np.random.default_rng(0).choice(days, rows))
+    values[::7] = None
+    return values
+
+@pytest.mark.parametrize('fmt', ["%m/%d/%Y", "%d/%m/%Y"])
+def test_to_datetime_matches_pandas_with_the_detected_format(fmt):
+    values = dates(fmt)
+    assert conversions.detect_datetime_format(values) == fmt
+    pd.testing.assert_series_equal(conversions.to_datetime(values), pd.to_datetime(values, format=fmt))
+
+def test_categorical_values_are_converted_through_their_categories():
+    values = pd.Series(["3", "1.5", "3", None, "x"], dtype="category")
+    converted = conversions.to_numeric(values, errors='coerce')
+    np.testing.assert_array_equal(converted, [3.0, 1.5, 3.0, np.nan, np.nan])
+
+def test_mostly_unique_columns_are_converted_whole():
+    values = pd.Series(np.arange(20000).astype(str))
+    assert conversions.mostly_unique(values)
+    calls = []
+    converted = conversions.map_unique(values, lambda uniques: calls.append(len(uniques)) or pd.to_numeric(uniques))
+    assert calls == [20000]
+    assert converted.iloc[-1] == 19999
+
+def test_unparseable_values_raise_or_coerce():
+    values = pd.Series(["2024-01-05", "soon"] * 3)
+    assert conversions.to_datetime(values, errors='coerce').isna().tolist() == [False, True] * 3
+    with pytest.raises(ValueError):
+        conversions.to_datetime(values)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dedup
+
+def test_halves_are_independent_for_numeric_rows():
+    df = pd.DataFrame({'a': np.arange(1000), 'b': np.linspace(0, 1, 1000)})
+    hi, lo = dedup.row_digests(df)
+    assert not (hi == lo).any()
+
+def test_large_integers_keep_distinct_digests():
+    hi, lo = dedup.row_digests(pd.DataFrame({'a': [2 ** 53, 2 ** 53 + 1]}))
+    assert hi[0] != hi[1] and lo[0] != lo[1]
+
+@pytest.mark.parametrize('other', [
+    pd.Series([1.0, 2.0, np.nan]),
+    pd.Series([1, 2, None], dtype='Int64'),
+])
+def test_digests_do_not_depend_on_the_inferred_number_type(other):
+    ints = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    mixed = pd.DataFrame({'a': other, 'b': ['x', 'y', 'z']})
+    for left, right in zip(dedup.row_digests(ints), dedup.row_digests(mixed)):
+        np.testing.assert_array_equal(left, right[:2])
+
+def test_categorical_and_text_columns_hash_alike():
+    df = pd.DataFrame({'a': ['x', None, 'y', 'x']})
+    for left, right in zip(dedup.row_digests(df), dedup.row_digests(df.astype('category'))):
+        np.testing.assert_array_equal(left, right)
+
+def test_column_order_matters():
+    df = pd.DataFrame({'a': [1], 'b': [2]})
+    assert dedup.row_digests(df)[0][0] != dedup.row_digests(df[['b', 'a']])[0][0]
+
+def chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.integers(0, 20, 3000), 'b': rng.choice(['x', 'y', None], 3000)})
+    df.loc[rng.random(3000) < 0.1, 'a'] = np.nan
+    return df
+
+def test_digest_set_removes_duplicates_across_chunks(rows):
+    seen = dedup.DigestSet()
+    kept = pd.concat([chunk[seen.add_rows(chunk)] for chunk in chunks(rows, 250)])
+    pd.testing.assert_frame_equal(kept, rows.drop_duplicates())
+    assert len(seen) == len(kept)
+
+def test_dedup_to_disk_writes_every_unique_row_once(rows, tmp_path):
+    out_path = tmp_path / "dedup.csv"
+    rows_in, rows_out = dedup.dedup_to_disk(chunks(rows, 250), out_path, buckets=4)
+
+    result = pd.read_csv(out_path)
+    expected = rows.drop_duplicates()
+    assert (rows_in, rows_out) == (len(rows), len(expected))
+    sort = ['a', 'b']
+    pd.testing.assert_frame_equal(
+        result.sort_values(sort).reset_index(drop=True),
+        expected.sort_values(sort).reset_index(drop=True),
+    )
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import expense_store
+
+def sample_frame():
+    return pd.DataFrame({
+        'Date': ['2024-01-05', '2024-01-20', '2024-02-01', None, 'not a date', '2024-02-03'],
+        'Category': ['Food', 'Bills', None, 'Food', 'Food', 'Food'],
+        'Amount': [100.0, 250.0, 30.0, 10.0, 5.0, np.nan],
+        'Note': ['lunch', None, None, None, None, None],
+    })
+
+def test_import_skips_invalid_rows_and_keeps_totals():
+    store = expense_store.ExpenseStore()
+    assert store.import_frame(sample_frame(), "upload") == (2, 4)
+
+    summary = store.summary()
+    assert summary['expense_count'] == 2
+    assert summary['total_expenses'] == 350.0
+    assert 'nan' not in set(summary['category_expenses']['Category'])
+    assert list(store.frame()['Category']) == ['Food', 'Bills']
+
+def test_import_is_idempotent_per_digest():
+    store = expense_store.ExpenseStore()
+    store.import_frame(sample_frame(), "upload")
+    assert store.import_frame(sample_frame(), "upload") == (0, 0)
+    assert store.count() == 2
+
+def test_totals_match_the_history():
+    store = expense_store.ExpenseStore()
+    store.import_frame(sample_frame(), "upload")
+    store.add('2024-02-10', 'Food', 40, "")
+    expected = store.frame().groupby('Category')['Amount'].sum().sort_values(ascending=False)
+    summary = store.summary()
+    pd.testing.assert_series_equal(
+        summary['category_expenses'].set_index('Category')['Amount'], expected, check_names=False
+    )
+    assert list(summary['monthly_expenses']['Month']) == ['2024-01', '2024-02']
+
+def test_clear_lets_the_same_upload_be_imported_again():
+    store = expense_store.ExpenseStore()
+    store.import_frame(sample_frame(), "upload")
+    store.clear()
+    assert store.count() == 0 and store.summary()['expense_count'] == 0
+    assert store.import_frame(sample_frame(), "upload") == (2, 4)
+
+def test_users_get_separate_databases(tmp_path, monkeypatch):
+    monkeypatch.setattr(expense_store, 'STORE_DIR', str(tmp_path))
+    first = expense_store.ExpenseStore(expense_store.user_path("a@example.com"))
+    second = expense_store.ExpenseStore(expense_store.user_path("b@example.com"))
+    first.add('2024-01-01', 'Food', 5)
+    assert first.count() == 1 and second.count() == 0
+    assert expense_store.ExpenseStore(expense_store.user_path("a@example.com")).count() == 1
+
+def test_local_database_is_kept_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(expense_store, 'STORE_DIR', str(tmp_path))
+    expense_store.ExpenseStore(expense_store.local_path()).add('2024-01-01', 'Food', 5)
+    assert expense_store.ExpenseStore(expense_store.local_path()).count() == 1
+    assert os.path.dirname(expense_store.local_path()) == str(tmp_path)
+
+def test_parts_of_an_upload_are_imported_once_and_in_order():
+    store = expense_store.ExpenseStore()
+    part = sample_frame().iloc[:2]
+    assert store.import_frame(part, "first", part=0) == (2, 0)
+    # The same rows as part of another upload are new expenses
+    assert store.import_frame(part, "second", part=0) == (2, 0)
+    # A restarted import skips the parts already stored
+    assert store.import_frame(part, "first", part=0) == (0, 0)
+    assert store.import_frame(part, "first", part=1) == (2, 0)
+    assert store.count() == 6
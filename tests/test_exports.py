@@ -0,0 +1,54 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import exports
+
+def frame(rows=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Item': rng.choice(['Pen', 'Book', 'Lamp'], rows),
+        'Quantity': rng.integers(1, 10, rows),
+        'Price': rng.random(rows).round(2),
+    })
+
+def test_file_name_replaces_a_known_extension():
+    assert exports.file_name("sales.csv", 'csv.gz') == "sales.csv.gz"
+    assert exports.file_name("sales.csv.gz", 'parquet') == "sales.parquet"
+
+@pytest.mark.parametrize('threads', [False, True])
+def test_parallel_csv_matches_serial(threads):
+    df = frame()
+    serial = exports.export_bytes(df, 'csv', workers=1)
+    buffer = io.BytesIO()
+    exports.write_frame(df, buffer, 'csv.gz', workers=2, min_rows=0, threads=threads)
+    assert gzip.decompress(buffer.getvalue()) == serial
+    assert serial == df.to_csv(index=False).encode('utf-8')
+
+def test_parquet_chunks_promote_column_types():
+    pytest.importorskip("pyarrow")
+    chunks = [
+        pd.DataFrame({'Quantity': [1, 2], 'Note': [None, None]}),
+        pd.DataFrame({'Quantity': [np.nan, 3.5], 'Note': ['late', None]}),
+        pd.DataFrame({'Quantity': [4, 5], 'Note': [None, None]}),
+    ]
+    buffer = io.BytesIO()
+    with exports.ExportWriter(buffer, 'parquet') as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    assert writer.rows == 6
+
+    result = pd.read_parquet(io.BytesIO(buffer.getvalue()))
+    np.testing.assert_array_equal(result['Quantity'], [1, 2, np.nan, 3.5, 4, 5])
+    assert result['Note'].isna().tolist() == [True, True, False, True, True, True]
+    assert result['Note'][2] == 'late'
+
+def test_parquet_chunks_with_incompatible_types_raise():
+    pytest.importorskip("pyarrow")
+    with exports.ExportWriter(io.BytesIO(), 'parquet') as writer:
+        writer.write(pd.DataFrame({'Code': [1, 2]}))
+        with pytest.raises(ValueError, match="incompatible"):
+            writer.write(pd.DataFrame({'Code': ['A1', 'B2']}))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import filters
+
+def expenses():
+    return pd.DataFrame({
+        'Date': ['2023-12-30', '2024-01-05', '2024-01-20', '2024-02-01', None],
+        'Category': pd.Categorical(['Food', 'Bills', 'Food', None, 'Travel']),
+        'Amount': [100.0, 600.0, np.nan, 900.0, 50.0],
+        'Note': ['lunch', 'rent and power', None, 'TV', 'bus'],
+        'Code': ['7', '12', '300', None, '2024'],
+    })
+
+def matches(text, df=None):
+    df = expenses() if df is None else df
+    return list(filters.parse(text, df.columns).positions(df))
+
+def test_numeric_comparisons_skip_missing_values():
+    assert matches("Amount > 500") == [1, 3]
+    assert matches("Amount != 100") == [1, 3, 4]
+
+def test_categories_in_and_not_in():
+    assert matches("Category in (Food, Travel)") == [0, 2, 4]
+    # Missing values match neither
+    assert matches("category not in (Food)") == [1, 4]
+
+def test_partial_dates_cover_the_whole_period():
+    assert matches("Date = 2024-01") == [1, 2]
+    assert matches("Date >= 2024-01-20") == [2, 3]
+    assert matches("Date < 2024-01") == [0]
+
+def test_bare_year_on_a_text_date_column_is_a_date():
+    assert matches("Date >= 2024") == [1, 2, 3]
+    assert matches("Date = 2023") == [0]
+
+def test_bare_year_on_a_text_number_column_is_a_number():
+    assert matches("Code >= 300") == [2, 4]
+    assert matches("Code < 2024") == [0, 1, 2]
+
+def test_column_without_parseable_values_raises():
+    df = pd.DataFrame({'When': ['soon', 'later', None]})
+    with pytest.raises(ValueError, match="no date values"):
+        matches("When >= 2024-01", df)
+    with pytest.raises(ValueError, match="no number values"):
+        matches("When > 5", df)
+
+def test_contains_and_quoted_values():
+    assert matches("Note contains 'and'") == [1]
+    assert matches("Note not contains lunch") == [1, 3, 4]
+
+def test_conditions_joined_by_and_match_every_condition():
+    df = pd.concat([expenses()] * 1000, ignore_index=True)
+    query = filters.parse("Amount > 50 and Category = Food and Date >= 2023-01", df.columns)
+    plan = query.plan(df)
+    # The most selective condition runs first
+    assert [kept for _, kept in plan] == sorted(kept for _, kept in plan)
+    expected = np.flatnonzero(((df['Amount'] > 50) & (df['Category'] == 'Food')).to_numpy())
+    np.testing.assert_array_equal(query.positions(df, plan), expected)
+
+@pytest.mark.parametrize('text, message', [
+    ("Amount > 5 or Note = x", "only 'and'"),
+    ("Amount >", "expected a value"),
+    ("Amount in (1, 2", "unexpected end"),
+    ("Price > 5", "unknown column"),
+    ("Amount > lots", "not a number"),
+])
+def test_invalid_filters_raise(text, message):
+    with pytest.raises(ValueError, match=message):
+        filters.parse(text, expenses().columns).apply(expenses())
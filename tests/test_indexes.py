@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indexes
+
+@pytest.fixture
+def names():
+    return pd.Series(['Amit Sharma', 'Priya Verma', None, 'amit kumar', 'Rohit SHARMA', 'Amit Sharma'])
+
+@pytest.mark.parametrize('query', ['sharma', 'AMIT', 'it', 'a', '', 'xyz', 'Sh.rma', '^amit'])
+def test_trigram_search_matches_str_contains(names, query):
+    index = indexes.TrigramIndex(names)
+    expected = np.flatnonzero(names.str.contains(query, case=False, na=False).to_numpy())
+    np.testing.assert_array_equal(index.search(query), expected)
+
+def test_trigram_search_follows_reordered_rows(names):
+    index = indexes.TrigramIndex(names)
+    sort_index = indexes.SortIndex()
+    positions = np.array([5, 4, 3, 2, 1, 0])
+    reordered = names.iloc[positions].reset_index(drop=True)
+    index.reorder(sort_index.reorder(positions))
+
+    expected = np.flatnonzero(reordered.str.contains('sharma', case=False, na=False).to_numpy())
+    np.testing.assert_array_equal(index.search('sharma'), expected)
+
+def test_cached_permutation_follows_reordered_rows():
+    series = pd.Series([3.0, 1.0, 2.0, 5.0, 4.0], name='A')
+    sort_index = indexes.SortIndex()
+    sort_index.permutation(series)
+    positions = np.array([4, 2, 0, 3, 1])
+    sort_index.reorder(positions)
+
+    reordered = series.iloc[positions].reset_index(drop=True)
+    expected = reordered.sort_values(kind='stable').index.to_numpy()
+    np.testing.assert_array_equal(sort_index.permutation(reordered), expected)
+
+@pytest.mark.parametrize('values', [[3.0, np.nan, 1.0, 5.0, np.nan], ['b', None, 'a', 'c', None]])
+@pytest.mark.parametrize('largest', [True, False])
+def test_top_n_leaves_out_missing_values_with_and_without_cached_permutation(values, largest):
+    series = pd.Series(values, name='A')
+    sort_index = indexes.SortIndex()
+    uncached = sort_index.top_n(series, 4, largest)
+    sort_index.permutation(series, ascending=not largest)
+    cached = sort_index.top_n(series, 4, largest)
+
+    expected = series.dropna().sort_values(ascending=not largest).index.to_numpy()
+    np.testing.assert_array_equal(uncached, expected)
+    np.testing.assert_array_equal(cached, expected)
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Item': rng.choice(['Pen', 'Book', 'Lamp', 'Desk'], 500),
+        'Quantity': rng.integers(1, 10, 500),
+        'Price': rng.normal(100, 30, 500).round(2),
+    })
+    df.loc[rng.random(500) < 0.1, 'Price'] = np.nan
+    return df
+
+@pytest.mark.parametrize('aggfunc', ['sum', 'mean', 'count', 'min', 'max', 'std', 'var'])
+@pytest.mark.parametrize('value_col', ['Quantity', 'Price'])
+def test_pivot_cube_matches_pivot_table(sales, aggfunc, value_col):
+    cube = indexes.PivotCube(sales)
+    assert cube.can_answer('Item', value_col, aggfunc)
+    expected = pd.pivot_table(sales, index='Item', values=value_col, aggfunc=aggfunc)
+    pd.testing.assert_frame_equal(cube.pivot('Item', value_col, aggfunc), expected, check_dtype=False)
+
+@pytest.mark.parametrize('aggfunc', ['sum', 'mean', 'count', 'min', 'max', 'std', 'var'])
+def test_pivot_cube_groups_with_too_few_values(aggfunc):
+    # 'b' has no value, 'c' a single one
+    df = pd.DataFrame({'Item': ['a', 'a', 'b', 'c'], 'Price': [1.0, 2.0, np.nan, 3.0]})
+    expected = pd.pivot_table(df, index='Item', values='Price', aggfunc=aggfunc)
+    pd.testing.assert_frame_equal(indexes.PivotCube(df).pivot('Item', 'Price', aggfunc), expected, check_dtype=False)
+
+def test_merged_cubes_match_a_cube_of_all_rows(sales):
+    merged = indexes.PivotCube(sales.iloc[:200]).merge(indexes.PivotCube(sales.iloc[200:]))
+    for aggfunc in ('sum', 'mean', 'min', 'max', 'std'):
+        expected = pd.pivot_table(sales, index='Item', values='Price', aggfunc=aggfunc)
+        pd.testing.assert_frame_equal(merged.pivot('Item', 'Price', aggfunc), expected, check_dtype=False)
+
+def test_pivot_cube_skips_high_cardinality_columns(sales, monkeypatch):
+    monkeypatch.setattr(indexes, 'CUBE_MAX_GROUPS', 10)
+    cube = indexes.PivotCube(sales)
+    assert cube.can_answer('Item', 'Price', 'sum')
+    assert cube.can_answer('Quantity', 'Price', 'sum')
+    assert not cube.can_answer('Price', 'Quantity', 'sum')
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import ingest
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / "day1.csv").write_text("A,B\n1,x\n")
+    (tmp_path / "day2.csv").write_text("A,B\n2,y\n3,z\n")
+    (tmp_path / "notes.txt").write_text("skip")
+    return tmp_path
+
+def test_expand_directories_and_globs(files):
+    expected = [str(files / "day1.csv"), str(files / "day2.csv")]
+    assert ingest.expand(str(files)) == expected
+    assert ingest.expand(str(files / "day*.csv")) == expected
+    with pytest.raises(FileNotFoundError):
+        ingest.expand(str(files / "week*.csv"))
+
+def test_existing_file_with_glob_characters_is_not_a_pattern(tmp_path):
+    path = tmp_path / "sales[2024].csv"
+    path.write_text("A\n1\n")
+    (tmp_path / "sales2.csv").write_text("A\n2\n")
+    assert ingest.expand(str(path)) == [str(path)]
+
+def test_directory_with_glob_characters(tmp_path):
+    folder = tmp_path / "data[1]"
+    folder.mkdir()
+    (folder / "a.csv").write_text("A\n1\n")
+    assert ingest.expand(str(folder)) == [str(folder / "a.csv")]
+
+def test_read_many_tags_every_row_with_its_file(files):
+    sources = ingest.expand(str(files))
+    df = ingest.read_many(sources, names=["day1.csv", "day2.csv"], source_column=ingest.SOURCE_COLUMN)
+    assert list(df['A']) == [1, 2, 3]
+    assert list(df[ingest.SOURCE_COLUMN]) == ["day1.csv", "day2.csv", "day2.csv"]
+    assert isinstance(df[ingest.SOURCE_COLUMN].dtype, pd.CategoricalDtype)
+
+def test_mismatched_headers_name_the_file(files):
+    (files / "day3.csv").write_text("A,C\n4,w\n")
+    with pytest.raises(ValueError, match="day3.csv"):
+        ingest.read_many(ingest.expand(str(files)))
+
+def test_uploads_with_the_same_name_are_numbered():
+    df = ingest.read_many([b"A\n1\n", b"A\n2\n"], names=["day.csv", "day.csv"], source_column="file")
+    assert list(df['file']) == ["day.csv", "day.csv (2)"]
@@ -0,0 +1,43 @@
+import builtins
+import threading
+import time
+
+import instrumentation
+
+def test_prompt_time_is_left_out(monkeypatch):
+    recorder = instrumentation.Recorder()
+    monkeypatch.setattr(builtins, 'input', lambda prompt="": time.sleep(0.2) or "y")
+    with recorder.record('console', 'load'):
+        assert recorder.prompt("? ") == "y"
+    [entry] = recorder.snapshot()
+    assert entry['seconds'] < 0.1
+
+def test_exclusive_record_leaves_out_nested_records():
+    recorder = instrumentation.Recorder()
+    with recorder.record('app', 'render', exclusive=True):
+        with recorder.record('app', 'read'):
+            time.sleep(0.2)
+        with recorder.paused():
+            time.sleep(0.2)
+    read, render = recorder.snapshot()
+    assert read['operation'] == 'read' and read['seconds'] >= 0.2
+    assert render['seconds'] < 0.1
+    assert 'exclusive' not in render and 'paused' not in render
+
+def test_use_routes_records_of_the_thread():
+    first, second = instrumentation.Recorder(), instrumentation.Recorder()
+
+    def session(recorder, operation):
+        with instrumentation.use(recorder):
+            with instrumentation.record('app', operation):
+                pass
+
+    threads = [threading.Thread(target=session, args=(first, 'a')),
+               threading.Thread(target=session, args=(second, 'b'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [entry['operation'] for entry in first.snapshot()] == ['a']
+    assert [entry['operation'] for entry in second.snapshot()] == ['b']
+    assert instrumentation.current() is instrumentation.recorder
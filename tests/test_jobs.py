@@ -0,0 +1,67 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import jobs
+
+@pytest.fixture
+def pool():
+    pool = jobs.JobPool(workers=2)
+    yield pool
+    pool.executor.shutdown(wait=True)
+
+def test_failed_job_stays_current_and_is_not_run_again(pool):
+    calls = []
+
+    def fail(job):
+        calls.append(job.key)
+        raise ValueError("bad upload")
+
+    job = pool.submit(("session", "sales"), "digest", fail)
+    assert job.wait(5)
+    assert isinstance(job.error, ValueError)
+    assert pool.submit(("session", "sales"), "digest", fail) is job
+    assert calls == ["digest"]
+
+def test_successful_job_has_no_error(pool):
+    job = pool.submit(("session", "sales"), "digest", lambda job: 42)
+    assert job.wait(5) and job.error is None and job.result() == 42
+
+def test_new_key_cancels_the_superseded_job(pool):
+    release = threading.Event()
+
+    def slow(job):
+        release.wait(5)
+        job.update(0.5)
+        return "done"
+
+    first = pool.submit(("session", "sales"), "old", slow)
+    second = pool.submit(("session", "sales"), "new", lambda job: "new")
+    release.set()
+    assert first.wait(5) and first.cancelled
+    assert isinstance(first.error, jobs.JobCancelled)
+    assert second.wait(5) and second.result() == "new"
+
+def test_retain_cancels_the_jobs_of_inactive_slots(pool):
+    release = threading.Event()
+
+    def slow(job):
+        release.wait(5)
+        job.update(1.0)
+
+    kept = pool.submit(("me", "sales"), "a", slow)
+    dropped = pool.submit(("me", "weather"), "b", slow)
+    other = pool.submit(("you", "weather"), "c", slow)
+    pool.retain("me", {("me", "sales")})
+    release.set()
+
+    assert dropped.cancelled and pool.get(("me", "weather")) is None
+    assert not kept.cancelled and not other.cancelled
+    assert pool.get(("you", "weather")) is other
+
+def test_csv_chunks_report_progress_to_the_end():
+    data = pd.DataFrame({'A': range(250)}).to_csv(index=False).encode()
+    chunks = list(jobs.csv_chunks(data, chunk_rows=100))
+    assert [len(chunk) for chunk, _ in chunks] == [100, 100, 50]
+    assert chunks[-1][1] == 1.0
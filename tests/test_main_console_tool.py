@@ -0,0 +1,135 @@
+import os
+
+import pandas as pd
+import pytest
+
+def write_csv(path, text):
+    path.write_text(text)
+    return str(path)
+
+def test_streaming_save_writes_header_when_no_chunk_is_produced(console, answers, monkeypatch, tmp_path):
+    path = write_csv(tmp_path / "data.csv", "A,B\n1,\n2,\n")
+    answers(path, "2", "")
+    assert console.load_csv()
+    monkeypatch.setattr(console, "stream_chunks", lambda: iter(()))
+    answers("1")
+    console.save_data()
+
+    [saved] = tmp_path.glob("data_cleaned_*.csv")
+    assert saved.read_text() == "A,B\n"
+
+def test_streaming_save_matches_normal_save(console, answers, tmp_path):
+    path = write_csv(tmp_path / "data.csv", "A,B\n1,x\n1,x\n2,\n3,y\n")
+    answers(path, "2", "2")
+    console.load_csv()
+    answers("1")
+    console.remove_duplicates()
+    answers("1")
+    console.save_data()
+
+    [saved] = tmp_path.glob("data_cleaned_*.csv")
+    expected = pd.read_csv(path).drop_duplicates()
+    pd.testing.assert_frame_equal(pd.read_csv(saved), expected.reset_index(drop=True))
+
+def test_lazy_plan_matches_eager_execution(console, answers, tmp_path):
+    path = write_csv(tmp_path / "data.csv", "A,B\n3,x\n1,x\n1,x\n,y\n2,\n")
+    frames = []
+    for mode in ("1", "3"):
+        answers(path, mode)
+        console.load_csv()
+        answers("2")
+        console.handle_missing()
+        console.remove_duplicates()
+        frames.append(console.df)
+    assert console.plan == [("fill_stat", "mean"), ("dedup", None)]
+
+    console.view_summary()
+    assert console.plan == []
+    pd.testing.assert_frame_equal(console.df, frames[0])
+
+def test_failing_planned_operation_is_reported_and_dropped(console, answers, tmp_path, capsys):
+    path = write_csv(tmp_path / "data.csv", "A,B\n1.5,x\n2.0,x\n2.0,x\n")
+    answers(path, "3")
+    console.load_csv()
+    answers("1")
+    console.remove_duplicates()
+    answers("1", "1")
+    console.change_data_type()
+    assert len(console.plan) == 2
+
+    console.view_summary()
+    output = capsys.readouterr().out
+    assert "cast 'A' to integer failed" in output
+    assert console.plan == [("dedup", None)]
+    assert len(console.df) == 3
+
+    console.view_summary()
+    assert console.plan == []
+    assert len(console.df) == 2
+
+def test_top_n_in_lazy_mode_runs_the_pending_plan_first(console, answers, tmp_path, capsys):
+    path = write_csv(tmp_path / "data.csv", "Name,Score\nA,5\nB,\nC,9\nC,9\n")
+    answers(path, "3")
+    console.load_csv()
+    answers("1")
+    console.handle_missing()
+    answers("1")
+    console.remove_duplicates()
+    capsys.readouterr()
+
+    answers("2", "n", "3")
+    console.sort_data()
+    output = capsys.readouterr().out
+    top = output[output.index("Top 3 rows"):]
+    assert console.plan == []
+    assert top.count("C") == 1 and "B" not in top
+
+def test_spilled_dedup_keeps_filename_and_casts_and_cleans_up(console, answers, tmp_path):
+    path = write_csv(tmp_path / "data.csv", "Code,Name\n007,x\n007,x\n008,y\n")
+    answers(path, "2", "")
+    console.load_csv()
+    answers("1", "3")
+    console.change_data_type()
+    answers("2")
+    console.remove_duplicates()
+
+    spill_dir = console.spill_dir
+    assert spill_dir is not None and os.path.isdir(spill_dir)
+    assert console.filename == path
+    assert console.chunk_ops == [("cast", ("Code", "3"))]
+    assert sorted(pd.concat(console.stream_chunks())['Code']) == ['7', '8']
+
+    answers("1")
+    console.save_data()
+    [saved] = tmp_path.glob("data_cleaned_*.csv")
+    assert len(pd.read_csv(saved)) == 2
+
+    answers(path, "1")
+    console.load_csv()
+    assert console.spill_dir is None and not os.path.exists(spill_dir)
+
+def test_prompts_leave_builtin_input_alone(console):
+    assert 'input' not in vars(console)
+
+def test_reload_from_columnar_cache_keeps_compact_dtypes(console, answers, tmp_path, capsys, monkeypatch):
+    pytest.importorskip("pyarrow")
+    rows = "".join(f"{i},{'Food' if i % 2 else 'Bills'}\n" for i in range(100))
+    path = write_csv(tmp_path / "data.csv", "Amount,Category\n" + rows)
+    answers(path, "1")
+    console.load_csv()
+    assert "Columnar cache written" in capsys.readouterr().out
+
+    optimize = console.schema.optimize
+    monkeypatch.setattr(console.schema, 'optimize', lambda *args: pytest.fail("optimized again"))
+    answers(path, "1")
+    console.load_csv()
+    output = capsys.readouterr().out
+    assert "Loaded from columnar cache" in output and "Category: str -> category" in output
+    assert isinstance(console.df['Category'].dtype, pd.CategoricalDtype)
+    assert console.load_memory is not None and console.df.attrs == {}
+
+    monkeypatch.setattr(console.schema, 'optimize', optimize)
+    monkeypatch.setattr(console, 'compact_dtypes', False)
+    answers(path, "1")
+    console.load_csv()
+    assert not isinstance(console.df['Category'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import parallel
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Key': rng.choice(['a', 'b', 'c'], 3000),
+        'Count': rng.integers(0, 50, 3000).astype('int16'),
+        'Value': rng.normal(10, 3, 3000).round(1),
+    })
+    df.loc[rng.random(3000) < 0.1, 'Value'] = np.nan
+    return pd.concat([df, df.iloc[:500]], ignore_index=True)
+
+@pytest.mark.parametrize('counts, expected', [
+    ({1: 1, 2: 1, 3: 1}, 2),
+    ({1: 2, 5: 2}, 3),
+    ({7: 4}, 7),
+    ({}, np.nan),
+])
+def test_median_from_counts(counts, expected):
+    np.testing.assert_equal(parallel.median_from_counts(pd.Series(counts, dtype='int64')), expected)
+
+@pytest.mark.parametrize('stat', ['mean', 'median'])
+def test_column_stats_in_parallel_match_pandas(df, stat):
+    numeric = df[['Count', 'Value']]
+    result = parallel.column_stats(numeric, stat, workers=2, min_rows=0)
+    expected = numeric.mean() if stat == 'mean' else numeric.median()
+    pd.testing.assert_series_equal(result, expected, check_dtype=False)
+
+def test_drop_duplicates_in_parallel_keeps_the_serial_result(df):
+    pd.testing.assert_frame_equal(parallel.drop_duplicates(df, workers=3, min_rows=0), df.drop_duplicates())
+
+@pytest.mark.parametrize('aggfunc', ['sum', 'mean', 'count', 'min', 'max'])
+@pytest.mark.parametrize('value_col', ['Count', 'Value'])
+def test_pivot_in_parallel_matches_pivot_table(df, aggfunc, value_col):
+    result = parallel.pivot(df, 'Key', value_col, aggfunc, workers=2, min_rows=0)
+    expected = pd.pivot_table(df, index='Key', values=value_col, aggfunc=aggfunc)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=aggfunc not in ('count', 'sum'))
+
+def test_small_frames_run_serially(df):
+    assert not parallel.use_parallel(df, workers=4, min_rows=len(df) + 1)
+    assert not parallel.use_parallel(df, workers=1, min_rows=0)
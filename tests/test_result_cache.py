@@ -0,0 +1,51 @@
+import threading
+
+import pandas as pd
+
+from result_cache import UploadCache, estimate_size
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = UploadCache(max_bytes=20)
+    cache.put('a', 1, 10)
+    cache.put('b', 2, 10)
+    assert cache.get('a') == 1
+    cache.put('c', 3, 10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.total_bytes == 20
+
+def test_newest_entry_is_kept_even_when_too_large():
+    cache = UploadCache(max_bytes=10)
+    cache.put('a', 1, 5)
+    cache.put('b', 2, 50)
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+
+def test_concurrent_gets_and_puts():
+    cache = UploadCache(max_bytes=100)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(2000):
+                key = (offset + i) % 30
+                if cache.get(key) is None:
+                    cache.put(key, i, 10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert cache.total_bytes == 10 * len(cache.entries) <= 100
+
+def test_estimate_size_counts_frames_inside_dicts():
+    frame = pd.DataFrame({'A': range(100)})
+    assert estimate_size({'x': frame, 'y': frame['A']}) == (
+        frame.memory_usage(deep=True).sum() + frame['A'].memory_usage(deep=True)
+    )
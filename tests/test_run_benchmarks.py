@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import pandas as pd
+
+import run_benchmarks
+
+def test_compare_flags_slower_and_bigger_runs():
+    baseline = {
+        'fast': {'seconds': 1.0, 'peak_mb': 10.0},
+        'slow': {'seconds': 1.0, 'peak_mb': 10.0},
+        'big': {'seconds': 1.0, 'peak_mb': 10.0},
+    }
+    results = {
+        'fast': {'seconds': 0.5, 'peak_mb': 9.0},
+        'slow': {'seconds': 2.0, 'peak_mb': 10.0},
+        'big': {'seconds': 1.0, 'peak_mb': 20.0},
+    }
+    regressions = run_benchmarks.compare(results, baseline, 0.25, 0.25)
+    assert regressions == [('slow', 'seconds'), ('big', 'peak_mb')]
+
+def test_compare_skips_untraced_and_tiny_peaks():
+    baseline = {
+        'untraced': {'seconds': 1.0, 'peak_mb': 10.0},
+        'tiny': {'seconds': 1.0, 'peak_mb': 0.1},
+        'new': None,
+    }
+    results = {
+        'untraced': {'seconds': 1.0, 'peak_mb': None},
+        'tiny': {'seconds': 1.0, 'peak_mb': 0.5},
+        'new': {'seconds': 1.0, 'peak_mb': 50.0},
+    }
+    assert run_benchmarks.compare(results, baseline, 0.25, 0.25) == []
+
+def test_reset_console_forgets_saved_exports(console):
+    console.saved_exports[('0f3a', 'csv')] = ('data_cleaned.csv', 10)
+    run_benchmarks.reset_console('data.csv', pd.DataFrame({'A': [1]}))
+    assert console.saved_exports == {}
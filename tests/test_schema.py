@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import schema
+
+def frame(rows=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Category': rng.choice(['Food', 'Bills', 'Travel'], rows),
+        'Date': rng.choice(pd.date_range("2024-01-01", periods=60).strftime("%Y-%m-%d"), rows),
+        'Note': [f"note {i % (rows // 3)}" for i in range(rows)],
+        'Amount': rng.integers(0, 100, rows),
+        'Price': rng.random(rows),
+    })
+
+def test_only_repeated_text_becomes_categorical():
+    df, changes = schema.optimize(frame())
+    assert isinstance(df['Category'].dtype, pd.CategoricalDtype)
+    # Dates stay text for date parsing, free text repeats too little
+    assert 'Date' not in changes and 'Note' not in changes
+    assert df['Amount'].dtype == np.int8
+    assert df['Price'].dtype == np.float64
+    pd.testing.assert_frame_equal(df.astype(frame().dtypes), frame())
+
+def test_unique_count_is_capped(monkeypatch):
+    monkeypatch.setattr(schema, 'CATEGORY_MAX_UNIQUES', 2)
+    _, changes = schema.optimize(frame())
+    assert 'Category' not in changes
+
+def test_widen_keeps_nullable_dtypes():
+    assert schema.widen(pd.Series([1, None], dtype='Int8')).dtype == 'Int64'
+    assert schema.widen(pd.Series([1, 2], dtype='int8')).dtype == 'int64'
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_free_text_becomes_arrow_strings(dtype):
+    pytest.importorskip("pyarrow")
+    notes = frame()['Note'].astype(dtype)
+    optimized = schema.optimize_column(notes, arrow_strings=True)
+    assert optimized.dtype == 'string[pyarrow]'
+    assert list(optimized) == list(notes)
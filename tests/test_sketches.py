@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sketches
+
+def values(rows=20000, seed=0):
+    return np.random.default_rng(seed).lognormal(size=rows)
+
+def test_tdigest_quantiles_within_their_rank_error():
+    data = values()
+    digest = sketches.TDigest()
+    for part in np.array_split(data, 7):
+        digest.update(part)
+    ordered = np.sort(data)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        rank = np.searchsorted(ordered, digest.quantile(q)) / len(data)
+        assert abs(rank - q) <= digest.rank_error(q) + 1e-3
+    assert (digest.quantile(0), digest.quantile(1)) == (data.min(), data.max())
+
+def test_merged_hyperloglog_counts_the_union():
+    first, second = sketches.HyperLogLog(), sketches.HyperLogLog()
+    first.update_hashes(pd.util.hash_array(np.arange(0, 60000)))
+    second.update_hashes(pd.util.hash_array(np.arange(40000, 100000)))
+    first.merge(second)
+    assert first.estimate() == pytest.approx(100000, rel=3 * first.relative_error)
+
+def test_hyperloglog_small_counts_are_close():
+    sketch = sketches.HyperLogLog()
+    sketch.update_hashes(pd.util.hash_array(np.arange(100)))
+    assert round(sketch.estimate()) == 100
+
+def test_merged_moments_match_pandas():
+    data = pd.Series(values())
+    parts = []
+    for part in np.array_split(data.to_numpy(), 5):
+        moments = sketches.Moments()
+        moments.update(part)
+        parts.append(moments)
+    merged = parts[0]
+    for moments in parts[1:]:
+        merged.merge(moments)
+    assert merged.count == len(data)
+    assert merged.mean == pytest.approx(data.mean())
+    assert merged.std == pytest.approx(data.std())
+
+def test_streaming_summary_matches_describe():
+    df = pd.DataFrame({'Value': values(5000), 'Item': np.random.default_rng(1).choice(list("abcde"), 5000)})
+    df.loc[::10, 'Value'] = np.nan
+    summary = sketches.StreamingSummary()
+    for start in range(0, len(df), 1000):
+        summary.update(df.iloc[start:start + 1000])
+    report = summary.report()
+    expected = df['Value'].describe()
+
+    assert report.loc['count', 'Value'] == expected['count']
+    assert report.loc['missing', 'Value'] == 500
+    assert report.loc['mean', 'Value'] == pytest.approx(expected['mean'])
+    assert report.loc['std', 'Value'] == pytest.approx(expected['std'])
+    assert report.loc['max', 'Value'] == expected['max']
+    assert report.loc['distinct', 'Item'] == 5
+    assert summary.quantile_errors()['Value'] < 0.01
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import timeseries
+
+def readings(rows=500):
+    rng = np.random.default_rng(0)
+    times = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 60 * 24 * 30, rows)), unit='min')
+    return pd.DataFrame({
+        'Date': times.strftime("%Y-%m-%d %H:%M"),
+        'Station': rng.choice(['north', 'south'], rows),
+        'Temperature': rng.normal(25, 5, rows).round(1),
+        'Rainfall': rng.exponential(2, rows).round(1),
+    })
+
+def expected_rolling(df, column, window, stat, by=None):
+    data = df.assign(Date=pd.to_datetime(df['Date'])).sort_values([by, 'Date'] if by else ['Date'], kind='stable')
+    def roll(group):
+        return getattr(group.set_index('Date')[column].rolling(window), stat)().to_numpy()
+    if by is None:
+        return roll(data)
+    return np.concatenate([roll(group) for _, group in data.groupby(by, sort=False)])
+
+@pytest.mark.parametrize('by', [None, 'Station'])
+def test_chunked_rolling_matches_pandas(by):
+    df = readings()
+    windows = timeseries.weather_windows(df.columns, rain_days=2, temp_hours=6)
+    result = timeseries.rolling(df, windows, by=by, chunk_rows=37)
+    for column, window, stat in windows:
+        np.testing.assert_allclose(
+            result[f"{column} {window} {stat}"], expected_rolling(df, column, window, stat, by)
+        )
+
+def test_rolling_window_rejects_chunks_out_of_order():
+    roller = timeseries.RollingWindow('1D', 'sum')
+    roller.update(pd.to_datetime(["2024-01-02"]), [1.0])
+    with pytest.raises(ValueError):
+        roller.update(pd.to_datetime(["2024-01-01"]), [1.0])
+
+def test_interpolate_weights_by_time_and_keeps_edge_gaps():
+    df = pd.DataFrame({
+        'Date': ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 04:00", "2024-01-01 05:00"],
+        'Temperature': [np.nan, 10.0, np.nan, 20.0],
+    })
+    filled = timeseries.interpolate(df, ['Temperature'])
+    assert np.isnan(filled['Temperature'][0])
+    assert filled['Temperature'][2] == pytest.approx(17.5)
+
+def test_resample_matches_pandas():
+    df = readings()
+    result = timeseries.resample(df, 'D').set_index('Date')
+    data = df.assign(Date=pd.to_datetime(df['Date'])).set_index('Date')
+    daily = data.resample('D')
+    np.testing.assert_allclose(result['Rainfall sum'], daily['Rainfall'].sum()[daily.size() > 0])
+    np.testing.assert_allclose(result['Temperature max'], daily['Temperature'].max()[daily.size() > 0])
+    assert result['Readings'].sum() == len(df)
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+import conversions
+
+# Time-series helpers for the Weather Data Cleaner: time-weighted gap
+# filling, per-day/week/month statistics and rolling windows such as
+# 7-day rainfall or 24h temperature extremes. Rolling windows run chunk
+# by chunk through RollingWindow, which only carries the rows of the
+# last window from one chunk to the next. Within a chunk pandas' window
+# kernels slide over the rows, adding and removing values for sums and
+# keeping a monotonic deque for min and max, so every row costs O(1)
+# amortized however long the window is. Data with a station column
+# (e.g. ingest.SOURCE_COLUMN) is handled per station through by.
+
+CHUNK_ROWS = 100000
+
+FREQUENCIES = {'Day': 'D', 'Week': 'W', 'Month': 'MS'}
+
+# Statistics per resampled period, other numeric columns get the mean
+RESAMPLE_STATS = {
+    'Temperature': ['min', 'mean', 'max'],
+    'Humidity': ['min', 'mean', 'max'],
+    'Rainfall': ['sum', 'max'],
+}
+
+def weather_windows(columns, rain_days=7, temp_hours=24):
+    """Rolling (column, window, stat) specs for the weather columns present"""
+    windows = [('Rainfall', f'{rain_days}D', 'sum'),
+               ('Temperature', f'{temp_hours}h', 'min'), ('Temperature', f'{temp_hours}h', 'max')]
+    return [spec for spec in windows if spec[0] in columns]
+
+def prepare(df, time_col='Date', by=None):
+    """Rows with a valid time, time_col parsed, sorted by (by, time)"""
+    times = conversions.to_datetime(df[time_col], errors='coerce')
+    valid = times.notna() & (df[by].notna() if by else True)
+    data = df.assign(**{time_col: times})[valid]
+    keys = [by, time_col] if by else [time_col]
+    return data.sort_values(keys, kind='stable', ignore_index=True)
+
+def interpolate(df, columns, time_col='Date', by=None):
+    """df with gaps in columns filled by time-weighted interpolation
+
+    A missing value is interpolated from the readings before and after
+    it, weighted by how far apart they are in time. Leading and trailing
+    gaps, and rows without a valid time, stay missing.
+    """
+    times = conversions.to_datetime(df[time_col], errors='coerce')
+    data = df.assign(**{time_col: times})[times.notna()]
+    data = data.sort_values([by, time_col] if by else [time_col], kind='stable')
+    index = pd.DatetimeIndex(data[time_col])
+
+    filled = {}
+    for column in columns:
+        if not df[column].isna().any():
+            continue
+        series = data[column].astype(float).set_axis(index)
+        if by:
+            series = series.groupby(data[by].to_numpy(), observed=True).transform(
+                lambda group: group.interpolate(method='time', limit_area='inside')
+            )
+        else:
+            series = series.interpolate(method='time', limit_area='inside')
+        # Back to the original rows, fillna aligns on df's index
+        filled[column] = df[column].fillna(series.set_axis(data.index))
+    return df.assign(**filled) if filled else df
+
+def resample(df, freq, time_col='Date', by=None):
+    """Statistics per period of freq ('D', 'W', 'MS', ...), per by group when given"""
+    data = prepare(df, time_col, by)
+    numeric = [col for col in data.select_dtypes(include=['number']).columns if col != by]
+    stats = {col: RESAMPLE_STATS.get(col, ['mean']) for col in numeric}
+    keys = [pd.Grouper(key=time_col, freq=freq)]
+    if by:
+        keys.insert(0, by)
+
+    grouped = data.groupby(keys, observed=True)
+    result = grouped.agg(stats) if stats else pd.DataFrame(index=grouped.size().index)
+    result.columns = [f"{col} {stat}" for col, stat in result.columns]
+    result.insert(0, 'Readings', grouped.size())
+    # Periods without readings are left out
+    return result[result['Readings'] > 0].reset_index()
+
+class RollingWindow:
+    """Time-based rolling statistic over a stream of time-ordered chunks
+
+    update() takes the times and values of the next rows and returns the
+    statistic over the window ending at each of them, e.g.
+    RollingWindow('7D', 'sum') for the rainfall of the last seven days.
+    """
+
+    STATS = ('sum', 'mean', 'min', 'max', 'count')
+
+    def __init__(self, window, stat):
+        if stat not in self.STATS:
+            raise ValueError(f"stat must be one of {self.STATS}")
+        self.window = pd.Timedelta(window)
+        self.stat = stat
+        self.times = np.empty(0, dtype='datetime64[ns]')
+        self.values = np.empty(0)
+
+    def update(self, times, values):
+        times = np.asarray(times, dtype='datetime64[ns]')
+        values = np.asarray(values, dtype=float)
+        if len(times) == 0:
+            return np.empty(0)
+        if len(self.times) and times[0] < self.times[-1]:
+            raise ValueError("chunks must arrive in time order")
+
+        # The carried rows are all a new row's window can reach
+        all_times = np.concatenate((self.times, times))
+        all_values = np.concatenate((self.values, values))
+        window = pd.Series(all_values, index=pd.DatetimeIndex(all_times)).rolling(self.window)
+        result = getattr(window, self.stat)().to_numpy()[len(self.times):]
+
+        keep = all_times > all_times[-1] - self.window
+        self.times = all_times[keep]
+        self.values = all_values[keep]
+        return result
+
+def rolling(df, windows, time_col='Date', by=None, chunk_rows=CHUNK_ROWS, progress=None):
+    """Rolling statistics for every row, windows are (column, window, stat) specs
+
+    Returns time_col, by and one column per spec, e.g. 'Rainfall 7D sum',
+    sorted by (by, time). progress, when given, is called with (rows
+    done, total rows) after every chunk.
+    """
+    data = prepare(df, time_col, by)
+    names = [f"{column} {window} {stat}" for column, window, stat in windows]
+    out = {name: np.empty(len(data)) for name in names}
+
+    # Rows of a group are contiguous after sorting, every group gets fresh windows
+    groups = [data] if by is None else [group for _, group in data.groupby(by, observed=True, sort=False)]
+    position = 0
+    for group in groups:
+        rollers = [RollingWindow(window, stat) for _, window, stat in windows]
+        for start in range(0, len(group), chunk_rows):
+            chunk = group.iloc[start:start + chunk_rows]
+            end = position + len(chunk)
+            for name, (column, _, _), roller in zip(names, windows, rollers):
+                out[name][position:end] = roller.update(chunk[time_col], chunk[column])
+            position = end
+            if progress is not None:
+                progress(position, len(data))
+
+    keys = [by, time_col] if by else [time_col]
+    return data[keys].assign(**out)